@@ -0,0 +1,174 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic_fleet import generate_fleet
+from modules import log_processor, log_scanner
+from modules.config_loader import load_config
+from modules.delay_predictor import predict_delay
+from modules.health_monitor import setup_health_loggers, shutdown_health_loggers, check_health
+from modules.crew_optimizer import evaluate_crew
+from modules.load_predictor import predict_load
+from modules.fleet_engine import evaluate_fleet
+from modules.dashboard import show_dashboard
+from modules.reporter import write_daily_report
+
+PARSERS = [
+    ("parse_engine_logs", "engine_performance.log"),
+    ("parse_cabin_logs", "cabin_pressure.log"),
+    ("parse_weather_logs", "weather_data.log"),
+    ("parse_airspeed_altitude_logs", "airspeed_altitude.log"),
+    ("parse_operational_status", "operational_status.csv"),
+    ("parse_crew_schedule", "crew_schedule.csv"),
+    ("parse_passenger_load", "passenger_load.csv"),
+    ("scan_engine_logs", "engine_performance.log"),
+    ("scan_cabin_logs", "cabin_pressure.log")
+]
+
+SCANNERS = [
+    ("scan_log[engine]", "engine_performance.log", log_scanner.ENGINE_FIELDS),
+    ("scan_log[cabin]", "cabin_pressure.log", log_scanner.CABIN_FIELDS)
+]
+
+def _time(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(flights=1000, readings=3, repeat=1, workdir=None, seed=42):
+    config = load_config(os.path.join(ROOT, "airline_config.json"))
+
+    workdir = workdir or tempfile.mkdtemp(prefix="airline_bench_")
+    data_dir = os.path.join(workdir, "data")
+    t0 = time.perf_counter()
+    generate_fleet(data_dir, flights, readings, seed=seed)
+    generate_sec = time.perf_counter() - t0
+
+    stages = {}
+
+    def record(name, seconds, items):
+        stages[name] = {
+            "seconds": seconds,
+            "items": items,
+            "per_item_us": seconds / items * 1e6 if items else None
+        }
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        os.makedirs("logs", exist_ok=True)
+        setup_health_loggers(async_mode=config.get("alert_logging", {}).get("async", False))
+
+        for name, filename in PARSERS:
+            path = os.path.join("data", filename)
+            seconds, parsed = _time(lambda: getattr(log_processor, name)(path), repeat)
+            record(name, seconds, len(parsed))
+
+        for name, filename, fields in SCANNERS:
+            path = os.path.join("data", filename)
+            seconds, cols = _time(lambda: log_scanner.scan_log(path, fields), repeat)
+            record(name, seconds, cols["rows"])
+
+        seconds, data = _time(log_processor.integrate_flight_data, repeat)
+        fleet = data["flights"]
+        n = len(fleet)
+        record("integrate_flight_data", seconds, n)
+
+        thresholds = config["thresholds"]
+        seconds, delays = _time(lambda: [predict_delay(fl, thresholds) for fl in fleet], repeat)
+        record("predict_delay", seconds, n)
+        seconds, alerts = _time(lambda: [check_health(fl, thresholds) for fl in fleet], repeat)
+        record("check_health", seconds, n)
+        seconds, crew = _time(lambda: [evaluate_crew(fl, config["crew_rules"]) for fl in fleet], repeat)
+        record("evaluate_crew", seconds, n)
+        seconds, loads = _time(lambda: [predict_load(fl, config["passenger_rules"]) for fl in fleet], repeat)
+        record("predict_load", seconds, n)
+
+        seconds, batch = _time(lambda: evaluate_fleet(fleet, config), repeat)
+        record("evaluate_fleet", seconds, n)
+        delay_results, health_alerts, crew_issues, load_results = batch
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds, _ = _time(lambda: show_dashboard(fleet, delay_results, health_alerts, crew_issues, load_results), repeat)
+        record("show_dashboard", seconds, n)
+
+        seconds, _ = _time(lambda: write_daily_report(
+            flights=fleet,
+            delay_results=delay_results,
+            health_alerts=health_alerts,
+            crew_issues=crew_issues,
+            load_results=load_results,
+            missing_flights=data["missing_flights"]
+        ), repeat)
+        record("write_daily_report", seconds, n)
+
+        shutdown_health_loggers()
+    finally:
+        os.chdir(cwd)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "flights": flights,
+            "readings_per_flight": readings,
+            "repeat": repeat,
+            "seed": seed,
+            "workdir": workdir,
+            "generate_seconds": generate_sec
+        },
+        "stages": stages
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on a synthetic fleet")
+    parser.add_argument("--flights", type=int, default=1000)
+    parser.add_argument("--readings", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage, the fastest is reported")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=None, help="where the synthetic data, logs and report are written")
+    parser.add_argument("--out", default="output/benchmarks/bench_results.json")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.flights, args.readings, args.repeat, args.workdir, args.seed)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'Stage':<30} {'Seconds':>10} {'us/item':>10}")
+    for name, s in results["stages"].items():
+        per_item = f"{s['per_item_us']:.1f}" if s["per_item_us"] is not None else "-"
+        print(f"{name:<30} {s['seconds']:>10.4f} {per_item:>10}")
+    print(f"\n✓ Results saved: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import random
+from datetime import datetime, timedelta
+
+AIRPORTS = ["DEL", "BOM", "BLR", "HYD", "CCU", "MAA", "GOI", "AMD", "COK", "PNQ"]
+AIRCRAFT_TYPES = ["A320", "A321", "B737", "B787"]
+CONDITIONS = ["CLEAR", "FAIR", "MODERATE", "POOR", "SEVERE"]
+
+def _ts(base, seconds):
+    return (base + timedelta(seconds=seconds)).strftime("%Y-%m-%d %H:%M:%S")
+
+def generate_fleet(
+    out_dir="benchmarks/data",
+    flights=1000,
+    readings=3,
+    spacing_sec=5,
+    seed=42,
+    start=datetime(2024, 1, 15, 0, 0, 0)
+):
+    rng = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    fids = [f"SY{i:07d}" for i in range(flights)]
+    aircraft = [f"{rng.choice(AIRCRAFT_TYPES)}-{i % 500:03d}" for i in range(flights)]
+
+    # Reading k of flight i is taken at tick i + k, so writing tick by tick keeps every log in time order.
+    with open(os.path.join(out_dir, "engine_performance.log"), "w", encoding="utf-8") as eng, \
+         open(os.path.join(out_dir, "cabin_pressure.log"), "w", encoding="utf-8") as cab, \
+         open(os.path.join(out_dir, "airspeed_altitude.log"), "w", encoding="utf-8") as spd, \
+         open(os.path.join(out_dir, "weather_data.log"), "w", encoding="utf-8") as wx:
+        for tick in range(flights + readings - 1):
+            ts = _ts(start, tick * spacing_sec)
+            eng_lines = []
+            cab_lines = []
+            spd_lines = []
+            for k in range(readings):
+                i = tick - k
+                if i < 0 or i >= flights:
+                    continue
+                fid = fids[i]
+                aid = aircraft[i]
+                thrust = ",".join(str(rng.randint(70, 110)) for _ in range(2))
+                vib = ",".join(f"{rng.uniform(1.0, 4.8):.1f}" for _ in range(2))
+                eng_lines.append(f"{ts}|{fid}|{aid}|ENGINE_THRUST:{thrust}|VIBRATION:{vib}|FUEL_BURN:{rng.randint(1800, 2700)}|STATUS:OK\n")
+                pressure = 0.4 if rng.random() < 0.01 else round(rng.uniform(9.5, 10.5), 1)
+                cab_lines.append(f"{ts}|{fid}|{aid}|PRESSURE:{pressure}|TEMP:{rng.randint(20, 32)}|TURBULENCE:{rng.randint(0, 4)}|STATUS:NORMAL\n")
+                spd_lines.append(f"{ts}|{fid}|{aid}|AIRSPEED:{rng.randint(400, 500)}|ALTITUDE:{rng.randint(30000, 40000)}|STATUS:NORMAL\n")
+                if k == 0:
+                    origin, dest = rng.sample(AIRPORTS, 2)
+                    storm = "YES" if rng.random() < 0.1 else "NO"
+                    wx.write(f"{ts}|{fid}|{origin}|{dest}|CROSSWIND:{rng.randint(5, 50)}|VISIBILITY:{rng.randint(500, 5000)}|THUNDERSTORM:{storm}|CONDITION:{rng.choice(CONDITIONS)}\n")
+            eng.writelines(reversed(eng_lines))
+            cab.writelines(reversed(cab_lines))
+            spd.writelines(reversed(spd_lines))
+
+    pilots = max(2, flights // 2)
+    cabin_pool = max(3, flights * 2)
+    with open(os.path.join(out_dir, "operational_status.csv"), "w", encoding="utf-8") as f:
+        f.write("FlightID,RunwayQueueMin,BoardingTimeMin\n")
+        for fid in fids:
+            f.write(f"{fid},{rng.randint(0, 45)},{rng.randint(20, 60)}\n")
+
+    with open(os.path.join(out_dir, "crew_schedule.csv"), "w", encoding="utf-8") as f:
+        f.write("FlightID,PilotIDs,CabinCrewIDs,PilotHoursWorked,PilotLastRestHours,CrewAvailable\n")
+        for fid in fids:
+            p = ";".join(f"P{rng.randrange(pilots):06d}" for _ in range(2))
+            c = ";".join(f"C{rng.randrange(cabin_pool):06d}" for _ in range(rng.choice((2, 3, 3, 4))))
+            hours = ";".join(str(rng.randint(0, 12)) for _ in range(2))
+            rest = ";".join(str(rng.randint(7, 14)) for _ in range(2))
+            avail = "NO" if rng.random() < 0.05 else "YES"
+            f.write(f"{fid},{p},{c},{hours},{rest},{avail}\n")
+
+    with open(os.path.join(out_dir, "passenger_load.csv"), "w", encoding="utf-8") as f:
+        f.write("FlightID,Booked,Capacity,HistoricalLoadPct\n")
+        for fid in fids:
+            cap = rng.choice((180, 200, 220))
+            hist = ";".join(str(rng.randint(50, 105)) for _ in range(rng.randint(3, 10)))
+            f.write(f"{fid},{rng.randint(int(cap * 0.5), int(cap * 1.15))},{cap},{hist}\n")
+
+    return out_dir
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic fleet in the data/ log and CSV formats")
+    parser.add_argument("--out", default="benchmarks/data")
+    parser.add_argument("--flights", type=int, default=1000)
+    parser.add_argument("--readings", type=int, default=3, help="engine, cabin and airspeed readings per flight")
+    parser.add_argument("--spacing-sec", type=int, default=5, help="seconds between consecutive departures")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    generate_fleet(args.out, args.flights, args.readings, args.spacing_sec, args.seed)
+    print(f"✓ Synthetic fleet of {args.flights} flights written to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,66 +1,192 @@
 import os
-import json
+import argparse
 
-from modules.log_processor import integrate_flight_data
-from modules.delay_predictor import predict_delay
-from modules.health_monitor import setup_health_loggers, check_health
-from modules.crew_optimizer import evaluate_crew
-from modules.load_predictor import predict_load
+from modules.log_processor import integrate_flight_data, iter_flight_data
+from modules.health_monitor import setup_health_loggers, shutdown_health_loggers
 from modules.dashboard import show_dashboard
-from modules.reporter import write_daily_report
+from modules.reporter import write_daily_report, write_reassignment_proposals
+from modules.crew_optimizer import propose_reassignments
+from modules.parse_cache import ParseCache
+from modules.pipeline import (
+    evaluate,
+    load_incremental_state,
+    save_incremental_state,
+    evaluate_changed,
+    collect_results,
+    apply_crew_roster,
+    apply_health_trends,
+    archive_results,
+    open_load_store,
+    save_load_store,
+    open_alert_store,
+    save_alert_store,
+    record_alerts,
+    report_options
+)
+from modules.service import OperationsService
+from modules.instrumentation import profiler, instrument_pipeline, count_results
+from modules.config_loader import load_config, ConfigError
+
+def report_dropped(dropped):
+    for name, count in dropped.items():
+        if count:
+            print(f"⚠ {count} {name} alerts dropped (log queue full)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Airline Operations & Predictive Flight Management System")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the parsed data cache")
+    parser.add_argument("--daemon", action="store_true", help="keep running and re-evaluate flights as the data files change")
+    parser.add_argument("--profile", action="store_true", help="collect per-stage timing, memory and counters and print a summary")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+
     os.makedirs("logs", exist_ok=True)
     os.makedirs("output/reports", exist_ok=True)
 
     print("Initializing Airline Operations System...")
     
-    with open("airline_config.json", "r", encoding="utf-8") as f:
-        config = json.load(f)
+    try:
+        config = load_config("airline_config.json")
+    except ConfigError as e:
+        raise SystemExit(f"✗ airline_config.json: {e}")
 
-    setup_health_loggers()
+    instrumentation = config.get("instrumentation", {})
+    if args.profile or instrumentation.get("enabled", False):
+        profiler.enable(trace_memory=instrumentation.get("trace_memory", False))
+        instrument_pipeline()
 
-    print("Reading flight data from logs...")
-    data = integrate_flight_data()
-    flights = data["flights"]
-    missing = data["missing_flights"]
-
-    print(f"Processing {len(flights)} flights...\n")
+    alert_logging = config.get("alert_logging", {})
+    setup_health_loggers(
+        async_mode=alert_logging.get("async", False),
+        queue_size=alert_logging.get("queue_size", 10000),
+        overflow=alert_logging.get("overflow", "drop"),
+        batch_size=alert_logging.get("batch_size", 256),
+        flush_interval=alert_logging.get("flush_interval_sec", 1.0)
+    )
 
-    delay_results = []
-    health_alerts = []
-    crew_issues = []
-    load_results = []
+    if args.daemon:
+        OperationsService(config).run()
+        report_dropped(shutdown_health_loggers())
+        return
 
-    for fl in flights:
-        delay_min, reasons = predict_delay(fl, config["thresholds"])
-        delay_results.append({"flight_id": fl["flight_id"], "delay_min": delay_min, "reasons": reasons})
+    ingestion = config.get("ingestion", {})
+    load_store = open_load_store(config)
+    alert_store = open_alert_store(config)
 
-        health_alerts.extend(check_health(fl, config["thresholds"]))
+    print("Reading flight data from logs...")
+    if ingestion.get("mode") == "incremental":
+        state_path, ingestor, results = load_incremental_state(ingestion)
+        with profiler.stage("incremental_update"):
+            changed = ingestor.update()
+            data = ingestor.flights()
+        flights = data["flights"]
+        missing = data["missing_flights"]
+        missing_sources = data["missing_sources"]
+        print(f"Processing {len(flights)} flights ({len(changed)} changed)...\n")
 
-        ok, issues = evaluate_crew(fl, config["crew_rules"])
-        if not ok:
-            crew_issues.append({"flight_id": fl["flight_id"], "issues": issues})
+        with profiler.stage("evaluate"):
+            evaluate_changed(ingestor, results, changed, config, load_store)
+        delay_results, health_alerts, crew_issues, load_results = collect_results(flights, results)
+        save_incremental_state(state_path, ingestor, results)
+    elif ingestion.get("mode") == "stream":
+        missing = []
+        missing_sources = {}
+        late = {}
+        flight_source = iter_flight_data(
+            missing=missing,
+            missing_sources=missing_sources,
+            late=late,
+            chunk_size=ingestion.get("chunk_size_bytes", 1 << 20),
+            idle_window_min=ingestion.get("stream_idle_window_min", 60),
+            epoch=ingestion.get("epoch_timestamps", False),
+            compact=ingestion.get("compact_records", False)
+        )
+        print("Streaming flights from logs...\n")
+    else:
+        cache_cfg = config.get("cache", {})
+        cache = None
+        if cache_cfg.get("enabled", False) and not args.no_cache:
+            cache = ParseCache(
+                cache_dir=cache_cfg.get("dir", "output/cache"),
+                max_bytes=cache_cfg.get("max_mb", 512) << 20
+            )
+        with profiler.stage("integrate_flight_data"):
+            data = integrate_flight_data(
+                workers=ingestion.get("workers", 1),
+                split_bytes=ingestion.get("split_bytes", 64 << 20),
+                epoch=ingestion.get("epoch_timestamps", False),
+                cache=cache,
+                compact=ingestion.get("compact_records", False),
+                join=ingestion.get("join", "index"),
+                scanner=ingestion.get("scanner", "lines")
+            )
+        flight_source = data["flights"]
+        missing = data["missing_flights"]
+        missing_sources = data["missing_sources"]
+        print(f"Processing {len(flight_source)} flights...\n")
 
-        load_pred = predict_load(fl, config["passenger_rules"])
-        load_results.append({"flight_id": fl["flight_id"], **load_pred})
+    if ingestion.get("mode") != "incremental":
+        with profiler.stage("evaluate"):
+            flights, delay_results, health_alerts, crew_issues, load_results = evaluate(
+                flight_source, config, load_store, summarize=ingestion.get("mode") == "stream"
+            )
+    save_load_store(config, load_store)
+    crew_issues = apply_crew_roster(flights, crew_issues, config)
+    with profiler.stage("health_trends"):
+        trend_alerts = apply_health_trends(flights, config)
+    aircraft_of = {fl["flight_id"]: fl["aircraft_id"] for fl in flights}
+    record_alerts(alert_store, aircraft_of, health_alerts)
+    record_alerts(alert_store, aircraft_of, trend_alerts, trend=True)
+    health_alerts = health_alerts + trend_alerts
+    save_alert_store(config, alert_store)
+    count_results(flights, delay_results, health_alerts, crew_issues, load_results, missing)
 
-    show_dashboard(flights, delay_results, health_alerts, crew_issues, load_results)
+    with profiler.stage("show_dashboard"):
+        show_dashboard(flights, delay_results, health_alerts, crew_issues, load_results, alert_store)
 
-    report_path = write_daily_report(
-        flights=flights,
-        delay_results=delay_results,
-        health_alerts=health_alerts,
-        crew_issues=crew_issues,
-        load_results=load_results,
-        missing_flights=missing
-    )
+    with profiler.stage("write_daily_report"):
+        report_path = write_daily_report(
+            flights=flights,
+            delay_results=delay_results,
+            health_alerts=health_alerts,
+            crew_issues=crew_issues,
+            load_results=load_results,
+            missing_flights=missing,
+            missing_sources=missing_sources,
+            alert_store=alert_store,
+            **report_options(config)
+        )
 
     print(f"✓ Report saved: {report_path}")
+
+    with profiler.stage("archive_results"):
+        archive_path = archive_results(flights, delay_results, health_alerts, crew_issues, load_results, config)
+    if archive_path:
+        print(f"✓ Results archived: {archive_path}")
+
+    reassignment = config.get("crew_reassignment", {})
+    if reassignment.get("enabled", False):
+        with profiler.stage("propose_reassignments"):
+            result = propose_reassignments(flights, config["crew_rules"], reassignment.get("time_budget_sec", 2.0))
+        proposals_path = write_reassignment_proposals(result)
+        unfilled = sum(p["unfilled"] for p in result["proposals"])
+        partial = "" if result["complete"] else ", partial (time budget reached)"
+        print(f"✓ Crew reassignments saved: {proposals_path} ({len(result['proposals'])} flights, {unfilled} positions unfilled{partial})")
     print(f"✓ Alerts logged to: logs/")
     
     if missing:
         print(f"\n⚠ Flights skipped: {', '.join(missing)}")
+    if ingestion.get("mode") == "stream" and late:
+        print(f"⚠ {sum(late.values())} late log lines ignored for {len(late)} flights already closed by the stream idle window")
+
+    report_dropped(shutdown_health_loggers())
+
+    if profiler.enabled:
+        print("\n" + profiler.summary())
+        json_path, prom_path = profiler.export(instrumentation.get("export_dir", "output/metrics"))
+        print(f"✓ Metrics exported: {json_path}, {prom_path}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,186 @@
+import heapq
+import os
+import pickle
+import re
+import time
+
+from modules.archive import classify
+
+LEVEL_RANK = {"WARN": 1, "CRITICAL": 2}
+_LEVELS = {rank: level for level, rank in LEVEL_RANK.items()}
+
+_NUMBER = re.compile(r"[-+]?\d+(?:\.\d+)?")
+
+def alert_value(text):
+    start = text.find("[")
+    if start >= 0:
+        end = text.find("]", start)
+        values = _NUMBER.findall(text, start, end if end >= 0 else len(text))
+        if values:
+            return max(abs(float(v)) for v in values)
+    m = _NUMBER.search(text)
+    return abs(float(m.group())) if m else 0.0
+
+class AlertStore:
+    def __init__(self, suppress_minutes=60, escalate_pct=10.0, retention_hours=168):
+        self.suppress_minutes = suppress_minutes
+        self.escalate_pct = escalate_pct
+        self.retention_hours = retention_hours
+        self.entries = {}
+        self.seq = 0
+        self._rebuild()
+
+    @classmethod
+    def load(cls, path, suppress_minutes=60, escalate_pct=10.0, retention_hours=168):
+        try:
+            with open(path, "rb") as f:
+                store = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return cls(suppress_minutes, escalate_pct, retention_hours)
+        store.suppress_minutes = suppress_minutes
+        store.escalate_pct = escalate_pct
+        store.retention_hours = retention_hours
+        return store
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for name in ("ranked", "counts", "heaps"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._rebuild()
+
+    def _rebuild(self):
+        self.ranked = {}
+        self.counts = dict.fromkeys((None,) + tuple(LEVEL_RANK), 0)
+        self.heaps = {}
+        for key in self.entries:
+            self._reindex(key)
+
+    def _reindex(self, key):
+        # Heaps are updated lazily: a changed entry is pushed again and its old item is skipped when read.
+        entry = self.entries.get(key)
+        order = None
+        if entry is not None and entry["active"]:
+            order = (-LEVEL_RANK[entry["level"]], -entry["escalations"], entry["seq"])
+        old = self.ranked.get(key)
+        if order == old:
+            return
+        if old is not None:
+            del self.ranked[key]
+            self.counts[None] -= 1
+            self.counts[_LEVELS[-old[0]]] -= 1
+        if order is not None:
+            self.ranked[key] = order
+            self.counts[None] += 1
+            self.counts[entry["level"]] += 1
+            item = order + (key,)
+            for level in (None, entry["level"]):
+                heap = self.heaps.get(level)
+                if heap is not None:
+                    heapq.heappush(heap, item)
+
+    def _worse(self, entry, level, value):
+        if LEVEL_RANK[level] > LEVEL_RANK[entry["level"]]:
+            return True
+        if LEVEL_RANK[level] < LEVEL_RANK[entry["level"]]:
+            return False
+        logged = entry["logged_value"]
+        return value > logged * (1 + self.escalate_pct / 100) if logged else value > 0
+
+    def ingest(self, alerts, aircraft_of, scope=None, now=None, trend=False):
+        now = time.time() if now is None else now
+        window = self.suppress_minutes * 60
+
+        seen = set()
+        touched = set()
+        to_log = []
+        for level, msg in alerts:
+            subject, _, text = msg.partition(" | ")
+            aid = aircraft_of.get(subject)
+            # Trend alerts follow the aircraft from flight to flight, so their key has no flight.
+            key = (aid, None if trend else subject, classify(text))
+            value = alert_value(text)
+            seen.add(key)
+            entry = self.entries.get(key)
+            touched.add(key)
+            if entry is None:
+                self.seq += 1
+                entry = self.entries[key] = {
+                    "aircraft_id": key[0], "flight_id": key[1], "alert_type": key[2], "subject": subject,
+                    "level": level, "message": msg, "text": text, "value": value,
+                    "first_seen": now, "last_seen": now, "last_logged": now, "logged_value": value,
+                    "count": 1, "suppressed": 0, "escalations": 0, "active": True, "trend": trend, "seq": self.seq
+                }
+                to_log.append((level, msg))
+                continue
+
+            logged = True
+            if self._worse(entry, level, value):
+                entry["escalations"] += 1
+                to_log.append((level, f"{msg} (escalated from {entry['logged_value']:g})"))
+            elif not entry["active"] or now - entry["last_logged"] >= window:
+                to_log.append((level, msg))
+            else:
+                entry["suppressed"] += 1
+                logged = False
+            if logged:
+                entry["last_logged"] = now
+                entry["logged_value"] = value
+            entry.update(subject=subject, level=level, message=msg, text=text, value=value, last_seen=now, active=True)
+            entry["count"] += 1
+
+        cutoff = now - self.retention_hours * 3600
+        for key, entry in list(self.entries.items()):
+            if key in seen:
+                continue
+            if entry["last_seen"] < cutoff:
+                del self.entries[key]
+                touched.add(key)
+            elif entry["active"] and entry.get("trend", False) == trend and (scope is None or entry["aircraft_id" if trend else "subject"] in scope):
+                entry["active"] = False
+                touched.add(key)
+        for key in touched:
+            self._reindex(key)
+        return to_log
+
+    def _heap(self, level):
+        heap = self.heaps.get(level)
+        if heap is None or len(heap) > 2 * self.counts[level] + 64:
+            heap = [
+                order + (key,) for key, order in self.ranked.items()
+                if level is None or _LEVELS[-order[0]] == level
+            ]
+            heapq.heapify(heap)
+            self.heaps[level] = heap
+        return heap
+
+    def count(self, level=None):
+        return self.counts[level]
+
+    def top(self, n=None, level=None):
+        n = self.counts[level] if n is None else min(n, self.counts[level])
+        if not n:
+            return []
+        heap = self._heap(level)
+        items = sorted(heap) if n == self.counts[level] else heapq.nsmallest(len(heap) - self.counts[level] + n, heap)
+        out = []
+        keys = set()
+        for item in items:
+            key = item[-1]
+            # A key that left and re-entered with the same order has two live-looking items.
+            if self.ranked.get(key) == item[:-1] and key not in keys:
+                keys.add(key)
+                out.append(self.entries[key])
+                if len(out) == n:
+                    break
+        return out
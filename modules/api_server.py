@@ -0,0 +1,488 @@
+import asyncio
+import bisect
+import json
+import logging
+import threading
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from modules.log_processor import format_timestamp
+
+MAX_REQUEST_BYTES = 16 << 10
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+LEVELS = ("CRITICAL", "WARN")
+SEVERITIES = {"severe": (120, None), "moderate": (60, 120), "minor": (1, 60)}
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+_logger = logging.getLogger("api_server")
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _route_key(value):
+    origin, sep, destination = value.partition("-")
+    if not sep or not origin or not destination:
+        raise ApiError(400, f"route must look like DEL-BOM, got '{value}'")
+    return origin, destination
+
+def _int_param(params, name, default=None, minimum=0):
+    value = params.get(name)
+    if value is None:
+        return default
+    try:
+        n = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer, got '{value}'")
+    if n < minimum:
+        raise ApiError(400, f"{name} must be at least {minimum}")
+    return n
+
+def _bool_param(params, name):
+    value = params.get(name)
+    if value is None:
+        return None
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ApiError(400, f"{name} must be true or false, got '{value}'")
+
+def _page(items, params):
+    limit = min(_int_param(params, "limit", DEFAULT_LIMIT, 1), MAX_LIMIT)
+    offset = _int_param(params, "offset", 0)
+    return {"total": len(items), "offset": offset, "limit": limit, "items": items[offset:offset + limit]}
+
+def _insert(index, key, value):
+    bisect.insort(index.setdefault(key, []), value)
+
+def _remove(items, value):
+    i = bisect.bisect_left(items, value)
+    if i < len(items) and items[i] == value:
+        del items[i]
+        return i
+    return None
+
+def _discard(index, key, value):
+    items = index[key]
+    _remove(items, value)
+    if not items:
+        del index[key]
+
+class FleetState:
+    def __init__(self, flights=(), delay_results=(), health_alerts=(), crew_issues=(), load_results=(), missing_flights=()):
+        self.flights = {}
+        self.records = {}
+        self.order = []
+        self.by_route = {}
+        self.by_origin = {}
+        self.by_destination = {}
+        self.by_aircraft = {}
+        self.delay_order = []
+        self.delay_keys = []
+        self.alerts_by_flight = {}
+        self.alerts_by_aircraft = {}
+        self.crew_by_flight = {}
+        self.overbooked = []
+        self.underutilized = []
+        self.missing_flights = []
+        self.total_delay = 0
+        self.load_sum = 0
+        self.alert_counts = {}
+        self.views = {}
+        self.update(flights, delay_results, health_alerts, crew_issues, load_results, missing_flights)
+
+    def update(self, flights, delay_results, health_alerts, crew_issues, load_results, missing_flights=(), removed=()):
+        # Every flight in removed or flights loses its row, alerts, crew issues and missing entry before the given
+        # ones are added, so an update costs as much as the flights it names, not the fleet.
+        delays_by_id = {d["flight_id"]: d for d in delay_results}
+        load_by_id = {l["flight_id"]: l for l in load_results}
+        alerts_by_subject = {}
+        for lvl, msg in health_alerts:
+            subject, _, text = msg.partition(" | ")
+            alerts_by_subject.setdefault(subject, []).append((lvl, text))
+        no_delay = {"delay_min": 0, "reasons": []}
+
+        aircraft = set()
+        dropped = set(removed).union(fl["flight_id"] for fl in flights)
+        for fid in dropped:
+            aircraft.add(self._drop(fid))
+        for subject in alerts_by_subject.keys() - dropped:
+            self._drop_alerts(subject)
+            if subject in self.flights:
+                self.flights[subject]["alerts"] = []
+                aircraft.add(self.flights[subject]["aircraft_id"])
+
+        for fl in flights:
+            fid = fl["flight_id"]
+            route = fl["route"]
+            origin = route["origin"]
+            destination = route["destination"]
+            aid = fl["aircraft_id"]
+            d = delays_by_id.get(fid, no_delay)
+            flight = self.flights[fid] = {
+                "flight_id": fid,
+                "aircraft_id": aid,
+                "departure": format_timestamp(fl["timestamp"]),
+                "origin": origin,
+                "destination": destination,
+                "delay_min": d["delay_min"],
+                "delay_reasons": list(d["reasons"]),
+                "load": {k: v for k, v in load_by_id.get(fid, {}).items() if k != "flight_id"},
+                "crew_issues": [],
+                "alerts": []
+            }
+            self.records[fid] = fl
+            bisect.insort(self.order, fid)
+            _insert(self.by_route, (origin, destination), fid)
+            _insert(self.by_origin, origin, fid)
+            _insert(self.by_destination, destination, fid)
+            _insert(self.by_aircraft, aid, fid)
+            aircraft.add(aid)
+            if flight["delay_min"] > 0:
+                i = bisect.bisect_left(self.delay_order, (flight["delay_min"], fid))
+                self.delay_order.insert(i, (flight["delay_min"], fid))
+                self.delay_keys.insert(i, flight["delay_min"])
+                self.total_delay += flight["delay_min"]
+            self.load_sum += flight["load"].get("predicted_load_pct", 0)
+            if flight["load"].get("overbooking_risk"):
+                bisect.insort(self.overbooked, fid)
+            if flight["load"].get("under_utilized"):
+                bisect.insort(self.underutilized, fid)
+
+        for subject, items in alerts_by_subject.items():
+            # An alert for a flight outside this state is still listed, just without its aircraft.
+            flight = self.flights.get(subject)
+            alerts = self.alerts_by_flight[subject] = []
+            for lvl, text in items:
+                alerts.append({
+                    "level": lvl,
+                    "flight_id": subject,
+                    "aircraft_id": flight["aircraft_id"] if flight is not None else None,
+                    "message": text
+                })
+                self.alert_counts[lvl] = self.alert_counts.get(lvl, 0) + 1
+                if flight is not None:
+                    flight["alerts"].append({"level": lvl, "message": text})
+
+        for c in crew_issues:
+            fid = c["flight_id"]
+            self.crew_by_flight[fid] = {"flight_id": fid, "issues": list(c["issues"])}
+            if fid in self.flights:
+                self.flights[fid]["crew_issues"] = list(c["issues"])
+
+        for fid in missing_flights:
+            _remove(self.missing_flights, fid)
+            bisect.insort(self.missing_flights, fid)
+
+        for aid in aircraft - {None}:
+            alerts = [a for fid in self.by_aircraft.get(aid, ()) for a in self.alerts_by_flight.get(fid, ())]
+            if alerts:
+                self.alerts_by_aircraft[aid] = alerts
+            else:
+                self.alerts_by_aircraft.pop(aid, None)
+
+        self.views = {}
+        total = len(self.flights)
+        self.summary = {
+            "flights": total,
+            "delayed": len(self.delay_order),
+            "total_delay_min": self.total_delay,
+            "average_load_pct": self.load_sum / total if total else 0.0,
+            "critical_alerts": self.alert_counts.get("CRITICAL", 0),
+            "warning_alerts": self.alert_counts.get("WARN", 0),
+            "crew_issues": len(self.crew_by_flight),
+            "overbooked": len(self.overbooked),
+            "under_utilized": len(self.underutilized),
+            "missing_flights": len(self.missing_flights)
+        }
+
+    def _drop_alerts(self, fid):
+        for alert in self.alerts_by_flight.pop(fid, ()):
+            self.alert_counts[alert["level"]] -= 1
+
+    def _drop(self, fid):
+        self._drop_alerts(fid)
+        self.crew_by_flight.pop(fid, None)
+        _remove(self.missing_flights, fid)
+        flight = self.flights.pop(fid, None)
+        if flight is None:
+            return None
+        del self.records[fid]
+        _remove(self.order, fid)
+        _discard(self.by_route, (flight["origin"], flight["destination"]), fid)
+        _discard(self.by_origin, flight["origin"], fid)
+        _discard(self.by_destination, flight["destination"], fid)
+        _discard(self.by_aircraft, flight["aircraft_id"], fid)
+        if flight["delay_min"] > 0:
+            del self.delay_keys[_remove(self.delay_order, (flight["delay_min"], fid))]
+            self.total_delay -= flight["delay_min"]
+        self.load_sum -= flight["load"].get("predicted_load_pct", 0)
+        _remove(self.overbooked, fid)
+        _remove(self.underutilized, fid)
+        return flight["aircraft_id"]
+
+    def _view(self, name):
+        # Whole-fleet lists are rebuilt on the first request after an update rather than on every update.
+        view = self.views.get(name)
+        if view is None:
+            if name == "crew":
+                view = [self.crew_by_flight[fid] for fid in sorted(self.crew_by_flight)]
+            elif name == "alerts":
+                view = [a for subject in sorted(self.alerts_by_flight) for a in self.alerts_by_flight[subject]]
+            else:
+                view = {level: [] for level in LEVELS}
+                for alert in self._view("alerts"):
+                    view.setdefault(alert["level"], []).append(alert)
+            self.views[name] = view
+        return view
+
+    def _candidates(self, params):
+        sets = []
+        if "route" in params:
+            sets.append(self.by_route.get(_route_key(params["route"]), []))
+        if "origin" in params:
+            sets.append(self.by_origin.get(params["origin"], []))
+        if "destination" in params:
+            sets.append(self.by_destination.get(params["destination"], []))
+        if "aircraft" in params:
+            sets.append(self.by_aircraft.get(params["aircraft"], []))
+        if not sets:
+            return None
+        sets.sort(key=len)
+        rest = [set(s) for s in sets[1:]]
+        return [fid for fid in sets[0] if all(fid in s for s in rest)]
+
+    def _delay_range(self, params):
+        low = _int_param(params, "min_delay", 1)
+        high = _int_param(params, "max_delay")
+        severity = params.get("severity")
+        if severity is not None:
+            if severity.lower() not in SEVERITIES:
+                raise ApiError(400, f"severity must be one of {', '.join(SEVERITIES)}, got '{severity}'")
+            s_low, s_high = SEVERITIES[severity.lower()]
+            low = max(low, s_low)
+            if s_high is not None:
+                high = s_high - 1 if high is None else min(high, s_high - 1)
+        return low, high
+
+    def flight(self, fid):
+        flight = self.flights.get(fid)
+        if flight is None:
+            raise ApiError(404, f"unknown flight '{fid}'")
+        record = self.records[fid]
+        detail = dict(flight)
+        detail["record"] = record.to_dict() if hasattr(record, "to_dict") else record
+        return detail
+
+    def query_flights(self, params):
+        fids = self._candidates(params)
+        delayed = _bool_param(params, "delayed")
+        if fids is None:
+            fids = self.order
+        rows = [self.flights[fid] for fid in fids]
+        if delayed is not None:
+            rows = [f for f in rows if (f["delay_min"] > 0) == delayed]
+        return _page(rows, params)
+
+    def query_delays(self, params):
+        low, high = self._delay_range(params)
+        fids = self._candidates(params)
+        start = bisect.bisect_left(self.delay_keys, low)
+        end = len(self.delay_keys) if high is None else bisect.bisect_right(self.delay_keys, high)
+        order = self.delay_order[start:end]
+        if fids is not None:
+            fids = set(fids)
+            order = [item for item in order if item[1] in fids]
+        rows = []
+        for delay_min, fid in reversed(order):
+            f = self.flights[fid]
+            rows.append({
+                "flight_id": fid,
+                "aircraft_id": f["aircraft_id"],
+                "origin": f["origin"],
+                "destination": f["destination"],
+                "delay_min": delay_min,
+                "reasons": f["delay_reasons"]
+            })
+        return _page(rows, params)
+
+    def query_alerts(self, params):
+        level = params.get("level") or params.get("severity")
+        if level is not None:
+            level = level.upper()
+            if level == "WARNING":
+                level = "WARN"
+            if level not in self._view("levels"):
+                raise ApiError(400, f"level must be one of {', '.join(LEVELS)}, got '{level}'")
+        if "flight" in params:
+            alerts = self.alerts_by_flight.get(params["flight"], [])
+        elif "aircraft" in params:
+            alerts = self.alerts_by_aircraft.get(params["aircraft"], [])
+        elif level is not None:
+            alerts = self._view("levels")[level]
+        else:
+            alerts = self._view("alerts")
+        if level is not None:
+            alerts = [a for a in alerts if a["level"] == level]
+        fids = self._candidates({k: v for k, v in params.items() if k in ("route", "origin", "destination")})
+        if fids is not None:
+            fids = set(fids)
+            alerts = [a for a in alerts if a["flight_id"] in fids]
+        return _page(alerts, params)
+
+    def query_crew(self, params):
+        fids = self._candidates(params)
+        crew = self._view("crew")
+        if fids is not None:
+            fids = set(fids)
+            crew = [c for c in crew if c["flight_id"] in fids]
+        return _page(crew, params)
+
+    def query_loads(self, params):
+        overbooked = _bool_param(params, "overbooked")
+        underutilized = _bool_param(params, "under_utilized")
+        if overbooked:
+            fids = self.overbooked
+        elif underutilized:
+            fids = self.underutilized
+        else:
+            fids = self.order
+        candidates = self._candidates(params)
+        if candidates is not None:
+            candidates = set(candidates)
+            fids = [fid for fid in fids if fid in candidates]
+        rows = [{"flight_id": fid, **self.flights[fid]["load"]} for fid in fids]
+        if overbooked is False:
+            rows = [r for r in rows if not r.get("overbooking_risk")]
+        if underutilized is False:
+            rows = [r for r in rows if not r.get("under_utilized")]
+        return _page(rows, params)
+
+class ApiServer:
+    def __init__(self, host="127.0.0.1", port=8787):
+        self.host = host
+        self.port = port
+        self.state = None
+        self.fleet = FleetState()
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.requests = 0
+
+    def publish(self, state):
+        self.state = self.fleet = state
+
+    def update(self, *args, **kwargs):
+        # The update runs on the server loop between two requests, so a request never sees half of it.
+        def apply():
+            self.fleet.update(*args, **kwargs)
+            self.state = self.fleet
+
+        if self.loop is None:
+            apply()
+        else:
+            self.loop.call_soon_threadsafe(apply)
+
+    def start(self):
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                self.server = loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.host, self.port, limit=MAX_REQUEST_BYTES, backlog=1024))
+            except OSError as e:
+                errors.append(e)
+                ready.set()
+                loop.close()
+                return
+            self.port = self.server.sockets[0].getsockname()[1]
+            self.loop = loop
+            ready.set()
+            try:
+                loop.run_forever()
+            finally:
+                self.server.close()
+                loop.run_until_complete(self.server.wait_closed())
+                loop.close()
+
+        self.thread = threading.Thread(target=run, name="api-server", daemon=True)
+        self.thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.loop = None
+
+    def dispatch(self, method, target):
+        if method != "GET":
+            raise ApiError(405, f"method {method} not allowed")
+        url = urlsplit(target)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = [unquote(p) for p in url.path.strip("/").split("/") if p]
+
+        if parts == ["status"]:
+            return {"ready": self.state is not None, "requests": self.requests}
+        state = self.state
+        if state is None:
+            raise ApiError(503, "no evaluated fleet state yet")
+        if parts == ["summary"]:
+            return state.summary
+        if parts == ["flights"]:
+            return state.query_flights(params)
+        if len(parts) == 2 and parts[0] == "flights":
+            return state.flight(parts[1])
+        if parts == ["delays"]:
+            return state.query_delays(params)
+        if parts == ["alerts"]:
+            return state.query_alerts(params)
+        if parts == ["crew"]:
+            return state.query_crew(params)
+        if parts == ["loads"]:
+            return state.query_loads(params)
+        if parts == ["missing"]:
+            return _page(state.missing_flights, params)
+        raise ApiError(404, f"unknown path '{url.path}'")
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        self.requests += 1
+        try:
+            try:
+                method, target, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            except ValueError:
+                raise ApiError(400, "malformed request line")
+            status, body = 200, self.dispatch(method, target)
+            payload = json.dumps(body, default=str).encode("utf-8")
+        except ApiError as e:
+            status, payload = e.status, json.dumps({"error": str(e)}).encode("utf-8")
+        except Exception:
+            _logger.exception("API request failed: %s", head.split(b"\r\n", 1)[0].decode("latin-1"))
+            status, payload = 500, json.dumps({"error": "internal server error"}).encode("utf-8")
+
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
@@ -0,0 +1,278 @@
+import hashlib
+import os
+import sqlite3
+from datetime import date, datetime
+
+from modules.log_processor import format_timestamp
+
+TABLES = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    archived_at TEXT NOT NULL,
+    flights INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS flights (
+    flight_date TEXT NOT NULL,
+    flight_id TEXT NOT NULL,
+    departure TEXT NOT NULL,
+    aircraft_id TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    delay_min INTEGER NOT NULL,
+    predicted_passengers INTEGER,
+    predicted_load_pct REAL,
+    overbooking_risk INTEGER,
+    under_utilized INTEGER,
+    crew_compliant INTEGER NOT NULL,
+    run_id INTEGER NOT NULL,
+    PRIMARY KEY (flight_date, flight_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS flight_digests (
+    flight_date TEXT NOT NULL,
+    flight_id TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    PRIMARY KEY (flight_date, flight_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS delay_reasons (
+    flight_date TEXT NOT NULL,
+    flight_id TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    reason_type TEXT NOT NULL,
+    reason TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS health_alerts (
+    flight_date TEXT NOT NULL,
+    flight_id TEXT,
+    aircraft_id TEXT NOT NULL,
+    origin TEXT,
+    destination TEXT,
+    level TEXT NOT NULL,
+    alert_type TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS crew_issues (
+    flight_date TEXT NOT NULL,
+    flight_id TEXT NOT NULL,
+    origin TEXT NOT NULL,
+    destination TEXT NOT NULL,
+    issue TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS flights_route ON flights (origin, destination, flight_date);
+CREATE INDEX IF NOT EXISTS flights_aircraft ON flights (aircraft_id, flight_date);
+CREATE INDEX IF NOT EXISTS delay_reasons_flight ON delay_reasons (flight_date, flight_id);
+CREATE INDEX IF NOT EXISTS delay_reasons_route ON delay_reasons (origin, destination, reason_type, flight_date);
+CREATE INDEX IF NOT EXISTS delay_reasons_type ON delay_reasons (reason_type, flight_date);
+CREATE INDEX IF NOT EXISTS health_alerts_flight ON health_alerts (flight_date, flight_id);
+CREATE INDEX IF NOT EXISTS health_alerts_aircraft ON health_alerts (aircraft_id, flight_date);
+CREATE INDEX IF NOT EXISTS health_alerts_route ON health_alerts (origin, destination, alert_type, flight_date);
+CREATE INDEX IF NOT EXISTS health_alerts_type ON health_alerts (alert_type, flight_date);
+CREATE INDEX IF NOT EXISTS crew_issues_flight ON crew_issues (flight_date, flight_id);
+CREATE INDEX IF NOT EXISTS crew_issues_route ON crew_issues (origin, destination, flight_date);
+"""
+
+FLIGHT_COLUMNS = (
+    "flight_date", "flight_id", "departure", "aircraft_id", "origin", "destination", "delay_min",
+    "predicted_passengers", "predicted_load_pct", "overbooking_risk", "under_utilized", "crew_compliant", "run_id"
+)
+
+FLIGHT_UPSERT = (
+    f"INSERT INTO flights ({', '.join(FLIGHT_COLUMNS)}) VALUES ({', '.join('?' * len(FLIGHT_COLUMNS))})"
+    " ON CONFLICT (flight_date, flight_id) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in FLIGHT_COLUMNS[2:])
+)
+
+QUERY_TABLES = {
+    "flights": "flights",
+    "delays": "delay_reasons",
+    "alerts": "health_alerts",
+    "crew": "crew_issues"
+}
+
+FILTERS = {
+    "flights": ("flight_id", "aircraft_id", "origin", "destination"),
+    "delays": ("flight_id", "origin", "destination", "reason_type"),
+    "alerts": ("flight_id", "aircraft_id", "origin", "destination", "level", "alert_type"),
+    "crew": ("flight_id", "origin", "destination")
+}
+
+def classify(text):
+    words = []
+    for word in text.split():
+        if not word.isalpha():
+            break
+        words.append(word.lower())
+    return "_".join(words) or "other"
+
+def _day(value):
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"expected a date or YYYY-MM-DD string, got {type(value).__name__}")
+
+class FlightArchive:
+    def __init__(self, path="output/archive/flights.db"):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(TABLES)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def archive_run(self, flights, delay_results, health_alerts, crew_issues, load_results):
+        delays_by_id = {d["flight_id"]: d for d in delay_results}
+        load_by_id = {l["flight_id"]: l for l in load_results}
+        crew_by_id = {c["flight_id"]: c for c in crew_issues}
+        no_delay = {"delay_min": 0, "reasons": []}
+
+        keys = {}
+        flight_rows = {}
+        reason_rows = {}
+        crew_rows = {}
+        alert_rows = {}
+        for fl in flights:
+            fid = fl["flight_id"]
+            aid = fl["aircraft_id"]
+            route = fl["route"]
+            origin = route["origin"]
+            destination = route["destination"]
+            departure = format_timestamp(fl["timestamp"])
+            day = departure[:10]
+            keys[fid] = (day, fid, aid, origin, destination)
+
+            d = delays_by_id.get(fid, no_delay)
+            l = load_by_id.get(fid, {})
+            c = crew_by_id.get(fid)
+            flight_rows[fid] = (
+                day, fid, departure, aid, origin, destination, d["delay_min"],
+                l.get("predicted_passengers"), l.get("predicted_load_pct"),
+                l.get("overbooking_risk"), l.get("under_utilized"), c is None
+            )
+            reason_rows[fid] = [(day, fid, origin, destination, classify(r), r) for r in d["reasons"]]
+            crew_rows[fid] = [(day, fid, origin, destination, issue) for issue in c["issues"]] if c is not None else []
+            alert_rows[fid] = []
+
+        for lvl, msg in health_alerts:
+            subject, _, text = msg.partition(" | ")
+            day, fid, aid, origin, destination = keys[subject]
+            alert_rows[fid].append((day, fid, aid, origin, destination, lvl, classify(text), msg))
+
+        digests = [
+            k[:2] + (hashlib.blake2b(repr((flight_rows[fid], reason_rows[fid], alert_rows[fid], crew_rows[fid])).encode(), digest_size=16).hexdigest(),)
+            for fid, k in keys.items()
+        ]
+
+        with self.conn:
+            cur = self.conn.cursor()
+            # Only flights whose rows differ from what is archived are written again.
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS run_keys (flight_date TEXT, flight_id TEXT, digest TEXT)")
+            cur.execute("DELETE FROM run_keys")
+            cur.executemany("INSERT INTO run_keys VALUES (?, ?, ?)", digests)
+            cur.execute(
+                "DELETE FROM run_keys WHERE (flight_date, flight_id, digest) IN"
+                " (SELECT flight_date, flight_id, digest FROM flight_digests)"
+            )
+            changed = [row[0] for row in cur.execute("SELECT flight_id FROM run_keys")]
+            run_id = cur.execute(
+                "INSERT INTO runs (archived_at, flights) VALUES (?, ?)",
+                (datetime.now().isoformat(sep=" ", timespec="seconds"), len(changed))
+            ).lastrowid
+            for table in ("delay_reasons", "health_alerts", "crew_issues"):
+                cur.execute(f"DELETE FROM {table} WHERE (flight_date, flight_id) IN (SELECT flight_date, flight_id FROM run_keys)")
+            cur.executemany(FLIGHT_UPSERT, [flight_rows[fid] + (run_id,) for fid in changed])
+            cur.execute(
+                "INSERT INTO flight_digests SELECT flight_date, flight_id, digest FROM run_keys WHERE true"
+                " ON CONFLICT (flight_date, flight_id) DO UPDATE SET digest = excluded.digest"
+            )
+            cur.executemany("INSERT INTO delay_reasons VALUES (?, ?, ?, ?, ?, ?)", [r for fid in changed for r in reason_rows[fid]])
+            cur.executemany("INSERT INTO health_alerts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [r for fid in changed for r in alert_rows[fid]])
+            cur.executemany("INSERT INTO crew_issues VALUES (?, ?, ?, ?, ?)", [r for fid in changed for r in crew_rows[fid]])
+        return run_id
+
+    def _where(self, kind, start, end, filters):
+        if kind not in QUERY_TABLES:
+            raise ValueError(f"unknown archive table '{kind}' (expected one of {', '.join(QUERY_TABLES)})")
+        clauses = []
+        params = []
+        for name, value in filters.items():
+            if name not in FILTERS[kind]:
+                raise ValueError(f"cannot filter {kind} by '{name}'")
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set, frozenset)):
+                value = list(value)
+                clauses.append(f"{name} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{name} = ?")
+                params.append(value)
+        if start is not None:
+            clauses.append("flight_date >= ?")
+            params.append(_day(start))
+        if end is not None:
+            clauses.append("flight_date <= ?")
+            params.append(_day(end))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return QUERY_TABLES[kind], where, params
+
+    def query(self, kind, start=None, end=None, limit=None, **filters):
+        table, where, params = self._where(kind, start, end, filters)
+        sql = f"SELECT * FROM {table}{where} ORDER BY flight_date, flight_id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def count(self, kind, by=(), start=None, end=None, **filters):
+        table, where, params = self._where(kind, start, end, filters)
+        by = (by,) if isinstance(by, str) else tuple(by)
+        columns = self.columns(table)
+        for name in by:
+            if name not in columns:
+                raise ValueError(f"cannot group {kind} by '{name}'")
+        if not by:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+        group = ", ".join(by)
+        rows = self.conn.execute(f"SELECT {group}, COUNT(*) FROM {table}{where} GROUP BY {group}", params)
+        if len(by) == 1:
+            return {row[0]: row[1] for row in rows}
+        return {tuple(row[:-1]): row[-1] for row in rows}
+
+    def delay_minutes(self, by=(), start=None, end=None, **filters):
+        _, where, params = self._where("flights", start, end, filters)
+        by = (by,) if isinstance(by, str) else tuple(by)
+        columns = self.columns("flights")
+        for name in by:
+            if name not in columns:
+                raise ValueError(f"cannot group flights by '{name}'")
+        select = "COUNT(*), SUM(delay_min > 0), COALESCE(SUM(delay_min), 0)"
+        if not by:
+            total, delayed, minutes = self.conn.execute(f"SELECT {select} FROM flights{where}", params).fetchone()
+            return {"flights": total, "delayed": delayed or 0, "delay_min": minutes}
+        group = ", ".join(by)
+        result = {}
+        for row in self.conn.execute(f"SELECT {group}, {select} FROM flights{where} GROUP BY {group}", params):
+            key = row[0] if len(by) == 1 else tuple(row[:len(by)])
+            result[key] = {"flights": row[-3], "delayed": row[-2], "delay_min": row[-1]}
+        return result
+
+    def columns(self, table):
+        return [row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")]
+
+    def date_range(self):
+        return tuple(self.conn.execute("SELECT MIN(flight_date), MAX(flight_date) FROM flights").fetchone())
@@ -0,0 +1,371 @@
+import json
+from collections.abc import Mapping
+
+import numpy as np
+
+from modules import rule_engine
+
+REQUIRED = object()
+
+NUMBER = (int, float)
+INT = (int,)
+BOOL = (bool,)
+STR = (str,)
+SECTION = (dict,)
+LIST = (list,)
+
+SCHEMA = {
+    "thresholds": {
+        "crosswind_knots": (NUMBER, REQUIRED),
+        "visibility_meters": (NUMBER, REQUIRED),
+        "engine_thrust_deviation": (NUMBER, REQUIRED),
+        "engine_thrust_baseline": (NUMBER, 100),
+        "cabin_pressure_drop": (NUMBER, REQUIRED),
+        "cabin_pressure_min": (NUMBER, REQUIRED),
+        "cabin_pressure_drop_rate": (NUMBER, None),
+        "cabin_sustained_drop": (NUMBER, None),
+        "cabin_sustained_minutes": (NUMBER, 15),
+        "cabin_pressure_outliers": (NUMBER, None),
+        "engine_vibration": (NUMBER, REQUIRED),
+        "turbulence_severe": (NUMBER, REQUIRED),
+        "fuel_burn_deviation": (NUMBER, REQUIRED),
+        "fuel_burn_baseline": (NUMBER, 2200),
+        "cabin_temp_high": (NUMBER, REQUIRED),
+        "runway_queue_threshold": (NUMBER, REQUIRED),
+        "boarding_time_threshold": (NUMBER, REQUIRED)
+    },
+    "crew_rules": {
+        "min_rest_hours": (NUMBER, REQUIRED),
+        "max_daily_hours": (NUMBER, REQUIRED),
+        "min_pilots": (INT, REQUIRED),
+        "min_cabin_crew": (INT, REQUIRED),
+        "assumed_flight_hours": (NUMBER, 3),
+        "cross_flight_checks": (BOOL, False)
+    },
+    "passenger_rules": {
+        "overbooking_threshold_pct": (NUMBER, REQUIRED),
+        "under_utilization_pct": (NUMBER, REQUIRED),
+        "moving_avg_window": (INT, 7)
+    },
+    "crew_reassignment": {
+        "enabled": (BOOL, False),
+        "time_budget_sec": (NUMBER, 2.0)
+    },
+    "load_history": {
+        "enabled": (BOOL, False),
+        "path": (STR, "output/state/load_history.pkl")
+    },
+    "health_trends": {
+        "enabled": (BOOL, False),
+        "state_path": (STR, "output/state/health_store.pkl"),
+        "window": (INT, 50),
+        "ewma_alpha": (NUMBER, 0.2),
+        "min_samples": (INT, 10),
+        "thrust_trend_min": (NUMBER, None),
+        "vibration_trend_max": (NUMBER, None),
+        "fuel_burn_trend_max": (NUMBER, None),
+        "cabin_pressure_trend_min": (NUMBER, None),
+        "cabin_temp_trend_max": (NUMBER, None),
+        "zscore_max": (NUMBER, 3.0)
+    },
+    "ingestion": {
+        "mode": (STR, "batch"),
+        "chunk_size_bytes": (INT, 1 << 20),
+        "stream_idle_window_min": (NUMBER, 60),
+        "workers": (INT, 1),
+        "split_bytes": (INT, 64 << 20),
+        "epoch_timestamps": (BOOL, False),
+        "compact_records": (BOOL, False),
+        "join": (STR, "index"),
+        "scanner": (STR, "lines"),
+        "state_path": (STR, "output/state/ingest_state.pkl")
+    },
+    "evaluation": {
+        "mode": (STR, "scalar")
+    },
+    "cache": {
+        "enabled": (BOOL, False),
+        "dir": (STR, "output/cache"),
+        "max_mb": (INT, 512)
+    },
+    "service": {
+        "poll_interval_sec": (NUMBER, 1.0),
+        "refresh_interval_sec": (NUMBER, 60),
+        "latency_target_sec": (NUMBER, 2.0)
+    },
+    "api": {
+        "enabled": (BOOL, False),
+        "host": (STR, "127.0.0.1"),
+        "port": (INT, 8787)
+    },
+    "dashboard": {
+        "top_delays": (INT, None),
+        "changed_panels_only": (BOOL, False)
+    },
+    "alert_logging": {
+        "async": (BOOL, False),
+        "queue_size": (INT, 10000),
+        "overflow": (STR, "drop"),
+        "batch_size": (INT, 256),
+        "flush_interval_sec": (NUMBER, 1.0)
+    },
+    "alert_store": {
+        "enabled": (BOOL, False),
+        "path": (STR, "output/state/alert_store.pkl"),
+        "suppress_minutes": (NUMBER, 60),
+        "escalate_pct": (NUMBER, 10.0),
+        "retention_hours": (NUMBER, 168)
+    },
+    "report": {
+        "stream": (BOOL, False),
+        "flush_kb": (INT, 1024)
+    },
+    "instrumentation": {
+        "enabled": (BOOL, False),
+        "trace_memory": (BOOL, False),
+        "export_dir": (STR, "output/metrics")
+    },
+    "overrides": {
+        "routes": (SECTION, {}),
+        "aircraft_types": (SECTION, {})
+    },
+    "rules": {
+        "enabled": (BOOL, False),
+        "delay": (LIST, None),
+        "health": (LIST, None)
+    },
+    "archive": {
+        "enabled": (BOOL, False),
+        "path": (STR, "output/archive/flights.db")
+    }
+}
+
+REQUIRED_SECTIONS = ("thresholds", "crew_rules", "passenger_rules")
+
+CHOICES = {
+    ("ingestion", "mode"): ("batch", "stream", "incremental"),
+    ("ingestion", "join"): ("index", "hash", "merge"),
+    ("ingestion", "scanner"): ("lines", "mmap"),
+    ("evaluation", "mode"): ("scalar", "batch"),
+    ("alert_logging", "overflow"): ("drop", "block")
+}
+
+POSITIVE = {
+    ("passenger_rules", "moving_avg_window"),
+    ("ingestion", "workers"),
+    ("ingestion", "chunk_size_bytes"),
+    ("ingestion", "split_bytes"),
+    ("health_trends", "window"),
+    ("health_trends", "min_samples"),
+    ("alert_logging", "queue_size"),
+    ("alert_logging", "batch_size"),
+    ("alert_store", "retention_hours")
+}
+
+class ConfigError(ValueError):
+    pass
+
+class Rules(dict):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__dict__.update((k, v) for k, v in self.items() if type(k) is str and not hasattr(dict, k))
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __setattr__ = __delattr__ = _read_only
+    clear = pop = popitem = setdefault = update = __ior__ = _read_only
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+    def merge(self, changes):
+        return Rules({**self, **changes})
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return Rules({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+TYPE_NAMES = {NUMBER: "number", INT: "integer", BOOL: "boolean", STR: "string", SECTION: "object", LIST: "array"}
+
+def _check_value(where, value, types, default, errors):
+    if value is None and default is None:
+        return True
+    if type(value) is bool and bool not in types or not isinstance(value, types):
+        errors.append(f"{where}: expected {TYPE_NAMES[types]}, got {type(value).__name__}")
+        return False
+    return True
+
+def _check_section(name, raw, errors):
+    spec = SCHEMA[name]
+    if not isinstance(raw, dict):
+        errors.append(f"{name}: expected object, got {type(raw).__name__}")
+        return {}
+    out = {}
+    for key, value in raw.items():
+        if key not in spec:
+            errors.append(f"{name}.{key}: unknown key")
+            continue
+        types, default = spec[key]
+        if not _check_value(f"{name}.{key}", value, types, default, errors):
+            continue
+        choices = CHOICES.get((name, key))
+        if choices and value not in choices:
+            errors.append(f"{name}.{key}: expected one of {', '.join(choices)}, got {value!r}")
+        elif (name, key) in POSITIVE and value < 1:
+            errors.append(f"{name}.{key}: must be at least 1, got {value}")
+        out[key] = value
+    for key, (types, default) in spec.items():
+        if key in raw:
+            continue
+        if default is REQUIRED:
+            errors.append(f"{name}.{key}: missing required key")
+        else:
+            out[key] = default
+    return out
+
+def _check_overrides(kind, overrides, errors):
+    checked = {}
+    for name, section in overrides.items():
+        where = f"overrides.{kind}.{name}"
+        if kind == "routes" and len(name.split("-")) != 2:
+            errors.append(f"{where}: route must be ORIGIN-DESTINATION")
+            continue
+        if not isinstance(section, dict) or set(section) - {"thresholds"}:
+            errors.append(f"{where}: only a thresholds section can be overridden")
+            continue
+        thresholds = section.get("thresholds", {})
+        out = {}
+        for key, value in thresholds.items():
+            if key not in SCHEMA["thresholds"]:
+                errors.append(f"{where}.thresholds.{key}: unknown key")
+            elif _check_value(f"{where}.thresholds.{key}", value, NUMBER, REQUIRED, errors):
+                out[key] = value
+        checked[name] = out
+    return checked
+
+def validate_config(raw):
+    errors = []
+    if not isinstance(raw, dict):
+        raise ConfigError(f"configuration must be an object, got {type(raw).__name__}")
+    for name in raw:
+        if name not in SCHEMA:
+            errors.append(f"{name}: unknown section")
+    sections = {}
+    for name in SCHEMA:
+        if name not in raw and name in REQUIRED_SECTIONS:
+            errors.append(f"{name}: missing required section")
+            continue
+        sections[name] = _check_section(name, raw.get(name, {}), errors)
+    overrides = sections.get("overrides", {})
+    for kind in ("routes", "aircraft_types"):
+        if kind in overrides:
+            overrides[kind] = _check_overrides(kind, overrides[kind], errors)
+    if errors:
+        raise ConfigError("invalid configuration:\n  - " + "\n  - ".join(errors))
+    return sections
+
+def aircraft_type(aircraft_id):
+    return aircraft_id.rsplit("-", 1)[0] if aircraft_id else aircraft_id
+
+class ThresholdIndex:
+    def __init__(self, base, routes=None, aircraft_types=None):
+        self.base = base
+        self.routes = {tuple(r.split("-")): o for r, o in (routes or {}).items()}
+        self.aircraft_types = dict(aircraft_types or {})
+        self.by_key = {}
+        for atype, o in self.aircraft_types.items():
+            self.by_key[(None, atype)] = base.merge(o)
+        for route, o in self.routes.items():
+            self.by_key[(route, None)] = base.merge(o)
+            for atype, t in self.aircraft_types.items():
+                self.by_key[(route, atype)] = base.merge(t).merge(o)
+
+    def resolve(self, route=None, atype=None):
+        if route not in self.routes:
+            route = None
+        if atype not in self.aircraft_types:
+            atype = None
+        return self.by_key.get((route, atype), self.base)
+
+    def for_flight(self, flight):
+        if not self.by_key:
+            return self.base
+        r = flight["route"]
+        return self.resolve((r["origin"], r["destination"]), aircraft_type(flight["aircraft_id"]))
+
+    def for_fleet(self, flights):
+        if not self.by_key:
+            return self.base
+        resolved = [self.for_flight(fl) for fl in flights]
+        keys = {k for o in self.routes.values() for k in o} | {k for o in self.aircraft_types.values() for k in o}
+        columns = {}
+        for k in keys:
+            values = [t[k] for t in resolved]
+            # A threshold that is null outside its overrides becomes NaN, which no comparison matches.
+            columns[k] = np.array(values, dtype=np.float64 if None in values else None)
+        return self.base.merge(columns)
+
+class Config(Rules):
+    def __init__(self, sections, source=None, rule_set=None):
+        super().__init__({name: _freeze(s) for name, s in sections.items()})
+        overrides = self["overrides"]
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "rule_set", rule_set)
+        object.__setattr__(self, "threshold_index", ThresholdIndex(
+            self["thresholds"], overrides["routes"], overrides["aircraft_types"]))
+
+    def __reduce__(self):
+        return (compile_config, (self.source,))
+
+def _derive_passenger(passenger):
+    passenger["overbooking_limit_factor"] = 1 + passenger["overbooking_threshold_pct"] / 100
+
+def _derive_crew(crew):
+    crew["min_rest_seconds"] = crew["min_rest_hours"] * 3600
+    crew["assumed_flight_seconds"] = crew["assumed_flight_hours"] * 3600
+
+DERIVED = {
+    "passenger_rules": _derive_passenger,
+    "crew_rules": _derive_crew
+}
+
+def _derive(sections):
+    for name, derive in DERIVED.items():
+        derive(sections[name])
+
+def compile_section(name, raw):
+    if isinstance(raw, Rules) or not isinstance(raw, Mapping):
+        return raw
+    errors = []
+    section = _check_section(name, dict(raw), errors)
+    if errors:
+        raise ConfigError("invalid configuration:\n  - " + "\n  - ".join(errors))
+    if name in DERIVED:
+        DERIVED[name](section)
+    return _freeze(section)
+
+def compile_config(raw):
+    if isinstance(raw, Config):
+        return raw
+    sections = validate_config(raw)
+    _derive(sections)
+    rules = sections["rules"]
+    rule_set = None
+    if rules["enabled"]:
+        try:
+            rule_set = rule_engine.compile_rules(rules["delay"], rules["health"], SCHEMA["thresholds"])
+        except rule_engine.RuleError as e:
+            raise ConfigError(f"invalid configuration:\n  - rules.{e}") from None
+    return Config(sections, raw, rule_set)
+
+def load_config(path="airline_config.json"):
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            raw = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ConfigError(f"{path} is not valid JSON: {e}") from None
+    return compile_config(raw)
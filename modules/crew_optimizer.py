@@ -1,12 +1,22 @@
+import bisect
+import heapq
+import time
+
+import numpy as np
+
+from modules.log_processor import timestamp_seconds
+from modules.config_loader import compile_section
+
 def evaluate_crew(flight, crew_rules):
+    crew_rules = compile_section("crew_rules", crew_rules)
     pilots = flight["crew"]["pilots"]
     cabin = flight["crew"]["cabin_crew"]
 
-    min_p = crew_rules["min_pilots"]
-    min_c = crew_rules["min_cabin_crew"]
-    min_rest = crew_rules["min_rest_hours"]
-    max_daily = crew_rules["max_daily_hours"]
-    flight_hours = crew_rules.get("assumed_flight_hours", 3)
+    min_p = crew_rules.min_pilots
+    min_c = crew_rules.min_cabin_crew
+    min_rest = crew_rules.min_rest_hours
+    max_daily = crew_rules.max_daily_hours
+    flight_hours = crew_rules.assumed_flight_hours
 
     reasons = []
     ok = True
@@ -29,3 +39,323 @@ def evaluate_crew(flight, crew_rules):
             reasons.append(f"Pilot {p.get('id')} duty limit risk ({p.get('hours_worked')}h)")
 
     return ok, reasons
+
+def evaluate_crew_batch(cols, crew_rules):
+    min_p = crew_rules.min_pilots
+    min_c = crew_rules.min_cabin_crew
+    min_rest = crew_rules.min_rest_hours
+    max_daily = crew_rules.max_daily_hours
+    flight_hours = crew_rules.assumed_flight_hours
+
+    pilot_short = cols["pilot_count"] < min_p
+    cabin_short = cols["cabin_crew_count"] < min_c
+
+    rest_bad = cols["pilot_last_rest"] < min_rest
+    duty_bad = cols["pilot_hours_worked"] + flight_hours > max_daily
+    pilot_bad = rest_bad | duty_bad
+
+    failing = pilot_short | cabin_short
+    failing[cols["pilot_flight"][pilot_bad]] = True
+
+    pilot_flight = cols["pilot_flight"].tolist()
+    pilot_rest = cols["pilot_last_rest"].tolist()
+    pilot_hours = cols["pilot_hours_worked"].tolist()
+    rest_bad = rest_bad.tolist()
+    duty_bad = duty_bad.tolist()
+
+    bad_by_flight = {}
+    for j in np.flatnonzero(pilot_bad).tolist():
+        bad_by_flight.setdefault(pilot_flight[j], []).append(j)
+
+    pilot_count = cols["pilot_count"].tolist()
+    cabin_count = cols["cabin_crew_count"].tolist()
+    pilot_short = pilot_short.tolist()
+    cabin_short = cabin_short.tolist()
+
+    issues = []
+    for i in np.flatnonzero(failing).tolist():
+        reasons = []
+        if pilot_short[i]:
+            reasons.append(f"Pilot shortage ({pilot_count[i]}/{min_p})")
+        if cabin_short[i]:
+            reasons.append(f"Cabin crew shortage ({cabin_count[i]}/{min_c})")
+        for j in bad_by_flight.get(i, []):
+            pid = cols["pilot_id"][j]
+            if rest_bad[j]:
+                reasons.append(f"Pilot {pid} rest non-compliant ({pilot_rest[j]}h)")
+            if duty_bad[j]:
+                reasons.append(f"Pilot {pid} duty limit risk ({pilot_hours[j]}h)")
+        issues.append({"flight_id": cols["flight_id"][i], "issues": reasons})
+
+    return issues
+
+class CrewRoster:
+    def __init__(self, crew_rules):
+        self.min_rest = crew_rules.min_rest_seconds
+        self.max_daily = crew_rules.max_daily_hours
+        self.flight_secs = crew_rules.assumed_flight_seconds
+        self.assignments = {}
+        self.violations = {}
+        self.flight_issues = {}
+        self._duty = {}
+        self._flights = {}
+        self._members = {}
+        self._slot_issues = {}
+
+    @classmethod
+    def from_schedule(cls, crew, departures, crew_rules):
+        roster = cls(crew_rules)
+        roster.update(crew, departures)
+        return roster
+
+    def update(self, crew, departures, removed=()):
+        # Each crew member's duty history only depends on their own flights, so only the members on the
+        # removed or given flights are replayed. Returns the flights whose issues changed.
+        members = set()
+        changed = set()
+        for fid in [*removed, *crew]:
+            old = self._flights.pop(fid, None)
+            if old is not None:
+                changed.add(fid)
+                for cid, _, _ in old[1]:
+                    self._members[cid].discard(fid)
+                    members.add(cid)
+        for fid, c in crew.items():
+            dep = departures.get(fid)
+            if dep is None:
+                continue
+            slots = [(p.get("id"), "Pilot", p.get("hours_worked", 0)) for p in c["pilots"]]
+            slots += [(m.get("id"), "Cabin crew", m.get("hours_worked", 0)) for m in c["cabin_crew"]]
+            self._flights[fid] = (timestamp_seconds(dep), slots)
+            changed.add(fid)
+            for cid, _, _ in slots:
+                self._members.setdefault(cid, set()).add(fid)
+                members.add(cid)
+
+        for cid in members:
+            changed.update(fid for fid, _ in self._slot_issues.pop(cid, {}))
+            self.assignments.pop(cid, None)
+            self.violations.pop(cid, None)
+            self._duty.pop(cid, None)
+            fids = self._members.get(cid)
+            if not fids:
+                self._members.pop(cid, None)
+                continue
+            entries = sorted((self._flights[fid][0], fid, k) for fid in fids
+                             for k, slot in enumerate(self._flights[fid][1]) if slot[0] == cid)
+            for dep, fid, k in entries:
+                _, role, prior_hours = self._flights[fid][1][k]
+                self._assign(cid, role, fid, dep, prior_hours, k)
+            changed.update(fid for fid, _ in self._slot_issues.get(cid, {}))
+
+        touched = set()
+        for fid in changed:
+            flight = self._flights.get(fid)
+            issues = []
+            if flight is not None:
+                for k, (cid, _, _) in enumerate(flight[1]):
+                    issues.extend(self._slot_issues.get(cid, {}).get((fid, k), ()))
+            if issues == self.flight_issues.get(fid, []):
+                continue
+            touched.add(fid)
+            if issues:
+                self.flight_issues[fid] = issues
+            else:
+                del self.flight_issues[fid]
+        return touched
+
+    @classmethod
+    def from_flights(cls, flights, crew_rules):
+        crew = {}
+        departures = {}
+        for fl in flights:
+            crew[fl["flight_id"]] = fl["crew"]
+            departures[fl["flight_id"]] = fl["timestamp"]
+        return cls.from_schedule(crew, departures, crew_rules)
+
+    def _assign(self, crew_id, role, fid, dep, prior_hours, slot):
+        end = dep + self.flight_secs
+        history = self.assignments.get(crew_id)
+        if history is None:
+            history = self.assignments[crew_id] = []
+            duty = self._duty[crew_id] = [dep - prior_hours * 3600, 0]
+            rest = None
+        else:
+            duty = self._duty[crew_id]
+            prev = history[-1]
+            rest = dep - prev["end"]
+            if rest < 0:
+                self._violation(crew_id, fid, slot, f"{role} {crew_id} double-booked with {prev['flight_id']}")
+            elif rest >= self.min_rest:
+                duty[0] = dep
+                duty[1] = 0
+
+        duty[1] += 1
+        duty_hours = (end - duty[0]) / 3600
+        history.append({
+            "flight_id": fid,
+            "role": role,
+            "departure": dep,
+            "end": end,
+            "rest_before_hours": None if rest is None else rest / 3600,
+            "duty_hours": duty_hours
+        })
+
+        if duty[1] > 1 and duty_hours > self.max_daily:
+            self._violation(crew_id, fid, slot, f"{role} {crew_id} cumulative duty {duty_hours:.1f}h over {duty[1]} flights")
+
+    def _violation(self, crew_id, fid, slot, message):
+        self.violations.setdefault(crew_id, []).append({"flight_id": fid, "issue": message})
+        self._slot_issues.setdefault(crew_id, {}).setdefault((fid, slot), []).append(message)
+
+def _duty_period(intervals, k, min_rest):
+    lo = k
+    while lo > 0 and intervals[lo][0] - intervals[lo - 1][1] < min_rest:
+        lo -= 1
+    hi = k
+    while hi + 1 < len(intervals) and intervals[hi + 1][0] - intervals[hi][1] < min_rest:
+        hi += 1
+    return lo, hi
+
+def _try_assign(member, dep, end, min_rest, max_duty):
+    intervals = member["intervals"]
+    k = bisect.bisect_left(intervals, (dep, end))
+    trial = intervals[:k] + [(dep, end)] + intervals[k:]
+    lo, hi = _duty_period(trial, k, min_rest)
+
+    ok = not ((k > 0 and trial[k - 1][1] > dep) or (k + 1 < len(trial) and trial[k + 1][0] < end))
+    duty = trial[hi][1] - trial[lo][0]
+    if lo == 0:
+        duty += member["prior_hours"] * 3600
+        if member["last_rest"] * 3600 < min_rest:
+            ok = False
+    if duty > max_duty:
+        ok = False
+
+    if ok:
+        member["intervals"] = trial
+    return ok, trial[hi][1] + min_rest
+
+def _crew_pool(flights, roster):
+    pool = {}
+    for fl in flights:
+        available = fl["status"]["operational"]["crew_available"]
+        for role, members in (("Pilot", fl["crew"]["pilots"]), ("Cabin crew", fl["crew"]["cabin_crew"])):
+            for m in members:
+                cid = m.get("id")
+                member = pool.get(cid)
+                if member is None:
+                    member = pool[cid] = {
+                        "role": role,
+                        "prior_hours": m.get("hours_worked", 0),
+                        "last_rest": m.get("last_rest", 0),
+                        "available": True,
+                        "intervals": [(a["departure"], a["end"]) for a in roster.assignments.get(cid, [])]
+                    }
+                member["available"] = member["available"] and m.get("available", available)
+    return pool
+
+def propose_reassignments(flights, crew_rules, time_budget_sec=2.0, roster=None):
+    started = time.perf_counter()
+    deadline = started + time_budget_sec
+    if roster is None:
+        roster = CrewRoster.from_flights(flights, crew_rules)
+
+    min_p = crew_rules.min_pilots
+    min_c = crew_rules.min_cabin_crew
+    min_rest = crew_rules.min_rest_seconds
+    max_daily = crew_rules.max_daily_hours
+    flight_hours = crew_rules.assumed_flight_hours
+    flight_secs = crew_rules.assumed_flight_seconds
+
+    flagged = set()
+    for cid, violations in roster.violations.items():
+        for v in violations:
+            flagged.add((cid, v["flight_id"]))
+
+    order = sorted(flights, key=lambda fl: (timestamp_seconds(fl["timestamp"]), fl["flight_id"]))
+    pool = _crew_pool(order, roster)
+    ready = {"Pilot": [], "Cabin crew": []}
+    busy = {"Pilot": [], "Cabin crew": []}
+    for cid, member in pool.items():
+        if member["available"]:
+            load = member["prior_hours"] + flight_hours * len(member["intervals"])
+            ready[member["role"]].append((load, cid))
+    for heap in ready.values():
+        heapq.heapify(heap)
+
+    proposals = []
+    complete = True
+
+    for fl in order:
+        if time.perf_counter() > deadline:
+            complete = False
+            break
+
+        fid = fl["flight_id"]
+        dep = timestamp_seconds(fl["timestamp"])
+        end = dep + flight_secs
+        pilots = fl["crew"]["pilots"]
+        cabin = fl["crew"]["cabin_crew"]
+
+        remove = []
+        for p in pilots:
+            pid = p.get("id")
+            if (p.get("last_rest", 0) < crew_rules.min_rest_hours
+                    or p.get("hours_worked", 0) + flight_hours > max_daily
+                    or (pid, fid) in flagged):
+                remove.append(pid)
+        removed_cabin = [m.get("id") for m in cabin if (m.get("id"), fid) in flagged]
+        remove.extend(removed_cabin)
+        for cid in remove:
+            intervals = pool[cid]["intervals"]
+            k = bisect.bisect_left(intervals, (dep, end))
+            if k < len(intervals) and intervals[k] == (dep, end):
+                del intervals[k]
+
+        needs = (
+            ("Pilot", max(0, min_p - (len(pilots) - (len(remove) - len(removed_cabin))))),
+            ("Cabin crew", max(0, min_c - (len(cabin) - len(removed_cabin))))
+        )
+        if not remove and not needs[0][1] and not needs[1][1]:
+            continue
+
+        on_flight = {p.get("id") for p in pilots} | {m.get("id") for m in cabin}
+        added = {"Pilot": [], "Cabin crew": []}
+        for role, need in needs:
+            if not need:
+                continue
+            r = ready[role]
+            b = busy[role]
+            while b and b[0][0] <= dep:
+                _, load, cid = heapq.heappop(b)
+                heapq.heappush(r, (load, cid))
+
+            skipped = []
+            while r and len(added[role]) < need:
+                load, cid = heapq.heappop(r)
+                if cid in on_flight:
+                    skipped.append((load, cid))
+                    continue
+                ok, free_at = _try_assign(pool[cid], dep, end, min_rest, max_daily * 3600)
+                if ok:
+                    added[role].append(cid)
+                    skipped.append((load + flight_hours, cid))
+                else:
+                    heapq.heappush(b, (free_at, load, cid))
+            for item in skipped:
+                heapq.heappush(r, item)
+
+        proposals.append({
+            "flight_id": fid,
+            "remove": remove,
+            "add_pilots": added["Pilot"],
+            "add_cabin_crew": added["Cabin crew"],
+            "unfilled": needs[0][1] - len(added["Pilot"]) + needs[1][1] - len(added["Cabin crew"])
+        })
+
+    return {
+        "proposals": proposals,
+        "complete": complete,
+        "elapsed_sec": time.perf_counter() - started
+    }
@@ -1,8 +1,129 @@
-def show_dashboard(flights, delay_results, health_alerts, crew_issues, load_results):
+import bisect
+
+BANNER = (
+    "\n" + "╔" + "═"*78 + "╗\n"
+    + "║" + " "*20 + "AIRLINE OPERATIONS CONTROL CENTER" + " "*25 + "║\n"
+    + "╚" + "═"*78 + "╝"
+)
+PANEL_BOTTOM = "└" + "─"*78 + "┘"
+
+PANELS = ("summary", "alerts", "delays", "health", "crew", "load", "recommendations")
+
+def _summary_panel(total, delayed, total_delay_mins, avg_load, popular_route):
+    return "\n".join([
+        "\n┌─ OPERATIONS SUMMARY " + "─"*57 + "┐",
+        f"│ Total Flights Monitored       : {total:>3} flights",
+        f"│ Flights On-Time               : {total - delayed:>3} flights",
+        f"│ Flights Delayed               : {delayed:>3} flights",
+        f"│ Total Delay Time              : {total_delay_mins:>3} minutes",
+        f"│ Average Load Factor           : {avg_load:>5.1f}%",
+        f"│ Popular Route                 : {popular_route}",
+        PANEL_BOTTOM
+    ])
+
+def _alerts_panel(critical, warnings, crew):
+    return "\n".join([
+        "\n┌─ ALERT SUMMARY " + "─"*61 + "┐",
+        f"│ [CRITICAL] Alerts             : {critical:>3}",
+        f"│ [WARNING]  Alerts             : {warnings:>3}",
+        f"│ Crew Compliance Issues        : {crew:>3}",
+        PANEL_BOTTOM
+    ])
+
+def _delay_panel(delays):
+    lines = ["\n┌─ DELAY ANALYSIS " + "─"*60 + "┐"]
+    for fid, delay_min, reasons in delays:
+        if delay_min >= 120:
+            severity = "[SEVERE]  "
+        elif delay_min >= 60:
+            severity = "[MODERATE]"
+        else:
+            severity = "[MINOR]   "
+
+        lines.append(f"│ {fid:<8} {severity} {delay_min:>3} min")
+        for r in reasons[:3]:
+            lines.append(f"│          └─ {r:<60} │")
+    lines.append(PANEL_BOTTOM)
+    return "\n".join(lines)
+
+def _alert_pairs(messages):
+    pairs = []
+    for msg in messages:
+        parts = msg.split("|")
+        if len(parts) >= 2:
+            pairs.append((parts[0].strip(), parts[1].strip()))
+    return pairs
+
+def _alert_lines(pairs):
+    return [f"│    [{subject}] {issue:<60} │" for subject, issue in pairs]
+
+def _health_panel(critical, warnings):
+    lines = ["\n┌─ AIRCRAFT HEALTH STATUS " + "─"*52 + "┐"]
+    if critical:
+        lines.append("│ [CRITICAL] ISSUES:")
+        lines.extend(_alert_lines(critical))
+    if warnings:
+        lines.append("│ [WARNING] ISSUES:")
+        lines.extend(_alert_lines(warnings))
+    lines.append(PANEL_BOTTOM)
+    return "\n".join(lines)
+
+def _crew_panel(crew_issues):
+    lines = ["\n┌─ CREW COMPLIANCE ISSUES " + "─"*52 + "┐"]
+    for fid, issues in crew_issues:
+        lines.append(f"│ Flight: {fid:<10}")
+        for issue in issues:
+            lines.append(f"│    [!] {issue:<65} │")
+    lines.append(PANEL_BOTTOM)
+    return "\n".join(lines)
+
+def _load_panel(overbooked, underutilized):
+    lines = ["\n┌─ PASSENGER LOAD ISSUES " + "─"*53 + "┐"]
+    if overbooked:
+        lines.append("│ [OVERBOOKED] RISK:")
+        for fid, pct in overbooked:
+            lines.append(f"│    {fid:<10} Load: {pct:>5.1f}%")
+    if underutilized:
+        lines.append("│ [UNDER-UTILIZED]:")
+        for fid, pct in underutilized:
+            lines.append(f"│    {fid:<10} Load: {pct:>5.1f}%")
+    lines.append(PANEL_BOTTOM)
+    return "\n".join(lines)
+
+def _recommendations_panel(total, delayed, critical, crew, overbooked):
+    recs = []
+    if delayed > total * 0.5:
+        recs.append("High delay rate detected - Review weather & operational procedures")
+    if critical:
+        recs.append("IMMEDIATE: Ground aircraft with critical health issues")
+    if crew:
+        recs.append("Schedule crew replacements for non-compliant assignments")
+    if overbooked:
+        recs.append("Arrange alternate flights for overbooked passengers")
+    if not recs:
+        recs.append("All systems operating normally - Continue monitoring")
+
+    lines = ["\n┌─ RECOMMENDATIONS " + "─"*59 + "┐"]
+    for i, rec in enumerate(recs, 1):
+        lines.append(f"│ {i}. {rec:<74} │")
+    lines.append(PANEL_BOTTOM + "\n")
+    return "\n".join(lines)
+
+def show_dashboard(flights, delay_results, health_alerts, crew_issues, load_results, alert_store=None):
     total = len(flights)
     delayed = [d for d in delay_results if d["delay_min"] > 0]
-    critical = [a for a in health_alerts if a[0] == "CRITICAL"]
-    warnings = [a for a in health_alerts if a[0] == "WARN"]
+    if alert_store is not None:
+        critical_count = alert_store.count("CRITICAL")
+        warning_count = alert_store.count("WARN")
+        critical = [(e["subject"], e["text"]) for e in alert_store.top(level="CRITICAL")]
+        warnings = [(e["subject"], e["text"]) for e in alert_store.top(3, "WARN")]
+    else:
+        critical = [msg for lvl, msg in health_alerts if lvl == "CRITICAL"]
+        warnings = [msg for lvl, msg in health_alerts if lvl == "WARN"]
+        critical_count = len(critical)
+        warning_count = len(warnings)
+        critical = _alert_pairs(critical)
+        warnings = _alert_pairs(warnings[:3])
 
     avg_load = 0.0
     if load_results:
@@ -15,99 +136,204 @@ def show_dashboard(flights, delay_results, health_alerts, crew_issues, load_resu
     popular_route = max(route_counts, key=route_counts.get) if route_counts else "N/A"
 
     total_delay_mins = sum(d["delay_min"] for d in delay_results)
-    
-    print("\n" + "╔" + "═"*78 + "╗")
-    print("║" + " "*20 + "AIRLINE OPERATIONS CONTROL CENTER" + " "*25 + "║")
-    print("╚" + "═"*78 + "╝")
-    
-    print("\n┌─ OPERATIONS SUMMARY " + "─"*57 + "┐")
-    print(f"│ Total Flights Monitored       : {total:>3} flights")
-    print(f"│ Flights On-Time               : {total - len(delayed):>3} flights")
-    print(f"│ Flights Delayed               : {len(delayed):>3} flights")
-    print(f"│ Total Delay Time              : {total_delay_mins:>3} minutes")
-    print(f"│ Average Load Factor           : {avg_load:>5.1f}%")
-    print(f"│ Popular Route                 : {popular_route}")
-    print("└" + "─"*78 + "┘")
-
-    print("\n┌─ ALERT SUMMARY " + "─"*61 + "┐")
-    print(f"│ [CRITICAL] Alerts             : {len(critical):>3}")
-    print(f"│ [WARNING]  Alerts             : {len(warnings):>3}")
-    print(f"│ Crew Compliance Issues        : {len(crew_issues):>3}")
-    print("└" + "─"*78 + "┘")
+
+    print(BANNER)
+    print(_summary_panel(total, len(delayed), total_delay_mins, avg_load, popular_route))
+    print(_alerts_panel(critical_count, warning_count, len(crew_issues)))
 
     if delayed:
-        print("\n┌─ DELAY ANALYSIS " + "─"*60 + "┐")
-        for d in sorted(delayed, key=lambda x: x["delay_min"], reverse=True):
-            if d["delay_min"] >= 120:
-                severity = "[SEVERE]  "
-            elif d["delay_min"] >= 60:
-                severity = "[MODERATE]"
-            else:
-                severity = "[MINOR]   "
-            
-            print(f"│ {d['flight_id']:<8} {severity} {d['delay_min']:>3} min")
-            if d["reasons"]:
-                reasons_wrapped = d["reasons"][:3]
-                for r in reasons_wrapped:
-                    print(f"│          └─ {r:<60} │")
-        print("└" + "─"*78 + "┘")
-
-    if critical or warnings:
-        print("\n┌─ AIRCRAFT HEALTH STATUS " + "─"*52 + "┐")
-        if critical:
-            print("│ [CRITICAL] ISSUES:")
-            for lvl, msg in critical:
-                parts = msg.split("|")
-                if len(parts) >= 2:
-                    fid = parts[0].strip()
-                    issue = parts[1].strip()
-                    print(f"│    [{fid}] {issue:<60} │")
-        if warnings:
-            print("│ [WARNING] ISSUES:")
-            for lvl, msg in warnings[:3]:
-                parts = msg.split("|")
-                if len(parts) >= 2:
-                    fid = parts[0].strip()
-                    issue = parts[1].strip()
-                    print(f"│    [{fid}] {issue:<60} │")
-        print("└" + "─"*78 + "┘")
+        ordered = sorted(delayed, key=lambda x: x["delay_min"], reverse=True)
+        print(_delay_panel((d["flight_id"], d["delay_min"], d["reasons"]) for d in ordered))
+
+    if critical_count or warning_count:
+        print(_health_panel(critical, warnings))
 
     if crew_issues:
-        print("\n┌─ CREW COMPLIANCE ISSUES " + "─"*52 + "┐")
-        for item in crew_issues:
-            print(f"│ Flight: {item['flight_id']:<10}")
-            for issue in item["issues"]:
-                print(f"│    [!] {issue:<65} │")
-        print("└" + "─"*78 + "┘")
+        print(_crew_panel((item["flight_id"], item["issues"]) for item in crew_issues))
 
     overbooked = [l for l in load_results if l.get("overbooking_risk")]
     underutilized = [l for l in load_results if l.get("under_utilized")]
-    
+
     if overbooked or underutilized:
-        print("\n┌─ PASSENGER LOAD ISSUES " + "─"*53 + "┐")
+        print(_load_panel(
+            [(l["flight_id"], l["predicted_load_pct"]) for l in overbooked],
+            [(l["flight_id"], l["predicted_load_pct"]) for l in underutilized]
+        ))
+
+    print(_recommendations_panel(total, len(delayed), critical_count, crew_issues, overbooked))
+
+class DashboardModel:
+    def __init__(self, top_delays=None):
+        self.top_delays = top_delays
+        self.flights = {}
+        self.route_counts = {}
+        self.delayed = 0
+        self.total_delay = 0
+        self.load_sum = 0.0
+        self.delay_order = []
+        self.overbooked = set()
+        self.underutilized = set()
+        self.crew = {}
+        self.health = ([], [])
+        self.critical = 0
+        self.warnings = 0
+        self.dirty = set(PANELS)
+        self.panels = dict.fromkeys(PANELS, "")
+
+    def _in_top(self, key):
+        if self.top_delays is None:
+            return True
+        return bisect.bisect_left(self.delay_order, key) < self.top_delays
+
+    def _add(self, fid, entry):
+        route, delay_min, _, load_pct, overbooked, underutilized = entry
+        self.route_counts[route] = self.route_counts.get(route, 0) + 1
+        self.total_delay += delay_min
+        self.load_sum += load_pct
+        if delay_min > 0:
+            self.delayed += 1
+            key = (-delay_min, fid)
+            bisect.insort(self.delay_order, key)
+            if self._in_top(key):
+                self.dirty.add("delays")
         if overbooked:
-            print("│ [OVERBOOKED] RISK:")
-            for l in overbooked:
-                print(f"│    {l['flight_id']:<10} Load: {l['predicted_load_pct']:>5.1f}%")
+            self.overbooked.add(fid)
         if underutilized:
-            print("│ [UNDER-UTILIZED]:")
-            for l in underutilized:
-                print(f"│    {l['flight_id']:<10} Load: {l['predicted_load_pct']:>5.1f}%")
-        print("└" + "─"*78 + "┘")
+            self.underutilized.add(fid)
+        if overbooked or underutilized:
+            self.dirty.add("load")
 
-    print("\n┌─ RECOMMENDATIONS " + "─"*59 + "┐")
-    recs = []
-    if len(delayed) > total * 0.5:
-        recs.append("High delay rate detected - Review weather & operational procedures")
-    if critical:
-        recs.append("IMMEDIATE: Ground aircraft with critical health issues")
-    if crew_issues:
-        recs.append("Schedule crew replacements for non-compliant assignments")
-    if overbooked:
-        recs.append("Arrange alternate flights for overbooked passengers")
-    if not recs:
-        recs.append("All systems operating normally - Continue monitoring")
-    
-    for i, rec in enumerate(recs, 1):
-        print(f"│ {i}. {rec:<74} │")
-    print("└" + "─"*78 + "┘\n")
+    def _discard(self, fid, entry):
+        route, delay_min, _, load_pct, overbooked, underutilized = entry
+        count = self.route_counts[route] - 1
+        if count:
+            self.route_counts[route] = count
+        else:
+            del self.route_counts[route]
+        self.total_delay -= delay_min
+        self.load_sum -= load_pct
+        if delay_min > 0:
+            self.delayed -= 1
+            key = (-delay_min, fid)
+            if self._in_top(key):
+                self.dirty.add("delays")
+            del self.delay_order[bisect.bisect_left(self.delay_order, key)]
+        if overbooked or underutilized:
+            self.overbooked.discard(fid)
+            self.underutilized.discard(fid)
+            self.dirty.add("load")
+
+    def update_flight(self, flight, delay, load):
+        fid = flight["flight_id"]
+        entry = (
+            f'{flight["route"]["origin"]}->{flight["route"]["destination"]}',
+            delay["delay_min"],
+            delay["reasons"],
+            load["predicted_load_pct"],
+            bool(load.get("overbooking_risk")),
+            bool(load.get("under_utilized"))
+        )
+        old = self.flights.get(fid)
+        if old == entry:
+            return
+        if old is not None:
+            self._discard(fid, old)
+        self.flights[fid] = entry
+        self._add(fid, entry)
+        self.dirty.update(("summary", "alerts"))
+
+    def remove_flight(self, fid):
+        old = self.flights.pop(fid, None)
+        if old is not None:
+            self._discard(fid, old)
+            self.dirty.update(("summary", "alerts"))
+
+    def update_crew(self, fid, issues):
+        if issues:
+            if self.crew.get(fid) == issues:
+                return
+            self.crew[fid] = issues
+        elif self.crew.pop(fid, None) is None:
+            return
+        self.dirty.update(("crew", "alerts"))
+
+    def set_alerts(self, health_alerts, alert_store=None):
+        if alert_store is not None:
+            critical_count = alert_store.count("CRITICAL")
+            warning_count = alert_store.count("WARN")
+            health = (
+                [(e["subject"], e["text"]) for e in alert_store.top(level="CRITICAL")],
+                [(e["subject"], e["text"]) for e in alert_store.top(3, "WARN")]
+            )
+        else:
+            by_subject = {}
+            for lvl, msg in health_alerts:
+                by_subject.setdefault(msg.split("|", 1)[0].strip(), []).append((lvl, msg))
+            ordered = [by_subject[s] for s in sorted(by_subject)]
+            critical = [msg for items in ordered for lvl, msg in items if lvl == "CRITICAL"]
+            warnings = [msg for items in ordered for lvl, msg in items if lvl == "WARN"]
+            critical_count = len(critical)
+            warning_count = len(warnings)
+            health = (_alert_pairs(critical), _alert_pairs(warnings[:3]))
+        if (critical_count, warning_count, health) == (self.critical, self.warnings, self.health):
+            return
+        self.critical = critical_count
+        self.warnings = warning_count
+        self.health = health
+        self.dirty.update(("health", "alerts"))
+
+    def _render_summary(self):
+        total = len(self.flights)
+        avg_load = self.load_sum / total if total else 0.0
+        popular_route = max(self.route_counts, key=self.route_counts.get) if self.route_counts else "N/A"
+        return _summary_panel(total, self.delayed, self.total_delay, avg_load, popular_route)
+
+    def _render_alerts(self):
+        return _alerts_panel(self.critical, self.warnings, len(self.crew))
+
+    def _render_delays(self):
+        if not self.delay_order:
+            return ""
+        top = self.delay_order if self.top_delays is None else self.delay_order[:self.top_delays]
+        return _delay_panel((fid, -key, self.flights[fid][2]) for key, fid in top)
+
+    def _render_health(self):
+        if not (self.critical or self.warnings):
+            return ""
+        return _health_panel(*self.health)
+
+    def _render_crew(self):
+        if not self.crew:
+            return ""
+        return _crew_panel((fid, self.crew[fid]) for fid in sorted(self.crew))
+
+    def _render_load(self):
+        if not (self.overbooked or self.underutilized):
+            return ""
+        return _load_panel(
+            [(fid, self.flights[fid][3]) for fid in sorted(self.overbooked)],
+            [(fid, self.flights[fid][3]) for fid in sorted(self.underutilized)]
+        )
+
+    def _render_recommendations(self):
+        return _recommendations_panel(len(self.flights), self.delayed, self.critical, self.crew, self.overbooked)
+
+    def render(self, changed_only=False):
+        self.dirty.add("recommendations")
+        changed = set()
+        for name in self.dirty:
+            text = getattr(self, f"_render_{name}")()
+            if text != self.panels[name]:
+                self.panels[name] = text
+                changed.add(name)
+        self.dirty = set()
+
+        names = [name for name in PANELS if self.panels[name] and (name in changed or not changed_only)]
+        if not names:
+            return ""
+        return "\n".join([BANNER] + [self.panels[name] for name in names])
+
+    def show(self, changed_only=False):
+        text = self.render(changed_only)
+        if text:
+            print(text)
@@ -1,4 +1,20 @@
+import numpy as np
+
+from modules.config_loader import compile_section
+
+REASON_CROSSWIND = 1 << 0
+REASON_THUNDERSTORM = 1 << 1
+REASON_LOW_VISIBILITY = 1 << 2
+REASON_THRUST_DEVIATION = 1 << 3
+REASON_CABIN_PRESSURE_LOW = 1 << 4
+REASON_PRESSURE_DROP = 1 << 5
+REASON_RUNWAY_QUEUE = 1 << 6
+REASON_SLOW_BOARDING = 1 << 7
+REASON_CREW_UNAVAILABLE = 1 << 8
+REASON_PRESSURE_DROP_RATE = 1 << 9
+
 def predict_delay(flight, thresholds):
+    thresholds = compile_section("thresholds", thresholds)
     delay = 0
     reasons = []
 
@@ -6,7 +22,7 @@ def predict_delay(flight, thresholds):
     m = flight["metrics"]
     o = flight["status"]["operational"]
 
-    if w["crosswind"] > thresholds["crosswind_knots"]:
+    if w["crosswind"] > thresholds.crosswind_knots:
         delay += 30
         reasons.append(f"Crosswind {w['crosswind']} knots")
 
@@ -14,38 +30,44 @@ def predict_delay(flight, thresholds):
         delay += 60
         reasons.append("Thunderstorm")
 
-    if w["visibility"] < thresholds["visibility_meters"]:
+    if w["visibility"] < thresholds.visibility_meters:
         delay += 25
         reasons.append(f"Low visibility {w['visibility']}m")
 
     thrusts = m.get("engine_thrust") or []
     if thrusts:
-        baseline = thresholds.get("engine_thrust_baseline", 100)
+        baseline = thresholds.engine_thrust_baseline
         thrust_dev = max(abs(baseline - t) for t in thrusts)
-        if thrust_dev > thresholds["engine_thrust_deviation"]:
+        if thrust_dev > thresholds.engine_thrust_deviation:
             delay += 90
             reasons.append(f"Engine thrust deviation {thrust_dev:.1f}%")
 
     cabin_pressure = m.get("cabin_pressure")
     prev_pressure = m.get("prev_cabin_pressure")
 
-    if cabin_pressure is not None and cabin_pressure < thresholds["cabin_pressure_min"]:
+    if cabin_pressure is not None and cabin_pressure < thresholds.cabin_pressure_min:
         delay += 45
         reasons.append("Cabin pressure low")
 
     if cabin_pressure is not None and prev_pressure is not None:
         drop = prev_pressure - cabin_pressure
-        if drop >= thresholds["cabin_pressure_drop"]:
+        if drop >= thresholds.cabin_pressure_drop:
             delay += 45
             reasons.append(f"Sudden pressure drop {drop:.2f}")
 
-    if o["runway_queue"] > thresholds["runway_queue_threshold"]:
-        extra = o["runway_queue"] - thresholds["runway_queue_threshold"]
+    drop_rate = m.get("pressure_max_drop_rate")
+    rate_limit = thresholds.cabin_pressure_drop_rate
+    if drop_rate is not None and rate_limit is not None and drop_rate > rate_limit:
+        delay += 45
+        reasons.append(f"Rapid pressure drop rate {drop_rate:.2f} psi/min")
+
+    if o["runway_queue"] > thresholds.runway_queue_threshold:
+        extra = o["runway_queue"] - thresholds.runway_queue_threshold
         delay += extra
         reasons.append(f"Runway queue {o['runway_queue']}min")
 
-    if o["boarding_time"] > thresholds["boarding_time_threshold"]:
-        extra = o["boarding_time"] - thresholds["boarding_time_threshold"]
+    if o["boarding_time"] > thresholds.boarding_time_threshold:
+        extra = o["boarding_time"] - thresholds.boarding_time_threshold
         delay += extra * 2
         reasons.append(f"Slow boarding {o['boarding_time']}min")
 
@@ -54,3 +76,75 @@ def predict_delay(flight, thresholds):
         reasons.append("Crew unavailable")
 
     return delay, reasons
+
+def predict_delay_batch(cols, thresholds):
+    n = cols["size"]
+    delay = np.zeros(n, dtype=np.int64)
+    mask = np.zeros(n, dtype=np.int64)
+
+    def apply(hit, bit, minutes):
+        mask[hit] |= bit
+        np.add(delay, np.where(hit, minutes, 0), out=delay)
+
+    cw = cols["crosswind"]
+    apply(cw > thresholds.crosswind_knots, REASON_CROSSWIND, 30)
+    apply(cols["thunderstorm"], REASON_THUNDERSTORM, 60)
+    apply(cols["visibility"] < thresholds.visibility_meters, REASON_LOW_VISIBILITY, 25)
+
+    baseline = np.reshape(thresholds.engine_thrust_baseline, (-1, 1))
+    thrust_dev = np.fmax.reduce(np.abs(baseline - cols["engine_thrust"]), axis=1, initial=-np.inf)
+    has_thrust = cols["engine_thrust_len"] > 0
+    apply(has_thrust & (thrust_dev > thresholds.engine_thrust_deviation), REASON_THRUST_DEVIATION, 90)
+
+    pressure = cols["cabin_pressure"]
+    apply(pressure < thresholds.cabin_pressure_min, REASON_CABIN_PRESSURE_LOW, 45)
+    drop = cols["prev_cabin_pressure"] - pressure
+    apply(drop >= thresholds.cabin_pressure_drop, REASON_PRESSURE_DROP, 45)
+    if thresholds.cabin_pressure_drop_rate is not None:
+        apply(cols["pressure_max_drop_rate"] > thresholds.cabin_pressure_drop_rate, REASON_PRESSURE_DROP_RATE, 45)
+
+    queue = cols["runway_queue"]
+    queue_limit = thresholds.runway_queue_threshold
+    apply(queue > queue_limit, REASON_RUNWAY_QUEUE, queue - queue_limit)
+
+    boarding = cols["boarding_time"]
+    boarding_limit = thresholds.boarding_time_threshold
+    apply(boarding > boarding_limit, REASON_SLOW_BOARDING, (boarding - boarding_limit) * 2)
+
+    apply(~cols["crew_available"], REASON_CREW_UNAVAILABLE, 60)
+
+    return {"delay_min": delay, "reason_mask": mask, "thrust_deviation": thrust_dev, "pressure_drop": drop}
+
+def _delay_reasons(cols, batch, i):
+    bits = int(batch["reason_mask"][i])
+    reasons = []
+    if bits & REASON_CROSSWIND:
+        reasons.append(f"Crosswind {int(cols['crosswind'][i])} knots")
+    if bits & REASON_THUNDERSTORM:
+        reasons.append("Thunderstorm")
+    if bits & REASON_LOW_VISIBILITY:
+        reasons.append(f"Low visibility {int(cols['visibility'][i])}m")
+    if bits & REASON_THRUST_DEVIATION:
+        reasons.append(f"Engine thrust deviation {float(batch['thrust_deviation'][i]):.1f}%")
+    if bits & REASON_CABIN_PRESSURE_LOW:
+        reasons.append("Cabin pressure low")
+    if bits & REASON_PRESSURE_DROP:
+        reasons.append(f"Sudden pressure drop {float(batch['pressure_drop'][i]):.2f}")
+    if bits & REASON_PRESSURE_DROP_RATE:
+        reasons.append(f"Rapid pressure drop rate {float(cols['pressure_max_drop_rate'][i]):.2f} psi/min")
+    if bits & REASON_RUNWAY_QUEUE:
+        reasons.append(f"Runway queue {int(cols['runway_queue'][i])}min")
+    if bits & REASON_SLOW_BOARDING:
+        reasons.append(f"Slow boarding {int(cols['boarding_time'][i])}min")
+    if bits & REASON_CREW_UNAVAILABLE:
+        reasons.append("Crew unavailable")
+    return reasons
+
+def expand_delay_results(cols, batch):
+    delay = batch["delay_min"].tolist()
+    mask = batch["reason_mask"]
+    results = []
+    for i, fid in enumerate(cols["flight_id"]):
+        reasons = _delay_reasons(cols, batch, i) if mask[i] else []
+        results.append({"flight_id": fid, "delay_min": delay[i], "reasons": reasons})
+    return results
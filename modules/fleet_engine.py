@@ -0,0 +1,175 @@
+import numpy as np
+
+from modules.delay_predictor import predict_delay_batch, expand_delay_results
+from modules.health_monitor import check_health_batch, expand_health_alerts
+from modules.crew_optimizer import evaluate_crew_batch
+from modules.load_predictor import predict_load_batch, expand_load_results
+from modules.flight_record import FlightRecord
+from modules.config_loader import compile_config
+
+def _ragged(rows, pad, dtype=np.float64):
+    lengths = np.fromiter((len(r) for r in rows), dtype=np.int64, count=len(rows))
+    width = int(lengths.max()) if len(rows) else 0
+    out = np.full((len(rows), width), pad, dtype=dtype)
+    for i, r in enumerate(rows):
+        if r:
+            out[i, :len(r)] = r
+    return out, lengths
+
+def _dict_row(fl):
+    m = fl["metrics"]
+    w = fl["status"]["weather"]
+    o = fl["status"]["operational"]
+    p = fl["passenger"]
+    r = fl["route"]
+    return (
+        fl["flight_id"], fl["aircraft_id"], r["origin"], r["destination"], m.get("engine_thrust"), m.get("engine_vibration"), p.get("historical_load_pct"),
+        w["crosswind"], w["visibility"], w["thunderstorm"],
+        (m.get("fuel_burn"), m.get("cabin_pressure"), m.get("prev_cabin_pressure"), m.get("cabin_temp"), m.get("turbulence"),
+         m.get("pressure_max_drop_rate"), m.get("pressure_sustained_drop"), m.get("pressure_sustained_minutes"),
+         m.get("pressure_outliers")),
+        o["runway_queue"], o["boarding_time"], o["crew_available"], p["booked"], p["capacity"],
+        fl["crew"]["pilots"], len(fl["crew"]["cabin_crew"])
+    )
+
+def _record_row(fl):
+    return (
+        fl.flight_id, fl.aircraft_id, fl.origin, fl.destination, fl.engine_thrust, fl.engine_vibration, fl.historical_load_pct,
+        fl.crosswind, fl.visibility, fl.thunderstorm,
+        (fl.fuel_burn, fl.cabin_pressure, fl.prev_cabin_pressure, fl.cabin_temp, fl.turbulence,
+         fl.pressure_max_drop_rate, fl.pressure_sustained_drop, fl.pressure_sustained_minutes,
+         fl.pressure_outliers),
+        fl.runway_queue, fl.boarding_time, fl.crew_available, fl.booked, fl.capacity,
+        fl.pilots, len(fl.cabin_crew)
+    )
+
+def build_fleet_columns(flights):
+    n = len(flights)
+    flight_id = []
+    aircraft_id = []
+    origin = []
+    destination = []
+    thrust = []
+    vibration = []
+    hist = []
+    pilot_flight = []
+    pilot_ids = []
+    pilot_rest = []
+    pilot_hours = []
+
+    crosswind = np.empty(n, dtype=np.int64)
+    visibility = np.empty(n, dtype=np.int64)
+    thunderstorm = np.empty(n, dtype=bool)
+    fuel_burn = np.full(n, np.nan)
+    cabin_pressure = np.full(n, np.nan)
+    prev_cabin_pressure = np.full(n, np.nan)
+    cabin_temp = np.full(n, np.nan)
+    turbulence = np.full(n, np.nan)
+    drop_rate = np.full(n, np.nan)
+    sustained_drop = np.full(n, np.nan)
+    sustained_minutes = np.full(n, np.nan)
+    outliers = np.full(n, np.nan)
+    runway_queue = np.empty(n, dtype=np.int64)
+    boarding_time = np.empty(n, dtype=np.int64)
+    crew_available = np.empty(n, dtype=bool)
+    booked = np.empty(n, dtype=np.int64)
+    capacity = np.empty(n, dtype=np.int64)
+    pilot_count = np.empty(n, dtype=np.int64)
+    cabin_count = np.empty(n, dtype=np.int64)
+    metric_cols = (fuel_burn, cabin_pressure, prev_cabin_pressure, cabin_temp, turbulence,
+                   drop_rate, sustained_drop, sustained_minutes, outliers)
+
+    for i, fl in enumerate(flights):
+        if type(fl) is FlightRecord:
+            row = _record_row(fl)
+        else:
+            row = _dict_row(fl)
+        (fid, aid, orig, dest, th, vib, hl, crosswind[i], visibility[i], thunderstorm[i], metrics,
+         runway_queue[i], boarding_time[i], crew_available[i], booked[i], capacity[i],
+         pilots, cabin_count[i]) = row
+
+        flight_id.append(fid)
+        aircraft_id.append(aid)
+        origin.append(orig)
+        destination.append(dest)
+        thrust.append(th or [])
+        vibration.append(vib or [])
+        hist.append(hl or [])
+        for col, v in zip(metric_cols, metrics):
+            if v is not None:
+                col[i] = v
+        pilot_count[i] = len(pilots)
+
+        for pl in pilots:
+            pilot_flight.append(i)
+            pilot_ids.append(pl.get("id"))
+            pilot_rest.append(pl.get("last_rest", 0))
+            pilot_hours.append(pl.get("hours_worked", 0))
+
+    thrust_arr, thrust_len = _ragged(thrust, np.nan)
+    vibration_arr, vibration_len = _ragged(vibration, -np.inf)
+
+    hist_len = np.fromiter((len(h) for h in hist), dtype=np.int64, count=n)
+    hist_flat = np.fromiter((x for h in hist for x in h), dtype=np.int64, count=int(hist_len.sum()))
+
+    return {
+        "size": n,
+        "flight_id": flight_id,
+        "aircraft_id": aircraft_id,
+        "origin": origin,
+        "destination": destination,
+        "crosswind": crosswind,
+        "visibility": visibility,
+        "thunderstorm": thunderstorm,
+        "engine_thrust": thrust_arr,
+        "engine_thrust_len": thrust_len,
+        "engine_vibration": vibration_arr,
+        "engine_vibration_len": vibration_len,
+        "fuel_burn": fuel_burn,
+        "cabin_pressure": cabin_pressure,
+        "prev_cabin_pressure": prev_cabin_pressure,
+        "pressure_max_drop_rate": drop_rate,
+        "pressure_sustained_drop": sustained_drop,
+        "pressure_sustained_minutes": sustained_minutes,
+        "pressure_outliers": outliers,
+        "cabin_temp": cabin_temp,
+        "turbulence": turbulence,
+        "runway_queue": runway_queue,
+        "boarding_time": boarding_time,
+        "crew_available": crew_available,
+        "booked": booked,
+        "capacity": capacity,
+        "historical_load_pct": hist_flat,
+        "historical_load_len": hist_len,
+        "pilot_count": pilot_count,
+        "cabin_crew_count": cabin_count,
+        "pilot_flight": np.array(pilot_flight, dtype=np.int64),
+        "pilot_id": pilot_ids,
+        "pilot_last_rest": np.array(pilot_rest, dtype=np.int64),
+        "pilot_hours_worked": np.array(pilot_hours, dtype=np.int64)
+    }
+
+def evaluate_fleet(flights, config, load_store=None):
+    config = compile_config(config)
+    cols = build_fleet_columns(flights)
+    thresholds = config.threshold_index.for_fleet(flights)
+
+    if config.rule_set is not None:
+        delay_results = config.rule_set.predict_delay_batch(cols, thresholds)
+        health_alerts = config.rule_set.check_health_batch(cols, thresholds)
+    else:
+        delays = predict_delay_batch(cols, thresholds)
+        delay_results = expand_delay_results(cols, delays)
+
+        health = check_health_batch(cols, thresholds)
+        health_alerts = expand_health_alerts(cols, health)
+
+    crew_issues = evaluate_crew_batch(cols, config.crew_rules)
+
+    if load_store is not None:
+        load_results = load_store.predict_fleet(flights, config.passenger_rules)
+    else:
+        loads = predict_load_batch(cols, config.passenger_rules)
+        load_results = expand_load_results(cols, loads)
+
+    return delay_results, health_alerts, crew_issues, load_results
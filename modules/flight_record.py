@@ -0,0 +1,146 @@
+import sys
+from collections.abc import Mapping
+
+ALTERNATE_AIRPORTS = ("HYD", "CCU", "AMD")
+
+LAYOUT = {
+    "flight_id": "flight_id",
+    "aircraft_id": "aircraft_id",
+    "timestamp": "timestamp",
+    "metrics": {
+        "engine_thrust": "engine_thrust",
+        "engine_vibration": "engine_vibration",
+        "fuel_burn": "fuel_burn",
+        "cabin_pressure": "cabin_pressure",
+        "prev_cabin_pressure": "prev_cabin_pressure",
+        "pressure_max_drop_rate": "pressure_max_drop_rate",
+        "pressure_sustained_drop": "pressure_sustained_drop",
+        "pressure_sustained_minutes": "pressure_sustained_minutes",
+        "pressure_outliers": "pressure_outliers",
+        "cabin_temp": "cabin_temp",
+        "turbulence": "turbulence",
+        "airspeed": "airspeed",
+        "altitude": "altitude"
+    },
+    "status": {
+        "codes": {
+            "engine": "engine_status",
+            "cabin": "cabin_status",
+            "airspeed": "airspeed_status"
+        },
+        "weather": {
+            "crosswind": "crosswind",
+            "visibility": "visibility",
+            "thunderstorm": "thunderstorm",
+            "condition": "condition"
+        },
+        "operational": {
+            "runway_queue": "runway_queue",
+            "boarding_time": "boarding_time",
+            "crew_available": "crew_available"
+        }
+    },
+    "passenger": {
+        "booked": "booked",
+        "capacity": "capacity",
+        "historical_load_pct": "historical_load_pct"
+    },
+    "crew": {
+        "pilots": "pilots",
+        "cabin_crew": "cabin_crew"
+    },
+    "route": {
+        "origin": "origin",
+        "destination": "destination",
+        "alternate": "alternate"
+    }
+}
+
+def _attrs(layout):
+    out = []
+    for v in layout.values():
+        if isinstance(v, dict):
+            out.extend(_attrs(v))
+        elif v != "alternate":
+            out.append(v)
+    return out
+
+_INTERNED = ("aircraft_id", "engine_status", "cabin_status", "airspeed_status", "condition", "origin", "destination")
+
+def _intern(v):
+    return sys.intern(v) if type(v) is str else v
+
+class SectionView(Mapping):
+    __slots__ = ("_record", "_layout")
+
+    def __init__(self, record, layout):
+        self._record = record
+        self._layout = layout
+
+    def __getitem__(self, key):
+        attr = self._layout[key]
+        if type(attr) is dict:
+            return SectionView(self._record, attr)
+        return getattr(self._record, attr)
+
+    def __iter__(self):
+        return iter(self._layout)
+
+    def __len__(self):
+        return len(self._layout)
+
+    def __repr__(self):
+        return repr(_to_dict(self))
+
+class FlightRecord(Mapping):
+    __slots__ = tuple(_attrs(LAYOUT))
+
+    alternate = ALTERNATE_AIRPORTS
+
+    def __init__(self, **fields):
+        for attr in self.__slots__:
+            setattr(self, attr, fields.get(attr))
+        for attr in _INTERNED:
+            setattr(self, attr, _intern(getattr(self, attr)))
+
+    def __getitem__(self, key):
+        attr = LAYOUT[key]
+        if type(attr) is dict:
+            return SectionView(self, attr)
+        return getattr(self, attr)
+
+    def __iter__(self):
+        return iter(LAYOUT)
+
+    def __len__(self):
+        return len(LAYOUT)
+
+    def __repr__(self):
+        return f"FlightRecord({self.flight_id!r})"
+
+    def to_dict(self):
+        return _to_dict(self)
+
+    @classmethod
+    def from_dict(cls, flight):
+        fields = {}
+        _collect(flight, LAYOUT, fields)
+        return cls(**fields)
+
+def _to_dict(view):
+    out = {}
+    for k, v in view.items():
+        if isinstance(v, Mapping):
+            out[k] = _to_dict(v)
+        elif type(v) is tuple:
+            out[k] = list(v)
+        else:
+            out[k] = v
+    return out
+
+def _collect(flight, layout, fields):
+    for k, attr in layout.items():
+        if type(attr) is dict:
+            _collect(flight.get(k, {}), attr, fields)
+        elif attr != "alternate":
+            fields[attr] = flight.get(k)
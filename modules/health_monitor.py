@@ -1,59 +1,314 @@
 
+import atexit
 import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler
+
+import numpy as np
+
+from modules import config_loader
+
+ALERT_NONE = 0
+ALERT_WARN = 1
+ALERT_CRITICAL = 2
+
+HEALTH_VIBRATION = 1 << 0
+HEALTH_TURBULENCE = 1 << 1
+HEALTH_CABIN_TEMP = 1 << 2
+HEALTH_FUEL_BURN = 1 << 3
+HEALTH_DECOMPRESSION = 1 << 4
+HEALTH_PRESSURE_OUTLIERS = 1 << 5
 
 _health_logger = logging.getLogger("aircraft_health")
 _critical_logger = logging.getLogger("critical_flights")
+_direct_logging = True
+
+class _BufferedFileHandler(logging.FileHandler):
+    def emit(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+
+class _BoundedQueueHandler(QueueHandler):
+    def __init__(self, q, overflow="drop", block_timeout=1.0):
+        super().__init__(q)
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.overflow == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_STOP = object()
+
+class _AlertLogWriter(threading.Thread):
+    def __init__(self, q, handler, batch_size, flush_interval):
+        super().__init__(name=f"alert-log-{handler.baseFilename}", daemon=True)
+        self.queue = q
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+    def run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                batch = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self.handler.flush()
+                last_flush = time.monotonic()
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            for record in batch:
+                if record is _STOP:
+                    stop = True
+                elif record.levelno >= self.handler.level:
+                    self.handler.handle(record)
+
+            if stop:
+                self.handler.flush()
+                return
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self.handler.flush()
+                last_flush = time.monotonic()
+
+    def stop(self):
+        self.queue.put(_STOP)
+        self.join()
+        self.handler.close()
+
+_writers = []
 
-def setup_health_loggers():
+def _attach(logger, path, level, fmt, async_mode, queue_size, overflow, batch_size, flush_interval):
+    if logger.handlers:
+        return
+    if not async_mode:
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(fmt)
+        handler.setLevel(level)
+        logger.addHandler(handler)
+        return
+
+    file_handler = _BufferedFileHandler(path, encoding="utf-8")
+    file_handler.setFormatter(fmt)
+    file_handler.setLevel(level)
+
+    q = queue.Queue(maxsize=queue_size)
+    queue_handler = _BoundedQueueHandler(q, overflow)
+    queue_handler.setLevel(level)
+    logger.addHandler(queue_handler)
+
+    writer = _AlertLogWriter(q, file_handler, batch_size, flush_interval)
+    writer.start()
+    _writers.append((logger, queue_handler, writer))
+
+def setup_health_loggers(async_mode=False, queue_size=10000, overflow="drop", batch_size=256, flush_interval=1.0):
     _health_logger.setLevel(logging.INFO)
     _critical_logger.setLevel(logging.CRITICAL)
 
     fmt = logging.Formatter("%(asctime)s | %(levelname)s | %(message)s")
+    opts = (async_mode, queue_size, overflow, batch_size, flush_interval)
 
-    health_handler = logging.FileHandler("logs/aircraft_health_alerts.log", encoding="utf-8")
-    health_handler.setFormatter(fmt)
-    health_handler.setLevel(logging.INFO)
+    _attach(_health_logger, "logs/aircraft_health_alerts.log", logging.INFO, fmt, *opts)
+    _attach(_critical_logger, "logs/critical_flight_alerts.log", logging.CRITICAL, fmt, *opts)
 
-    critical_handler = logging.FileHandler("logs/critical_flight_alerts.log", encoding="utf-8")
-    critical_handler.setFormatter(fmt)
-    critical_handler.setLevel(logging.CRITICAL)
+    if _writers:
+        atexit.register(shutdown_health_loggers)
 
-    if not _health_logger.handlers:
-        _health_logger.addHandler(health_handler)
+def shutdown_health_loggers():
+    dropped = {}
+    while _writers:
+        logger, queue_handler, writer = _writers.pop()
+        logger.removeHandler(queue_handler)
+        writer.stop()
+        dropped[logger.name] = queue_handler.dropped
+    return dropped
+
+def set_direct_alert_logging(enabled):
+    global _direct_logging
+    _direct_logging = enabled
+
+def emit_health_alerts(alerts):
+    for level, msg in alerts:
+        if level == "CRITICAL":
+            _critical_logger.critical(msg)
+        else:
+            _health_logger.warning(msg)
+    return alerts
 
-    if not _critical_logger.handlers:
-        _critical_logger.addHandler(critical_handler)
+def log_health_alerts(alerts):
+    if _direct_logging:
+        emit_health_alerts(alerts)
+    return alerts
 
 def check_health(flight, thresholds):
+    thresholds = config_loader.compile_section("thresholds", thresholds)
     alerts = []
     m = flight["metrics"]
     fid = flight["flight_id"]
 
     vib = m.get("engine_vibration") or []
-    if any(v > thresholds["engine_vibration"] for v in vib):
+    if any(v > thresholds.engine_vibration for v in vib):
         msg = f"{fid} | High engine vibration {vib}"
-        _critical_logger.critical(msg)
         alerts.append(("CRITICAL", msg))
 
     turb = m.get("turbulence")
-    if turb is not None and turb >= thresholds["turbulence_severe"]:
+    if turb is not None and turb >= thresholds.turbulence_severe:
         msg = f"{fid} | Severe turbulence {turb}"
-        _critical_logger.critical(msg)
         alerts.append(("CRITICAL", msg))
 
     cabin_temp = m.get("cabin_temp")
-    if cabin_temp is not None and cabin_temp > thresholds["cabin_temp_high"]:
+    if cabin_temp is not None and cabin_temp > thresholds.cabin_temp_high:
         msg = f"{fid} | High cabin temperature {cabin_temp}C"
-        _health_logger.warning(msg)
         alerts.append(("WARN", msg))
 
     fuel_burn = m.get("fuel_burn")
-    base = thresholds.get("fuel_burn_baseline", 2200)
+    base = thresholds.fuel_burn_baseline
     if fuel_burn is not None and base:
         dev = abs((fuel_burn - base) / base) * 100
-        if dev > thresholds["fuel_burn_deviation"]:
+        if dev > thresholds.fuel_burn_deviation:
             msg = f"{fid} | Abnormal fuel burn {dev:.1f}%"
-            _health_logger.warning(msg)
             alerts.append(("WARN", msg))
 
-    return alerts
+    sustained = m.get("pressure_sustained_drop")
+    sustained_min = m.get("pressure_sustained_minutes")
+    if (sustained is not None and thresholds.cabin_sustained_drop is not None
+            and thresholds.cabin_sustained_minutes is not None
+            and sustained >= thresholds.cabin_sustained_drop
+            and sustained_min >= thresholds.cabin_sustained_minutes):
+        msg = f"{fid} | Sustained cabin decompression {sustained:.2f} psi over {sustained_min:.0f} min"
+        alerts.append(("CRITICAL", msg))
+
+    outliers = m.get("pressure_outliers")
+    outlier_limit = thresholds.cabin_pressure_outliers
+    if outliers is not None and outlier_limit is not None and outliers >= outlier_limit:
+        msg = f"{fid} | Cabin pressure outliers ({outliers} samples)"
+        alerts.append(("WARN", msg))
+
+    return log_health_alerts(alerts)
+
+def check_health_batch(cols, thresholds):
+    n = cols["size"]
+    mask = np.zeros(n, dtype=np.int64)
+
+    vibration = (cols["engine_vibration"] > np.reshape(thresholds.engine_vibration, (-1, 1))).any(axis=1)
+    mask[vibration] |= HEALTH_VIBRATION
+
+    turbulence = cols["turbulence"] >= thresholds.turbulence_severe
+    mask[turbulence] |= HEALTH_TURBULENCE
+
+    mask[cols["cabin_temp"] > thresholds.cabin_temp_high] |= HEALTH_CABIN_TEMP
+
+    base = np.asarray(thresholds.fuel_burn_baseline, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fuel_dev = np.where(base != 0, np.abs((cols["fuel_burn"] - base) / base) * 100, np.nan)
+    mask[fuel_dev > thresholds.fuel_burn_deviation] |= HEALTH_FUEL_BURN
+
+    if thresholds.cabin_sustained_drop is not None and thresholds.cabin_sustained_minutes is not None:
+        sustained = ((cols["pressure_sustained_drop"] >= thresholds.cabin_sustained_drop)
+                     & (cols["pressure_sustained_minutes"] >= thresholds.cabin_sustained_minutes))
+        mask[sustained] |= HEALTH_DECOMPRESSION
+    if thresholds.cabin_pressure_outliers is not None:
+        mask[cols["pressure_outliers"] >= thresholds.cabin_pressure_outliers] |= HEALTH_PRESSURE_OUTLIERS
+
+    level = np.where(mask & (HEALTH_VIBRATION | HEALTH_TURBULENCE | HEALTH_DECOMPRESSION), ALERT_CRITICAL,
+                     np.where(mask != 0, ALERT_WARN, ALERT_NONE))
+
+    return {"alert_mask": mask, "alert_level": level, "fuel_burn_deviation": fuel_dev}
+
+def expand_health_alerts(cols, batch):
+    alerts = []
+    mask = batch["alert_mask"]
+    for i in np.flatnonzero(mask).tolist():
+        bits = int(mask[i])
+        fid = cols["flight_id"][i]
+
+        if bits & HEALTH_VIBRATION:
+            n = int(cols["engine_vibration_len"][i])
+            vib = cols["engine_vibration"][i, :n].tolist()
+            msg = f"{fid} | High engine vibration {vib}"
+            alerts.append(("CRITICAL", msg))
+
+        if bits & HEALTH_TURBULENCE:
+            msg = f"{fid} | Severe turbulence {int(cols['turbulence'][i])}"
+            alerts.append(("CRITICAL", msg))
+
+        if bits & HEALTH_CABIN_TEMP:
+            msg = f"{fid} | High cabin temperature {float(cols['cabin_temp'][i])}C"
+            alerts.append(("WARN", msg))
+
+        if bits & HEALTH_FUEL_BURN:
+            msg = f"{fid} | Abnormal fuel burn {float(batch['fuel_burn_deviation'][i]):.1f}%"
+            alerts.append(("WARN", msg))
+
+        if bits & HEALTH_DECOMPRESSION:
+            drop = float(cols["pressure_sustained_drop"][i])
+            minutes = float(cols["pressure_sustained_minutes"][i])
+            msg = f"{fid} | Sustained cabin decompression {drop:.2f} psi over {minutes:.0f} min"
+            alerts.append(("CRITICAL", msg))
+
+        if bits & HEALTH_PRESSURE_OUTLIERS:
+            msg = f"{fid} | Cabin pressure outliers ({int(cols['pressure_outliers'][i])} samples)"
+            alerts.append(("WARN", msg))
+
+    return log_health_alerts(alerts)
+
+TREND_RULES = (
+    ("engine_thrust", "Engine thrust", "thrust_trend_min", -1),
+    ("engine_vibration", "Engine vibration", "vibration_trend_max", 1),
+    ("fuel_burn", "Fuel burn", "fuel_burn_trend_max", 1),
+    ("cabin_pressure", "Cabin pressure", "cabin_pressure_trend_min", -1),
+    ("cabin_temp", "Cabin temperature", "cabin_temp_trend_max", 1)
+)
+
+def check_degradation(store, rules, latest_flights):
+    alerts = []
+    min_samples = rules.get("min_samples", 10)
+    z_max = rules.get("zscore_max", 3.0)
+
+    # Trend alerts are filed under the aircraft's latest flight, like every other health alert.
+    for aid in sorted(latest_flights):
+        fid = latest_flights[aid]
+        series = store.series.get(aid, {})
+        for metric, label, key, sign in TREND_RULES:
+            s = series.get(metric)
+            if s is None or len(s.values) < min_samples:
+                continue
+
+            trend = s.trend
+            limit = rules.get(key)
+            if limit is not None and trend * sign > limit * sign:
+                direction = "rising" if sign > 0 else "declining"
+                msg = f"{fid} | {label} {direction} {trend:+.3f}/reading over {len(s.values)} readings (mean {s.mean:.2f}, EWMA {s.ewma:.2f}) on {aid}"
+                alerts.append(("WARN", msg))
+
+            std = s.std
+            if std > 0 and abs(s.last - s.mean) > z_max * std:
+                msg = f"{fid} | Anomalous {label.lower()} reading {s.last:g} (z={(s.last - s.mean) / std:+.1f}) on {aid}"
+                alerts.append(("WARN", msg))
+
+    return log_health_alerts(alerts)
@@ -0,0 +1,146 @@
+import math
+import os
+import pickle
+from collections import deque
+
+from modules.log_processor import tail_log_records
+
+METRICS = ("engine_thrust", "engine_vibration", "fuel_burn", "cabin_pressure", "cabin_temp")
+
+class RollingStats:
+    __slots__ = ("values", "alpha", "sum", "sum_sq", "sum_xy", "ewma", "count", "_evictions")
+
+    def __init__(self, window=50, alpha=0.2):
+        self.values = deque(maxlen=window)
+        self.alpha = alpha
+        self.sum = 0.0
+        self.sum_sq = 0.0
+        self.sum_xy = 0.0
+        self.ewma = None
+        self.count = 0
+        self._evictions = 0
+
+    def add(self, y):
+        values = self.values
+        if len(values) == values.maxlen:
+            old = values.popleft()
+            self.sum -= old
+            self.sum_sq -= old * old
+            # Every remaining sample moves one position to the left.
+            self.sum_xy -= self.sum
+            self._evictions += 1
+        x = len(values)
+        values.append(y)
+        self.sum += y
+        self.sum_sq += y * y
+        self.sum_xy += x * y
+        self.ewma = y if self.ewma is None else self.alpha * y + (1 - self.alpha) * self.ewma
+        self.count += 1
+        if self._evictions >= values.maxlen:
+            self._resum()
+
+    def _resum(self):
+        self.sum = math.fsum(self.values)
+        self.sum_sq = math.fsum(y * y for y in self.values)
+        self.sum_xy = math.fsum(x * y for x, y in enumerate(self.values))
+        self._evictions = 0
+
+    @property
+    def last(self):
+        return self.values[-1] if self.values else None
+
+    @property
+    def mean(self):
+        return self.sum / len(self.values) if self.values else None
+
+    @property
+    def std(self):
+        k = len(self.values)
+        if k < 2:
+            return 0.0
+        return math.sqrt(max(0.0, (self.sum_sq - self.sum * self.sum / k) / (k - 1)))
+
+    @property
+    def trend(self):
+        k = len(self.values)
+        if k < 2:
+            return 0.0
+        sx = k * (k - 1) / 2
+        sxx = (k - 1) * k * (2 * k - 1) / 6
+        return (k * self.sum_xy - sx * self.sum) / (k * sxx - sx * sx)
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "window": len(self.values),
+            "last": self.last,
+            "mean": self.mean,
+            "std": self.std,
+            "ewma": self.ewma,
+            "trend": self.trend
+        }
+
+class AircraftHealthStore:
+    def __init__(self, window=50, alpha=0.2, epoch=False):
+        self.window = window
+        self.alpha = alpha
+        self.epoch = epoch
+        self.series = {}
+        self.positions = {}
+
+    @classmethod
+    def load(cls, path, window=50, alpha=0.2, epoch=False):
+        try:
+            with open(path, "rb") as f:
+                store = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return cls(window, alpha, epoch)
+        if store.window != window or store.alpha != alpha:
+            return cls(window, alpha, epoch)
+        store.epoch = epoch
+        return store
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def add_reading(self, aircraft_id, metric, value):
+        if value is None:
+            return
+        metrics = self.series.get(aircraft_id)
+        if metrics is None:
+            metrics = self.series[aircraft_id] = {}
+        stats = metrics.get(metric)
+        if stats is None:
+            stats = metrics[metric] = RollingStats(self.window, self.alpha)
+        stats.add(value)
+
+    def ingest_engine(self, rec):
+        aid = rec["aircraft_id"]
+        thrust = rec["engine_thrust"]
+        vibration = rec["engine_vibration"]
+        if thrust:
+            self.add_reading(aid, "engine_thrust", sum(thrust) / len(thrust))
+        if vibration:
+            self.add_reading(aid, "engine_vibration", max(vibration))
+        self.add_reading(aid, "fuel_burn", rec["fuel_burn"])
+
+    def ingest_cabin(self, rec):
+        aid = rec["aircraft_id"]
+        self.add_reading(aid, "cabin_pressure", rec["cabin_pressure"])
+        self.add_reading(aid, "cabin_temp", rec["cabin_temp"])
+
+    def update(self, engine_path="data/engine_performance.log", cabin_path="data/cabin_pressure.log"):
+        updated = set()
+        for name, path, ingest in (("engine", engine_path, self.ingest_engine), ("cabin", cabin_path, self.ingest_cabin)):
+            position = self.positions.setdefault(os.path.abspath(path), {})
+            for rec in tail_log_records(name, path, position, self.epoch):
+                ingest(rec)
+                updated.add(rec["aircraft_id"])
+        return updated
+
+    def stats(self, aircraft_id):
+        return {metric: s.summary() for metric, s in self.series.get(aircraft_id, {}).items()}
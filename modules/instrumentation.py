@@ -0,0 +1,206 @@
+import functools
+import json
+import os
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+_NULL_STAGE = nullcontext()
+
+def _max_rss_bytes():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if os.uname().sysname == "Darwin" else rss * 1024
+
+class _Stage:
+    __slots__ = ("profiler", "name", "wall", "cpu")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._enter()
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall
+        cpu = time.process_time() - self.cpu
+        self.profiler._exit(self.name, wall, cpu)
+        return False
+
+class Profiler:
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.stages = {}
+        self.counters = {}
+        self._peaks = []
+
+    def enable(self, trace_memory=False):
+        self.enabled = True
+        self.trace_memory = trace_memory
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.trace_memory = False
+
+    def reset(self):
+        self.stages = {}
+        self.counters = {}
+        self._peaks = []
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def wrap(self, fn, name=None):
+        if not self.enabled:
+            return fn
+        name = name or fn.__name__
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            with _Stage(self, name):
+                return fn(*args, **kwargs)
+        return timed
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def _enter(self):
+        if self.trace_memory:
+            # Nested stages share tracemalloc's single peak, so the parent's peak so far is banked before resetting.
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+
+    def _exit(self, name, wall, cpu):
+        s = self.stages.get(name)
+        if s is None:
+            s = self.stages[name] = {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_memory_bytes": 0}
+        s["calls"] += 1
+        s["wall_seconds"] += wall
+        s["cpu_seconds"] += cpu
+
+        if self.trace_memory:
+            peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], peak)
+            tracemalloc.reset_peak()
+        else:
+            peak = _max_rss_bytes() or 0
+        s["peak_memory_bytes"] = max(s["peak_memory_bytes"], peak)
+
+    def to_dict(self):
+        return {
+            "memory_source": "tracemalloc" if self.trace_memory else "max_rss",
+            "stages": self.stages,
+            "counters": self.counters
+        }
+
+    def to_prometheus(self, prefix="airline"):
+        lines = []
+        metrics = [
+            ("stage_wall_seconds_total", "counter", "Wall-clock time spent in each pipeline stage", "wall_seconds"),
+            ("stage_cpu_seconds_total", "counter", "CPU time spent in each pipeline stage", "cpu_seconds"),
+            ("stage_calls_total", "counter", "Number of calls of each pipeline stage", "calls"),
+            ("stage_peak_memory_bytes", "gauge", "Peak memory observed during each pipeline stage", "peak_memory_bytes")
+        ]
+        for metric, kind, help_text, key in metrics:
+            lines.append(f"# HELP {prefix}_{metric} {help_text}")
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            for name, s in self.stages.items():
+                lines.append(f'{prefix}_{metric}{{stage="{name}"}} {s[key]}')
+        lines.append(f"# HELP {prefix}_events_total Pipeline hot-path counters")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in self.counters.items():
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, out_dir="output/metrics"):
+        os.makedirs(out_dir, exist_ok=True)
+        json_path = os.path.join(out_dir, "pipeline_metrics.json")
+        prom_path = os.path.join(out_dir, "pipeline_metrics.prom")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        with open(prom_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return json_path, prom_path
+
+    def summary(self):
+        lines = [
+            "┌─ PIPELINE PROFILE " + "─"*59 + "┐",
+            f"│ {'Stage':<30} {'Calls':>8} {'Wall s':>10} {'CPU s':>10} {'Peak MB':>10}"
+        ]
+        for name, s in sorted(self.stages.items(), key=lambda x: x[1]["wall_seconds"], reverse=True):
+            peak = s["peak_memory_bytes"] / (1 << 20)
+            lines.append(f"│ {name:<30} {s['calls']:>8} {s['wall_seconds']:>10.4f} {s['cpu_seconds']:>10.4f} {peak:>10.1f}")
+        if self.counters:
+            lines.append("│")
+            for name, value in self.counters.items():
+                lines.append(f"│ {name:<30} {value:>8}")
+        lines.append("└" + "─"*78 + "┘")
+        return "\n".join(lines)
+
+profiler = Profiler()
+
+PARSER_NAMES = (
+    "parse_engine_logs",
+    "parse_cabin_logs",
+    "parse_weather_logs",
+    "parse_airspeed_altitude_logs",
+    "parse_operational_status",
+    "parse_crew_schedule",
+    "parse_passenger_load"
+)
+
+def instrument_pipeline():
+    from modules import log_processor, pipeline, fleet_engine, rule_engine
+
+    if not profiler.enabled:
+        return
+
+    for name in PARSER_NAMES:
+        setattr(log_processor, name, profiler.wrap(getattr(log_processor, name)))
+    for table in (log_processor._LOG_SOURCES, log_processor._CSV_SOURCES):
+        for key, fn in table.items():
+            table[key] = getattr(log_processor, fn.__name__)
+
+    for name in ("predict_delay", "check_health", "evaluate_crew", "predict_load"):
+        setattr(pipeline, name, profiler.wrap(getattr(pipeline, name)))
+    for name in ("build_fleet_columns", "predict_delay_batch", "check_health_batch",
+                 "evaluate_crew_batch", "predict_load_batch"):
+        setattr(fleet_engine, name, profiler.wrap(getattr(fleet_engine, name)))
+    for name in ("predict_delay", "check_health", "predict_delay_batch", "check_health_batch"):
+        setattr(rule_engine.RuleSet, name, profiler.wrap(getattr(rule_engine.RuleSet, name)))
+
+def count_results(flights, delay_results, health_alerts, crew_issues, load_results, missing):
+    if not profiler.enabled:
+        return
+    profiler.count("flights_evaluated", len(flights))
+    profiler.count("flights_missing_data", len(missing))
+    for d in delay_results:
+        if d["delay_min"] > 0:
+            profiler.count("flights_delayed")
+            for r in d["reasons"]:
+                profiler.count(f"delay_reason_{r.split()[0].lower()}")
+    for lvl, _ in health_alerts:
+        profiler.count(f"health_alerts_{lvl.lower()}")
+    profiler.count("crew_noncompliant_flights", len(crew_issues))
+    profiler.count("overbooked_flights", sum(1 for l in load_results if l.get("overbooking_risk")))
@@ -1,6 +1,15 @@
+import os
+import pickle
 import statistics
+from collections import deque
+
+import numpy as np
+
+from modules.config_loader import compile_section
+from modules.log_processor import format_timestamp
 
 def predict_load(flight, passenger_rules):
+    passenger_rules = compile_section("passenger_rules", passenger_rules)
     p = flight["passenger"]
     hist = p.get("historical_load_pct") or []
     cap = p["capacity"]
@@ -9,16 +18,47 @@ def predict_load(flight, passenger_rules):
     if not hist:
         predicted_pct = (booked / cap) * 100 if cap else 0
     else:
-        w = passenger_rules.get("moving_avg_window", 7)
+        w = passenger_rules.moving_avg_window
         recent = hist[-min(w, len(hist)):]
         predicted_pct = statistics.mean(recent)
 
     predicted_count = int((predicted_pct / 100) * cap)
 
-    over_pct = passenger_rules["overbooking_threshold_pct"]
-    overbook = booked > int(cap * (1 + over_pct / 100))
+    overbook = booked > int(cap * passenger_rules.overbooking_limit_factor)
+
+    under_util = predicted_pct < passenger_rules.under_utilization_pct
+
+    return {
+        "predicted_passengers": predicted_count,
+        "predicted_load_pct": predicted_pct,
+        "overbooking_risk": overbook,
+        "under_utilized": under_util
+    }
+
+def predict_load_batch(cols, passenger_rules):
+    cap = cols["capacity"]
+    booked = cols["booked"]
+    hist_len = cols["historical_load_len"]
+
+    w = passenger_rules.moving_avg_window
+    ends = np.cumsum(hist_len)
+    counts = np.minimum(w, hist_len)
+    sums = np.concatenate(([0], np.cumsum(cols["historical_load_pct"])))
+    window_sum = sums[ends] - sums[ends - counts]
+
+    return _window_load_batch(window_sum, counts, booked, cap, passenger_rules)
+
+def _window_load_batch(window_sum, counts, booked, cap, passenger_rules):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        from_hist = window_sum / counts
+        from_booked = np.where(cap != 0, (booked / cap) * 100, 0.0)
+    predicted_pct = np.where(counts > 0, from_hist, from_booked)
+
+    predicted_count = np.trunc((predicted_pct / 100) * cap).astype(np.int64)
+
+    overbook = booked > np.trunc(cap * passenger_rules.overbooking_limit_factor)
 
-    under_util = predicted_pct < passenger_rules["under_utilization_pct"]
+    under_util = predicted_pct < passenger_rules.under_utilization_pct
 
     return {
         "predicted_passengers": predicted_count,
@@ -26,3 +66,143 @@ def predict_load(flight, passenger_rules):
         "overbooking_risk": overbook,
         "under_utilized": under_util
     }
+
+def expand_load_results(cols, batch):
+    count = batch["predicted_passengers"].tolist()
+    pct = batch["predicted_load_pct"].tolist()
+    over = batch["overbooking_risk"].tolist()
+    under = batch["under_utilized"].tolist()
+    return [
+        {
+            "flight_id": fid,
+            "predicted_passengers": count[i],
+            "predicted_load_pct": pct[i],
+            "overbooking_risk": over[i],
+            "under_utilized": under[i]
+        }
+        for i, fid in enumerate(cols["flight_id"])
+    ]
+
+STORE_FORMAT = 2
+
+def history_key(flight):
+    route = flight["route"]
+    return route["origin"], route["destination"], flight["flight_id"]
+
+class LoadHistoryStore:
+    def __init__(self, window=7):
+        self.window = window
+        self.format = STORE_FORMAT
+        self.entries = {}
+
+    @classmethod
+    def load(cls, path, window=7):
+        try:
+            with open(path, "rb") as f:
+                store = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return cls(window)
+        if getattr(store, "format", 1) != STORE_FORMAT or store.window != window:
+            return cls(window)
+        return store
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def append(self, key, value):
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = [deque(maxlen=self.window), 0, 0, None]
+        values = entry[0]
+        if len(values) == self.window:
+            entry[1] -= values[0]
+        values.append(value)
+        entry[1] += value
+        entry[2] += 1
+
+    def sync(self, key, history, day=None):
+        # Entries are per route and flight number; each new day's history normally extends the last one
+        # or slides it by one value, and either way only the new values are appended.
+        n = len(history)
+        entry = self.entries.get(key)
+        if entry is not None:
+            values, _, seen, last_day = entry
+            if day is not None and last_day is not None and day < last_day:
+                return False
+            if n > seen:
+                new = n - seen
+            elif n == seen and day is not None and day != last_day:
+                new = 1
+            else:
+                new = 0
+            kept = min(len(values), n - new)
+            if n < seen or kept < 0 or list(history[n - new - kept:n - new]) != list(values)[len(values) - kept:]:
+                del self.entries[key]
+                entry = None
+        if entry is None:
+            new = min(n, self.window)
+        for value in history[n - new:]:
+            self.append(key, value)
+        entry = self.entries.get(key)
+        if entry is not None:
+            values = entry[0]
+            # The window never reaches back past the start of the history.
+            while len(values) > n:
+                entry[1] -= values.popleft()
+            entry[2] = n
+            entry[3] = day
+        return True
+
+    def window_sum(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return 0, 0
+        return entry[1], len(entry[0])
+
+    def _window(self, flight):
+        history = flight["passenger"].get("historical_load_pct") or []
+        key = history_key(flight)
+        if self.sync(key, history, format_timestamp(flight["timestamp"])[:10]):
+            return self.window_sum(key)
+        # A flight from a day before the one the store has reached leaves the store alone.
+        recent = history[len(history) - min(self.window, len(history)):]
+        return sum(recent), len(recent)
+
+    def predict(self, flight, passenger_rules):
+        p = flight["passenger"]
+        total, count = self._window(flight)
+        cap = p["capacity"]
+        booked = p["booked"]
+
+        if not count:
+            predicted_pct = (booked / cap) * 100 if cap else 0
+        else:
+            predicted_pct = total / count
+
+        return {
+            "predicted_passengers": int((predicted_pct / 100) * cap),
+            "predicted_load_pct": predicted_pct,
+            "overbooking_risk": booked > int(cap * passenger_rules.overbooking_limit_factor),
+            "under_utilized": predicted_pct < passenger_rules.under_utilization_pct
+        }
+
+    def predict_fleet(self, flights, passenger_rules):
+        n = len(flights)
+        flight_id = []
+        window_sum = np.empty(n, dtype=np.float64)
+        counts = np.empty(n, dtype=np.int64)
+        booked = np.empty(n, dtype=np.int64)
+        cap = np.empty(n, dtype=np.int64)
+        for i, fl in enumerate(flights):
+            p = fl["passenger"]
+            flight_id.append(fl["flight_id"])
+            window_sum[i], counts[i] = self._window(fl)
+            booked[i] = p["booked"]
+            cap[i] = p["capacity"]
+
+        batch = _window_load_batch(window_sum, counts, booked, cap, passenger_rules)
+        return expand_load_results({"flight_id": flight_id}, batch)
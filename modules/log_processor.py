@@ -1,145 +1,231 @@
+import bisect
 import csv
-from datetime import datetime
+import heapq
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from modules.flight_record import FlightRecord
+from modules.pressure_analysis import analyze_pressure, analyze_pressure_fleet, track_pressure, track_pressure_series, tracked_pressure
+from modules.log_scanner import scan_engine_logs, scan_cabin_logs
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_SPLIT_BYTES = 64 << 20
+MERGE_RUN_LINES = 1 << 16
+MERGE_FAN_IN = 64
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Part of every parse cache key; bump it whenever a parser or scanner changes what it returns.
+PARSER_VERSION = 1
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
 
 def _parse_kv(token):
     k, v = token.split(":", 1)
     return k.strip(), v.strip()
 
+@lru_cache(maxsize=1 << 16)
 def _parse_dt(s):
-    return datetime.strptime(s, "%Y-%m-%d %H:%M:%S")
+    if len(s) == 19 and s[4] == "-" and s[7] == "-" and s[10] == " " and s[13] == ":" and s[16] == ":":
+        return datetime.fromisoformat(s)
+    return datetime.strptime(s, TIMESTAMP_FORMAT)
 
-def parse_engine_logs(path="data/engine_performance.log"):
-    out = {}
+@lru_cache(maxsize=1 << 16)
+def _parse_epoch(s):
+    return (_parse_dt(s) - _EPOCH) // _ONE_SECOND
+
+def _ts_parser(epoch):
+    return _parse_epoch if epoch else _parse_dt
+
+def format_timestamp(ts):
+    if isinstance(ts, str):
+        return ts
+    if isinstance(ts, int):
+        ts = _EPOCH + timedelta(seconds=ts)
+    return ts.isoformat(sep=" ")
+
+def timestamp_seconds(ts):
+    if isinstance(ts, int):
+        return ts
+    if isinstance(ts, str):
+        ts = _parse_dt(ts)
+    return (ts - _EPOCH) // _ONE_SECOND
+
+def _iter_log_parts(path, chunk_size=DEFAULT_CHUNK_SIZE):
     with open(path, "r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            parts = line.split("|")
-            ts = _parse_dt(parts[0])
-            fid = parts[1].strip()
-            aid = parts[2].strip()
+        while True:
+            chunk = f.readlines(chunk_size)
+            if not chunk:
+                break
+            for raw in chunk:
+                line = raw.strip()
+                if line:
+                    yield line.split("|")
 
-            k1, v1 = _parse_kv(parts[3])
-            k2, v2 = _parse_kv(parts[4])
-            k3, v3 = _parse_kv(parts[5])
-            k4, v4 = _parse_kv(parts[6])
+def _parse_engine_line(parts, parse_ts=_parse_dt):
+    ts = parse_ts(parts[0])
+    fid = parts[1].strip()
+    aid = parts[2].strip()
 
-            thrust = [float(x) for x in v1.split(",")] if v1 else []
-            vibration = [float(x) for x in v2.split(",")] if v2 else []
-            fuel_burn = float(v3)
-            status = v4
+    k1, v1 = _parse_kv(parts[3])
+    k2, v2 = _parse_kv(parts[4])
+    k3, v3 = _parse_kv(parts[5])
+    k4, v4 = _parse_kv(parts[6])
 
-            out[fid] = {
-                "timestamp": ts,
-                "flight_id": fid,
-                "aircraft_id": aid,
-                "engine_thrust": thrust,
-                "engine_vibration": vibration,
-                "fuel_burn": fuel_burn,
-                "engine_status": status
-            }
-    return out
+    thrust = [float(x) for x in v1.split(",")] if v1 else []
+    vibration = [float(x) for x in v2.split(",")] if v2 else []
+    fuel_burn = float(v3)
+    status = v4
 
-def parse_cabin_logs(path="data/cabin_pressure.log"):
-    series = {}
-    meta = {}
+    return {
+        "timestamp": ts,
+        "flight_id": fid,
+        "aircraft_id": aid,
+        "engine_thrust": thrust,
+        "engine_vibration": vibration,
+        "fuel_burn": fuel_burn,
+        "engine_status": status
+    }
 
-    with open(path, "r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            parts = line.split("|")
-            ts = _parse_dt(parts[0])
-            fid = parts[1].strip()
-            aid = parts[2].strip()
+def parse_engine_logs(path="data/engine_performance.log", epoch=False):
+    parse_ts = _ts_parser(epoch)
+    out = {}
+    for parts in _iter_log_parts(path):
+        rec = _parse_engine_line(parts, parse_ts)
+        out[rec["flight_id"]] = rec
+    return out
 
-            _, p = _parse_kv(parts[3])
-            _, t = _parse_kv(parts[4])
-            _, turb = _parse_kv(parts[5])
-            _, status = _parse_kv(parts[6])
+def _parse_cabin_line(parts, parse_ts=_parse_dt):
+    ts = parse_ts(parts[0])
+    fid = parts[1].strip()
+    aid = parts[2].strip()
 
-            pressure = float(p)
-            temp = float(t)
-            turbulence = int(turb)
+    _, p = _parse_kv(parts[3])
+    _, t = _parse_kv(parts[4])
+    _, turb = _parse_kv(parts[5])
+    _, status = _parse_kv(parts[6])
 
-            series.setdefault(fid, []).append({"ts": ts, "pressure": pressure})
-            meta[fid] = {
-                "flight_id": fid,
-                "aircraft_id": aid,
-                "cabin_pressure": pressure,
-                "cabin_temp": temp,
-                "turbulence": turbulence,
-                "cabin_status": status,
-                "timestamp": ts
-            }
+    return {
+        "flight_id": fid,
+        "aircraft_id": aid,
+        "cabin_pressure": float(p),
+        "cabin_temp": float(t),
+        "turbulence": int(turb),
+        "cabin_status": status,
+        "timestamp": ts
+    }
 
-    for fid in series:
-        series[fid].sort(key=lambda x: x["ts"])
-        pressures = [x["pressure"] for x in series[fid]]
-        meta[fid]["pressure_series"] = pressures
-        if len(pressures) >= 2:
-            meta[fid]["prev_cabin_pressure"] = pressures[-2]
-        else:
-            meta[fid]["prev_cabin_pressure"] = None
+def _finish_cabin_series(meta, series):
+    times, pressures = series
+    analysis = analyze_pressure(times, pressures)
+    pressures = analysis.pop("pressure_series")
+    meta["pressure_series"] = pressures
+    meta["prev_cabin_pressure"] = pressures[-2] if len(pressures) >= 2 else None
+    meta.update(analysis)
+    return meta
 
+def _finish_cabin_all(series, meta):
+    fids = list(series)
+    lengths = [len(series[fid][1]) for fid in fids]
+    result = analyze_pressure_fleet(
+        lengths,
+        [t for fid in fids for t in series[fid][0]],
+        [p for fid in fids for p in series[fid][1]]
+    )
+    flat = result["pressure"].tolist()
+    starts = result["starts"].tolist()
+    rate = result["max_drop_rate"].tolist()
+    drop = result["sustained_drop"].tolist()
+    minutes = result["sustained_minutes"].tolist()
+    outliers = result["outliers"].tolist()
+
+    for i, fid in enumerate(fids):
+        pressures = flat[starts[i]:starts[i] + lengths[i]]
+        m = meta[fid]
+        m["pressure_series"] = pressures
+        m["prev_cabin_pressure"] = pressures[-2] if len(pressures) >= 2 else None
+        m["pressure_max_drop_rate"] = rate[i]
+        m["pressure_sustained_drop"] = drop[i]
+        m["pressure_sustained_minutes"] = minutes[i]
+        m["pressure_outliers"] = outliers[i]
     return meta
 
-def parse_weather_logs(path="data/weather_data.log"):
-    out = {}
-    with open(path, "r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            parts = line.split("|")
-            ts = _parse_dt(parts[0])
-            fid = parts[1].strip()
-            origin = parts[2].strip()
-            dest = parts[3].strip()
+def _collect_cabin(parts_iter, parse_ts=_parse_dt):
+    series = {}
+    meta = {}
+    for parts in parts_iter:
+        rec = _parse_cabin_line(parts, parse_ts)
+        fid = rec["flight_id"]
+        entry = series.get(fid)
+        if entry is None:
+            entry = series[fid] = ([], [])
+        entry[0].append(rec["timestamp"])
+        entry[1].append(rec["cabin_pressure"])
+        meta[fid] = rec
+    return series, meta
 
-            _, cw = _parse_kv(parts[4])
-            _, vis = _parse_kv(parts[5])
-            _, tsf = _parse_kv(parts[6])
-            _, cond = _parse_kv(parts[7])
+def parse_cabin_logs(path="data/cabin_pressure.log", epoch=False):
+    series, meta = _collect_cabin(_iter_log_parts(path), _ts_parser(epoch))
+    return _finish_cabin_all(series, meta)
 
-            out[fid] = {
-                "timestamp": ts,
-                "flight_id": fid,
-                "origin": origin,
-                "destination": dest,
-                "crosswind": int(cw),
-                "visibility": int(vis),
-                "thunderstorm": (tsf.upper() == "YES"),
-                "condition": cond
-            }
-    return out
+def _parse_weather_line(parts, parse_ts=_parse_dt):
+    ts = parse_ts(parts[0])
+    fid = parts[1].strip()
+    origin = parts[2].strip()
+    dest = parts[3].strip()
 
-def parse_airspeed_altitude_logs(path="data/airspeed_altitude.log"):
+    _, cw = _parse_kv(parts[4])
+    _, vis = _parse_kv(parts[5])
+    _, tsf = _parse_kv(parts[6])
+    _, cond = _parse_kv(parts[7])
+
+    return {
+        "timestamp": ts,
+        "flight_id": fid,
+        "origin": origin,
+        "destination": dest,
+        "crosswind": int(cw),
+        "visibility": int(vis),
+        "thunderstorm": (tsf.upper() == "YES"),
+        "condition": cond
+    }
+
+def parse_weather_logs(path="data/weather_data.log", epoch=False):
+    parse_ts = _ts_parser(epoch)
     out = {}
-    with open(path, "r", encoding="utf-8") as f:
-        for raw in f:
-            line = raw.strip()
-            if not line:
-                continue
-            parts = line.split("|")
-            ts = _parse_dt(parts[0])
-            fid = parts[1].strip()
-            aid = parts[2].strip()
+    for parts in _iter_log_parts(path):
+        rec = _parse_weather_line(parts, parse_ts)
+        out[rec["flight_id"]] = rec
+    return out
 
-            _, spd = _parse_kv(parts[3])
-            _, alt = _parse_kv(parts[4])
-            _, status = _parse_kv(parts[5])
+def _parse_airspeed_line(parts, parse_ts=_parse_dt):
+    ts = parse_ts(parts[0])
+    fid = parts[1].strip()
+    aid = parts[2].strip()
 
-            out[fid] = {
-                "timestamp": ts,
-                "flight_id": fid,
-                "aircraft_id": aid,
-                "airspeed": int(spd),
-                "altitude": int(alt),
-                "airspeed_status": status
-            }
+    _, spd = _parse_kv(parts[3])
+    _, alt = _parse_kv(parts[4])
+    _, status = _parse_kv(parts[5])
+
+    return {
+        "timestamp": ts,
+        "flight_id": fid,
+        "aircraft_id": aid,
+        "airspeed": int(spd),
+        "altitude": int(alt),
+        "airspeed_status": status
+    }
+
+def parse_airspeed_altitude_logs(path="data/airspeed_altitude.log", epoch=False):
+    parse_ts = _ts_parser(epoch)
+    out = {}
+    for parts in _iter_log_parts(path):
+        rec = _parse_airspeed_line(parts, parse_ts)
+        out[rec["flight_id"]] = rec
     return out
 
 def parse_operational_status(path="data/operational_status.csv"):
@@ -240,6 +326,410 @@ def parse_passenger_load(path="data/passenger_load.csv"):
             }
     return out
 
+def _build_flight(fid, engine, cabin, weather, airspeed, ops, crew, pax):
+    return {
+        "flight_id": fid,
+        "aircraft_id": engine["aircraft_id"],
+        "timestamp": engine["timestamp"] if isinstance(engine["timestamp"], int) else format_timestamp(engine["timestamp"]),
+        "metrics": {
+            "engine_thrust": engine["engine_thrust"],
+            "engine_vibration": engine["engine_vibration"],
+            "fuel_burn": engine["fuel_burn"],
+            "cabin_pressure": cabin["cabin_pressure"],
+            "prev_cabin_pressure": cabin.get("prev_cabin_pressure"),
+            "pressure_max_drop_rate": cabin.get("pressure_max_drop_rate"),
+            "pressure_sustained_drop": cabin.get("pressure_sustained_drop"),
+            "pressure_sustained_minutes": cabin.get("pressure_sustained_minutes"),
+            "pressure_outliers": cabin.get("pressure_outliers"),
+            "cabin_temp": cabin["cabin_temp"],
+            "turbulence": cabin["turbulence"],
+            "airspeed": airspeed["airspeed"],
+            "altitude": airspeed["altitude"]
+        },
+        "status": {
+            "codes": {
+                "engine": engine["engine_status"],
+                "cabin": cabin["cabin_status"],
+                "airspeed": airspeed["airspeed_status"]
+            },
+            "weather": {
+                "crosswind": weather["crosswind"],
+                "visibility": weather["visibility"],
+                "thunderstorm": weather["thunderstorm"],
+                "condition": weather["condition"]
+            },
+            "operational": {
+                "runway_queue": ops["runway_queue"],
+                "boarding_time": ops["boarding_time"],
+                "crew_available": crew["crew_available"]
+            }
+        },
+        "passenger": {
+            "booked": pax["booked"],
+            "capacity": pax["capacity"],
+            "historical_load_pct": pax["historical_load_pct"]
+        },
+        "crew": {
+            "pilots": crew["pilots"],
+            "cabin_crew": crew["cabin_crew"]
+        },
+        "route": {
+            "origin": weather["origin"],
+            "destination": weather["destination"],
+            "alternate": ["HYD", "CCU", "AMD"]
+        }
+    }
+
+def _build_record(fid, engine, cabin, weather, airspeed, ops, crew, pax):
+    return FlightRecord(
+        flight_id=fid,
+        aircraft_id=engine["aircraft_id"],
+        timestamp=engine["timestamp"] if isinstance(engine["timestamp"], int) else format_timestamp(engine["timestamp"]),
+        engine_thrust=engine["engine_thrust"],
+        engine_vibration=engine["engine_vibration"],
+        fuel_burn=engine["fuel_burn"],
+        cabin_pressure=cabin["cabin_pressure"],
+        prev_cabin_pressure=cabin.get("prev_cabin_pressure"),
+        pressure_max_drop_rate=cabin.get("pressure_max_drop_rate"),
+        pressure_sustained_drop=cabin.get("pressure_sustained_drop"),
+        pressure_sustained_minutes=cabin.get("pressure_sustained_minutes"),
+        pressure_outliers=cabin.get("pressure_outliers"),
+        cabin_temp=cabin["cabin_temp"],
+        turbulence=cabin["turbulence"],
+        airspeed=airspeed["airspeed"],
+        altitude=airspeed["altitude"],
+        engine_status=engine["engine_status"],
+        cabin_status=cabin["cabin_status"],
+        airspeed_status=airspeed["airspeed_status"],
+        crosswind=weather["crosswind"],
+        visibility=weather["visibility"],
+        thunderstorm=weather["thunderstorm"],
+        condition=weather["condition"],
+        runway_queue=ops["runway_queue"],
+        boarding_time=ops["boarding_time"],
+        crew_available=crew["crew_available"],
+        booked=pax["booked"],
+        capacity=pax["capacity"],
+        historical_load_pct=pax["historical_load_pct"],
+        pilots=crew["pilots"],
+        cabin_crew=crew["cabin_crew"],
+        origin=weather["origin"],
+        destination=weather["destination"]
+    )
+
+def _log_byte_ranges(path, pieces):
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for k in range(1, pieces):
+            f.seek(size * k // pieces)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _iter_log_parts_range(path, start, end):
+    with open(path, "rb") as f:
+        f.seek(start)
+        pos = start
+        while pos < end:
+            raw = f.readline()
+            if not raw:
+                break
+            pos += len(raw)
+            line = raw.decode("utf-8").strip()
+            if line:
+                yield line.split("|")
+
+def _parse_log_range(source, path, start, end, epoch=False):
+    parse_ts = _ts_parser(epoch)
+    parts_iter = _iter_log_parts_range(path, start, end)
+    if source == "cabin":
+        return _collect_cabin(parts_iter, parse_ts)
+    parse_line = _LOG_LINE_PARSERS[source]
+    out = {}
+    for parts in parts_iter:
+        rec = parse_line(parts, parse_ts)
+        out[rec["flight_id"]] = rec
+    return out
+
+def _merge_log_ranges(source, results):
+    if source != "cabin":
+        out = {}
+        for part in results:
+            out.update(part)
+        return out
+
+    series = {}
+    meta = {}
+    for part_series, part_meta in results:
+        for fid, (times, pressures) in part_series.items():
+            entry = series.get(fid)
+            if entry is None:
+                entry = series[fid] = ([], [])
+            entry[0].extend(times)
+            entry[1].extend(pressures)
+        meta.update(part_meta)
+    return _finish_cabin_all(series, meta)
+
+def _parse_sources_parallel(log_paths, csv_jobs, workers, split_bytes, epoch=False, scan_paths=None):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        scan_futures = {name: pool.submit(_SCANNED_SOURCES[name], path, epoch) for name, path in (scan_paths or {}).items()}
+        log_futures = {}
+        for source, path in log_paths.items():
+            size = os.path.getsize(path)
+            pieces = max(1, min(workers, -(-size // split_bytes)))
+            log_futures[source] = [
+                pool.submit(_parse_log_range, source, path, start, end, epoch)
+                for start, end in _log_byte_ranges(path, pieces)
+            ]
+        csv_futures = {name: pool.submit(fn, path) for name, (fn, path) in csv_jobs.items()}
+
+        out = {source: _merge_log_ranges(source, [f.result() for f in futures])
+               for source, futures in log_futures.items()}
+        out.update({name: f.result() for name, f in csv_futures.items()})
+        out.update({name: f.result() for name, f in scan_futures.items()})
+    return out
+
+_LOG_SOURCES = {
+    "engine": parse_engine_logs,
+    "cabin": parse_cabin_logs,
+    "weather": parse_weather_logs,
+    "airspeed": parse_airspeed_altitude_logs
+}
+
+_SCANNED_SOURCES = {
+    "engine": scan_engine_logs,
+    "cabin": scan_cabin_logs
+}
+
+SCANNERS = ("lines", "mmap")
+
+_CSV_SOURCES = {
+    "ops": parse_operational_status,
+    "crew": parse_crew_schedule,
+    "pax": parse_passenger_load
+}
+
+def _parse_sources(paths, workers, split_bytes, epoch, cache, scanner="lines", sources=None):
+    parsed = {}
+    if cache is not None:
+        for name, path in paths.items():
+            value = cache.get(name, [path], {"epoch": epoch, "parser": PARSER_VERSION})
+            if value is not None:
+                parsed[name] = value
+        sources = dict(sources or {})
+        unseen = [n for n in paths if n not in parsed and n not in sources]
+        sources.update(zip(unseen, cache.fingerprint([paths[n] for n in unseen])))
+
+    todo_logs = {n: paths[n] for n in _LOG_SOURCES if n not in parsed}
+    todo_csv = {n: (_CSV_SOURCES[n], paths[n]) for n in _CSV_SOURCES if n not in parsed}
+    todo_scan = {}
+    if scanner == "mmap":
+        todo_scan = {n: todo_logs.pop(n) for n in _SCANNED_SOURCES if n in todo_logs}
+
+    if workers and workers > 1 and len(todo_logs) + len(todo_csv) + len(todo_scan) > 0:
+        fresh = _parse_sources_parallel(todo_logs, todo_csv, workers, split_bytes, epoch, todo_scan)
+    else:
+        fresh = {n: _SCANNED_SOURCES[n](path, epoch) for n, path in todo_scan.items()}
+        fresh.update({n: _LOG_SOURCES[n](path, epoch) for n, path in todo_logs.items()})
+        fresh.update({n: fn(path) for n, (fn, path) in todo_csv.items()})
+
+    if cache is not None:
+        for name, value in fresh.items():
+            cache.put(name, [sources[name]], value, {"epoch": epoch, "parser": PARSER_VERSION})
+
+    parsed.update(fresh)
+    return parsed
+
+SOURCE_NAMES = ("engine", "cabin", "weather", "airspeed", "ops", "crew", "pax")
+JOIN_MODES = ("index", "hash", "merge")
+
+def _index_join(parsed, build):
+    engine = parsed["engine"]
+    cabin = parsed["cabin"]
+    weather = parsed["weather"]
+    airspeed = parsed["airspeed"]
+    ops = parsed["ops"]
+    crew = parsed["crew"]
+    pax = parsed["pax"]
+
+    flight_ids = set()
+    for d in (engine, cabin, weather, airspeed, ops, crew, pax):
+        flight_ids.update(d.keys())
+
+    flights = []
+    missing = []
+    missing_sources = {}
+
+    for fid in sorted(flight_ids):
+        if fid not in engine or fid not in cabin or fid not in weather or fid not in airspeed or fid not in ops or fid not in crew or fid not in pax:
+            missing.append(fid)
+            missing_sources[fid] = [name for name in SOURCE_NAMES if fid not in parsed[name]]
+            continue
+
+        flights.append(build(
+            fid, engine[fid], cabin[fid], weather[fid], airspeed[fid], ops[fid], crew[fid], pax[fid]
+        ))
+
+    return {"flights": flights, "missing_flights": missing, "missing_sources": missing_sources}
+
+def _hash_join(paths, epoch, build):
+    ops = parse_operational_status(paths["ops"])
+    crew = parse_crew_schedule(paths["crew"])
+    pax = parse_passenger_load(paths["pax"])
+
+    # Only flights present in every CSV can be complete; log lines of any other flight just mark the source as seen.
+    slots = {fid: [None, None, None, None] for fid in ops if fid in crew and fid in pax}
+    seen = {}
+    series = {}
+    parse_ts = _ts_parser(epoch)
+
+    for k, name in enumerate(SOURCE_NAMES[:4]):
+        parse_line = _LOG_LINE_PARSERS[name]
+        bit = 1 << k
+        for parts in _iter_log_parts(paths[name]):
+            fid = parts[1].strip()
+            slot = slots.get(fid)
+            if slot is None:
+                seen[fid] = seen.get(fid, 0) | bit
+                continue
+            rec = parse_line(parts, parse_ts)
+            slot[k] = rec
+            if k == 1:
+                entry = series.get(fid)
+                if entry is None:
+                    entry = series[fid] = ([], [])
+                entry[0].append(rec["timestamp"])
+                entry[1].append(rec["cabin_pressure"])
+
+    _finish_cabin_all(series, {fid: slots[fid][1] for fid in series})
+
+    flight_ids = set(slots)
+    for d in (seen, ops, crew, pax):
+        flight_ids.update(d.keys())
+
+    flights = []
+    missing = []
+    missing_sources = {}
+    for fid in sorted(flight_ids):
+        slot = slots.get(fid)
+        if slot is not None:
+            engine, cabin, weather, airspeed = slot
+            if engine is not None and cabin is not None and weather is not None and airspeed is not None:
+                flights.append(build(fid, engine, cabin, weather, airspeed, ops[fid], crew[fid], pax[fid]))
+                continue
+            absent = [name for name, rec in zip(SOURCE_NAMES, slot) if rec is None]
+        else:
+            mask = seen.get(fid, 0)
+            absent = [name for k, name in enumerate(SOURCE_NAMES[:4]) if not mask & (1 << k)]
+            absent.extend(name for name, d in (("ops", ops), ("crew", crew), ("pax", pax)) if fid not in d)
+        missing.append(fid)
+        missing_sources[fid] = absent
+
+    return {"flights": flights, "missing_flights": missing, "missing_sources": missing_sources}
+
+def _flight_key(item):
+    return item[0]
+
+def _spill_run(run):
+    run.sort(key=_flight_key)
+    f = tempfile.TemporaryFile("w+", encoding="utf-8")
+    f.writelines("|".join(parts) + "\n" for _, parts in run)
+    f.seek(0)
+    return f
+
+def _iter_run(f):
+    for line in f:
+        parts = line.rstrip("\n").split("|")
+        yield parts[1].strip(), parts
+
+def _combine_runs(spilled):
+    f = tempfile.TemporaryFile("w+", encoding="utf-8")
+    f.writelines("|".join(parts) + "\n" for _, parts in heapq.merge(*map(_iter_run, spilled), key=_flight_key))
+    f.seek(0)
+    for old in spilled:
+        old.close()
+    return f
+
+def _iter_log_groups(k, name, path, parse_ts, run_lines=MERGE_RUN_LINES):
+    # Logs are written in timestamp order, so they are sorted by flight ID in runs of run_lines lines.
+    # Every run but the last is spilled to a temporary file; the sorts are stable and heapq.merge
+    # prefers earlier runs on ties, so each flight's lines keep their order in the file.
+    parse_line = _LOG_LINE_PARSERS[name]
+    spilled = []
+    try:
+        run = []
+        for parts in _iter_log_parts(path):
+            run.append((parts[1].strip(), parts))
+            if len(run) == run_lines:
+                spilled.append(_spill_run(run))
+                run = []
+                if len(spilled) == MERGE_FAN_IN:
+                    # Keeps the number of open temporary files bounded on very large logs.
+                    spilled[:] = [_combine_runs(spilled)]
+        run.sort(key=_flight_key)
+
+        prev = None
+        group = []
+        for fid, parts in heapq.merge(*map(_iter_run, spilled), run, key=_flight_key):
+            if fid != prev:
+                if group:
+                    yield prev, k, group
+                prev = fid
+                group = []
+            group.append(parse_line(parts, parse_ts))
+        if group:
+            yield prev, k, group
+    finally:
+        for f in spilled:
+            f.close()
+
+def _iter_table_rows(k, table):
+    for fid in sorted(table):
+        yield fid, k, table[fid]
+
+def _merge_join(paths, epoch, build, run_lines=MERGE_RUN_LINES):
+    parse_ts = _ts_parser(epoch)
+    streams = [_iter_log_groups(k, name, paths[name], parse_ts, run_lines) for k, name in enumerate(SOURCE_NAMES[:4])]
+    for k, name in enumerate(SOURCE_NAMES[4:], 4):
+        streams.append(_iter_table_rows(k, _CSV_SOURCES[name](paths[name])))
+
+    complete = []
+    series = {}
+    meta = {}
+    missing = []
+    missing_sources = {}
+    current = None
+    row = [None] * 7
+
+    for fid, k, value in heapq.merge(*streams):
+        if fid != current:
+            if current is not None:
+                _close_merged(current, row, complete, series, meta, missing, missing_sources)
+            current = fid
+            row = [None] * 7
+        row[k] = value
+    if current is not None:
+        _close_merged(current, row, complete, series, meta, missing, missing_sources)
+
+    _finish_cabin_all(series, meta)
+    flights = [build(fid, engine, meta[fid], weather, airspeed, ops, crew, pax)
+               for fid, engine, weather, airspeed, ops, crew, pax in complete]
+    return {"flights": flights, "missing_flights": missing, "missing_sources": missing_sources}
+
+def _close_merged(fid, row, complete, series, meta, missing, missing_sources):
+    if None in row:
+        missing.append(fid)
+        missing_sources[fid] = [name for name, value in zip(SOURCE_NAMES, row) if value is None]
+        return
+    cabin = row[1]
+    series[fid] = ([r["timestamp"] for r in cabin], [r["cabin_pressure"] for r in cabin])
+    meta[fid] = cabin[-1]
+    complete.append((fid, row[0][-1], row[2][-1], row[3][-1], row[4], row[5], row[6]))
+
 def integrate_flight_data(
     engine_path="data/engine_performance.log",
     cabin_path="data/cabin_pressure.log",
@@ -247,75 +737,340 @@ def integrate_flight_data(
     airspeed_path="data/airspeed_altitude.log",
     ops_path="data/operational_status.csv",
     crew_path="data/crew_schedule.csv",
-    pax_path="data/passenger_load.csv"
+    pax_path="data/passenger_load.csv",
+    workers=1,
+    split_bytes=DEFAULT_SPLIT_BYTES,
+    epoch=False,
+    cache=None,
+    compact=False,
+    join="index",
+    scanner="lines"
+):
+    if join not in JOIN_MODES:
+        raise ValueError(f"unknown join '{join}' (expected one of {', '.join(JOIN_MODES)})")
+    if scanner not in SCANNERS:
+        raise ValueError(f"unknown scanner '{scanner}' (expected one of {', '.join(SCANNERS)})")
+    paths = {
+        "engine": engine_path,
+        "cabin": cabin_path,
+        "weather": weather_path,
+        "airspeed": airspeed_path,
+        "ops": ops_path,
+        "crew": crew_path,
+        "pax": pax_path
+    }
+    options = {"epoch": epoch, "parser": PARSER_VERSION}
+    if compact:
+        options["compact"] = True
+    sources = None
+    if cache is not None:
+        cached = cache.get("flights", list(paths.values()), options)
+        if cached is not None:
+            if compact:
+                cached["flights"] = [FlightRecord.from_dict(fl) for fl in cached["flights"]]
+            return cached
+        sources = dict(zip(paths, cache.fingerprint(list(paths.values()))))
+
+    build = _build_record if compact else _build_flight
+    if join == "hash":
+        result = _hash_join(paths, epoch, build)
+    elif join == "merge":
+        result = _merge_join(paths, epoch, build)
+    else:
+        result = _index_join(_parse_sources(paths, workers, split_bytes, epoch, cache, scanner, sources), build)
+
+    if cache is not None:
+        cache.put("flights", list(sources.values()), result, options)
+    return result
+
+def _iter_log_records(source, path, parse_line, chunk_size, parse_ts):
+    for parts in _iter_log_parts(path, chunk_size):
+        rec = parse_line(parts, parse_ts)
+        yield rec["timestamp"], source, rec
+
+def _record_time(item):
+    return item[0]
+
+def _close_pending(fid, state, ops, crew, pax, build=_build_flight):
+    row = (state.get("engine"), state.get("cabin"), state.get("weather"), state.get("airspeed"),
+           ops.pop(fid, None), crew.pop(fid, None), pax.pop(fid, None))
+    if any(value is None for value in row):
+        return None, [name for name, value in zip(SOURCE_NAMES, row) if value is None]
+    cabin = _finish_cabin_series(state["cabin"], state["series"])
+    return build(fid, row[0], cabin, row[2], row[3], row[4], row[5], row[6]), None
+
+def iter_flight_data(
+    engine_path="data/engine_performance.log",
+    cabin_path="data/cabin_pressure.log",
+    weather_path="data/weather_data.log",
+    airspeed_path="data/airspeed_altitude.log",
+    ops_path="data/operational_status.csv",
+    crew_path="data/crew_schedule.csv",
+    pax_path="data/passenger_load.csv",
+    missing=None,
+    missing_sources=None,
+    late=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    idle_window_min=60,
+    epoch=False,
+    compact=False
 ):
-    engine = parse_engine_logs(engine_path)
-    cabin = parse_cabin_logs(cabin_path)
-    weather = parse_weather_logs(weather_path)
-    airspeed = parse_airspeed_altitude_logs(airspeed_path)
     ops = parse_operational_status(ops_path)
     crew = parse_crew_schedule(crew_path)
     pax = parse_passenger_load(pax_path)
 
-    flight_ids = set()
-    for d in (engine, cabin, weather, airspeed, ops, crew, pax):
-        flight_ids.update(d.keys())
+    if missing is None:
+        missing = []
+    if missing_sources is None:
+        missing_sources = {}
+    if late is None:
+        late = {}
+    reported = set(missing)
+    closed = set()
 
-    flights = []
-    missing = []
+    parse_ts = _ts_parser(epoch)
+    streams = [
+        _iter_log_records("engine", engine_path, _parse_engine_line, chunk_size, parse_ts),
+        _iter_log_records("cabin", cabin_path, _parse_cabin_line, chunk_size, parse_ts),
+        _iter_log_records("weather", weather_path, _parse_weather_line, chunk_size, parse_ts),
+        _iter_log_records("airspeed", airspeed_path, _parse_airspeed_line, chunk_size, parse_ts)
+    ]
+    window = idle_window_min * 60 if epoch else timedelta(minutes=idle_window_min)
+    build = _build_record if compact else _build_flight
 
-    for fid in sorted(flight_ids):
-        if fid not in engine or fid not in cabin or fid not in weather or fid not in airspeed or fid not in ops or fid not in crew or fid not in pax:
-            missing.append(fid)
+    # Flights are kept in last-seen order, so the idle ones are always at the front.
+    pending = OrderedDict()
+
+    for ts, source, rec in heapq.merge(*streams, key=_record_time):
+        fid = rec["flight_id"]
+        # Data for a flight the idle window already closed would only produce a fragment of it.
+        if fid in closed:
+            late[fid] = late.get(fid, 0) + 1
             continue
+        state = pending.get(fid)
+        if state is None:
+            state = pending[fid] = {"series": ([], [])}
+        else:
+            pending.move_to_end(fid)
+        if source == "cabin":
+            state["series"][0].append(ts)
+            state["series"][1].append(rec["cabin_pressure"])
+        state[source] = rec
+        state["last_seen"] = ts
 
-        flights.append({
-            "flight_id": fid,
-            "aircraft_id": engine[fid]["aircraft_id"],
-            "timestamp": engine[fid]["timestamp"].isoformat(sep=" "),
-            "metrics": {
-                "engine_thrust": engine[fid]["engine_thrust"],
-                "engine_vibration": engine[fid]["engine_vibration"],
-                "fuel_burn": engine[fid]["fuel_burn"],
-                "cabin_pressure": cabin[fid]["cabin_pressure"],
-                "prev_cabin_pressure": cabin[fid].get("prev_cabin_pressure"),
-                "cabin_temp": cabin[fid]["cabin_temp"],
-                "turbulence": cabin[fid]["turbulence"],
-                "airspeed": airspeed[fid]["airspeed"],
-                "altitude": airspeed[fid]["altitude"]
-            },
-            "status": {
-                "codes": {
-                    "engine": engine[fid]["engine_status"],
-                    "cabin": cabin[fid]["cabin_status"],
-                    "airspeed": airspeed[fid]["airspeed_status"]
-                },
-                "weather": {
-                    "crosswind": weather[fid]["crosswind"],
-                    "visibility": weather[fid]["visibility"],
-                    "thunderstorm": weather[fid]["thunderstorm"],
-                    "condition": weather[fid]["condition"]
-                },
-                "operational": {
-                    "runway_queue": ops[fid]["runway_queue"],
-                    "boarding_time": ops[fid]["boarding_time"],
-                    "crew_available": crew[fid]["crew_available"]
-                }
-            },
-            "passenger": {
-                "booked": pax[fid]["booked"],
-                "capacity": pax[fid]["capacity"],
-                "historical_load_pct": pax[fid]["historical_load_pct"]
-            },
-            "crew": {
-                "pilots": crew[fid]["pilots"],
-                "cabin_crew": crew[fid]["cabin_crew"]
-            },
-            "route": {
-                "origin": weather[fid]["origin"],
-                "destination": weather[fid]["destination"],
-                "alternate": ["HYD", "CCU", "AMD"]
-            }
-        })
+        cutoff = ts - window
+        while pending:
+            old_fid = next(iter(pending))
+            if pending[old_fid]["last_seen"] >= cutoff:
+                break
+            closed.add(old_fid)
+            flight, absent = _close_pending(old_fid, pending.pop(old_fid), ops, crew, pax, build)
+            if flight is not None:
+                yield flight
+            elif old_fid not in reported:
+                reported.add(old_fid)
+                missing.append(old_fid)
+                missing_sources[old_fid] = absent
+
+    while pending:
+        fid, state = pending.popitem(last=False)
+        flight, absent = _close_pending(fid, state, ops, crew, pax, build)
+        if flight is not None:
+            yield flight
+        elif fid not in reported:
+            reported.add(fid)
+            missing.append(fid)
+            missing_sources[fid] = absent
+
+    for fid in sorted(set(ops) | set(crew) | set(pax)):
+        if fid not in reported:
+            reported.add(fid)
+            missing.append(fid)
+            missing_sources[fid] = list(SOURCE_NAMES[:4]) + [name for name, d in (("ops", ops), ("crew", crew), ("pax", pax)) if fid not in d]
+
+def _iter_appended_parts(path, offset):
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            line = raw.decode("utf-8").strip()
+            if line:
+                yield offset, line.split("|")
+            else:
+                yield offset, None
+
+def tail_log_records(name, path, position, epoch=False):
+    st = os.stat(path)
+    if position.get("inode") != st.st_ino or st.st_size < position.get("offset", 0):
+        position["inode"] = st.st_ino
+        position["offset"] = 0
+    if st.st_size == position["offset"]:
+        return
+
+    parse_line = _LOG_LINE_PARSERS[name]
+    parse_ts = _ts_parser(epoch)
+    for offset, parts in _iter_appended_parts(path, position["offset"]):
+        position["offset"] = offset
+        if parts is not None:
+            yield parse_line(parts, parse_ts)
+
+_LOG_LINE_PARSERS = {
+    "engine": _parse_engine_line,
+    "cabin": _parse_cabin_line,
+    "weather": _parse_weather_line,
+    "airspeed": _parse_airspeed_line
+}
 
-    return {"flights": flights, "missing_flights": missing}
+DEFAULT_PATHS = {
+    "engine": "data/engine_performance.log",
+    "cabin": "data/cabin_pressure.log",
+    "weather": "data/weather_data.log",
+    "airspeed": "data/airspeed_altitude.log",
+    "ops": "data/operational_status.csv",
+    "crew": "data/crew_schedule.csv",
+    "pax": "data/passenger_load.csv"
+}
+
+class IncrementalIngestor:
+    def __init__(self, paths=None, epoch=False):
+        self.paths = dict(DEFAULT_PATHS, **(paths or {}))
+        self.epoch = epoch
+        self.positions = {}
+        self.sources = {name: {} for name in self.paths}
+        self.cabin_times = {}
+
+    @classmethod
+    def load(cls, state_path, paths=None, epoch=False):
+        try:
+            with open(state_path, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return cls(paths, epoch)
+        if state.paths != dict(DEFAULT_PATHS, **(paths or {})) or state.epoch != epoch:
+            return cls(paths, epoch)
+        return state
+
+    def save(self, state_path):
+        os.makedirs(os.path.dirname(state_path) or ".", exist_ok=True)
+        tmp = state_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, state_path)
+
+    def _reset(self, name):
+        changed = set(self.sources[name])
+        self.sources[name] = {}
+        if name == "cabin":
+            self.cabin_times = {}
+        return changed
+
+    def _add_cabin(self, rec):
+        fid = rec["flight_id"]
+        ts = rec["timestamp"]
+        pressure = rec["cabin_pressure"]
+
+        prev = self.sources["cabin"].get(fid)
+        if prev is None:
+            times = self.cabin_times[fid] = []
+            pressures = []
+            track = None
+        else:
+            times = self.cabin_times[fid]
+            pressures = prev["pressure_series"]
+            track = prev.get("pressure_track")
+
+        if track is not None and ts >= times[-1]:
+            times.append(ts)
+            pressures.append(pressure)
+            track = track_pressure(track, ts, pressure)
+        else:
+            pos = bisect.bisect_right(times, ts)
+            times.insert(pos, ts)
+            pressures.insert(pos, pressure)
+            track = track_pressure_series(times, pressures)
+
+        rec["pressure_series"] = pressures
+        rec["pressure_track"] = track
+        rec["prev_cabin_pressure"] = pressures[-2] if len(pressures) >= 2 else None
+        self.sources["cabin"][fid] = rec
+
+    def _cabin(self, fid):
+        rec = self.sources["cabin"][fid]
+        if "pressure_max_drop_rate" not in rec:
+            rec.update(tracked_pressure(rec["pressure_track"], rec["pressure_series"]))
+        return rec
+
+    def _tail_log(self, name):
+        path = self.paths[name]
+        st = os.stat(path)
+        pos = self.positions.get(name)
+
+        changed = set()
+        if pos is None or pos["inode"] != st.st_ino or st.st_size < pos["offset"]:
+            changed = self._reset(name)
+            pos = self.positions[name] = {"inode": st.st_ino, "offset": 0}
+        if st.st_size == pos["offset"]:
+            return changed
+
+        parse_line = _LOG_LINE_PARSERS[name]
+        parse_ts = _ts_parser(self.epoch)
+        target = self.sources[name]
+
+        for offset, parts in _iter_appended_parts(path, pos["offset"]):
+            pos["offset"] = offset
+            if parts is None:
+                continue
+            rec = parse_line(parts, parse_ts)
+            if name == "cabin":
+                self._add_cabin(rec)
+            else:
+                target[rec["flight_id"]] = rec
+            changed.add(rec["flight_id"])
+        return changed
+
+    def _reload_csv(self, name):
+        path = self.paths[name]
+        st = os.stat(path)
+        stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+        pos = self.positions.get(name)
+        if pos is not None and pos["stamp"] == stamp:
+            return set()
+
+        new = _CSV_SOURCES[name](path)
+        old = self.sources[name]
+        changed = {fid for fid in set(old) | set(new) if old.get(fid) != new.get(fid)}
+        self.sources[name] = new
+        self.positions[name] = {"stamp": stamp}
+        return changed
+
+    def update(self):
+        changed = set()
+        for name in _LOG_LINE_PARSERS:
+            changed |= self._tail_log(name)
+        for name in _CSV_SOURCES:
+            changed |= self._reload_csv(name)
+        return changed
+
+    def flights(self, fids=None):
+        s = self.sources
+        if fids is None:
+            fids = set()
+            for d in s.values():
+                fids.update(d.keys())
+
+        flights = []
+        missing = []
+        missing_sources = {}
+        for fid in sorted(fids):
+            absent = [name for name in SOURCE_NAMES if fid not in s[name]]
+            if absent:
+                missing.append(fid)
+                missing_sources[fid] = absent
+                continue
+            flights.append(_build_flight(
+                fid, s["engine"][fid], self._cabin(fid), s["weather"][fid], s["airspeed"][fid],
+                s["ops"][fid], s["crew"][fid], s["pax"][fid]
+            ))
+        return {"flights": flights, "missing_flights": missing, "missing_sources": missing_sources}
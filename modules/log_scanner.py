@@ -0,0 +1,358 @@
+import mmap
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+
+from modules.pressure_analysis import analyze_pressure_fleet
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+ENGINE_FIELDS = (
+    ("engine_thrust", "list"),
+    ("engine_vibration", "list"),
+    ("fuel_burn", "float"),
+    ("engine_status", "str")
+)
+CABIN_FIELDS = (
+    ("cabin_pressure", "float"),
+    ("cabin_temp", "float"),
+    ("turbulence", "int"),
+    ("cabin_status", "str")
+)
+
+_KINDS = {"float": np.float64, "int": np.int64, "str": "S1"}
+
+def _line_pattern(count):
+    head = rb"[ \t]*([^|\n]*)\|[ \t]*([^|\n]*?)[ \t]*\|[ \t]*([^|\n]*?)[ \t]*"
+    kv = rb"\|[^|:\n]*:[ \t]*([^|\n]*?)[ \t\r]*"
+    # A line that is not blank but does not have every field lands in the last group.
+    return re.compile(rb"^(?:" + head + kv * count + rb"(?:\|[^\n]*)?|[ \t\r]*(\S[^\n]*))$", re.M)
+
+_PATTERNS = {}
+
+def _pattern(count):
+    pattern = _PATTERNS.get(count)
+    if pattern is None:
+        pattern = _PATTERNS[count] = _line_pattern(count)
+    return pattern
+
+def _empty_columns(fields, epoch):
+    cols = {
+        "rows": 0,
+        "timestamp": np.zeros(0, dtype=np.int64 if epoch else "datetime64[s]"),
+        "flight_id": np.zeros(0, dtype="S1"),
+        "aircraft_id": np.zeros(0, dtype="S1")
+    }
+    for name, kind in fields:
+        if kind == "list":
+            cols[name] = np.zeros(0)
+            cols[name + "_offsets"] = np.zeros(1, dtype=np.int64)
+        else:
+            cols[name] = np.zeros(0, dtype=_KINDS[kind])
+    return cols
+
+_POW10 = 10 ** np.arange(19, dtype=np.int64)
+_TIMESTAMP_DIGITS = np.array([0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18])
+_TIMESTAMP_SEPARATORS = np.array([4, 7, 10, 13, 16])
+_TIMESTAMP_SEPARATOR_BYTES = np.frombuffer(b"-- ::", dtype=np.uint8)
+
+def _window(data, s, e):
+    w = e - s
+    pos = np.arange(int(w.max()))
+    mask = pos < w[:, None]
+    index = s[:, None] + pos
+    if int(s[-1]) + len(pos) > len(data):
+        np.minimum(index, len(data) - 1, out=index)
+    return data.take(index), mask, w
+
+def _strings(data, s, e):
+    if not len(s) or not (e - s).any():
+        return np.zeros(len(s), dtype="S1")
+    chars, mask, _ = _window(data, s, e)
+    chars *= mask
+    return chars.view(f"S{chars.shape[1]}").ravel()
+
+def _numbers(data, s, e, integer=False):
+    if not len(s):
+        return np.zeros(0, dtype=np.int64 if integer else np.float64)
+    if not (e > s).all() or (e - s).max() > 16:
+        return None
+    chars, mask, w = _window(data, s, e)
+    values = chars - np.uint8(48)
+    digit = values < 10
+    dot = chars == 46
+    neg = chars[:, 0] == 45
+    valid = digit | dot
+    valid[:, 0] |= neg
+    has_dot = dot.any(1)
+    if (mask & ~valid).any() or np.count_nonzero(dot & mask) != np.count_nonzero(has_dot):
+        return None
+    if integer and has_dot.any():
+        return None
+    digit &= mask
+    count = w - has_dot - neg
+    if not count.all():
+        return None
+
+    mantissa = np.zeros(len(s), dtype=np.int64)
+    for j in range(chars.shape[1]):
+        mantissa = np.where(digit[:, j], mantissa * 10 + values[:, j], mantissa)
+    if integer:
+        return np.where(neg, -mantissa, mantissa)
+    # Both operands are exact, so the division rounds exactly like float() on the text.
+    scale = np.where(has_dot, w - 1 - dot.argmax(1), 0)
+    result = mantissa / _POW10.take(scale)
+    return np.where(neg, -result, result)
+
+def _timestamps(data, s, e, epoch):
+    if not (e - s == 19).all():
+        return None
+    chars = data.take(s[:, None] + np.arange(19))
+    if not (chars[:, _TIMESTAMP_SEPARATORS] == _TIMESTAMP_SEPARATOR_BYTES).all():
+        return None
+    digits = chars[:, _TIMESTAMP_DIGITS] - np.uint8(48)
+    if (digits > 9).any():
+        return None
+    d = digits.astype(np.int64)
+    year = d[:, 0] * 1000 + d[:, 1] * 100 + d[:, 2] * 10 + d[:, 3]
+    month = d[:, 4] * 10 + d[:, 5]
+    day = d[:, 6] * 10 + d[:, 7]
+    hour = d[:, 8] * 10 + d[:, 9]
+    if ((month < 1) | (month > 12) | (day < 1) | (year < 1) | (hour > 23) | (d[:, 10] > 5) | (d[:, 12] > 5)).any():
+        return None
+    months = (year - 1970) * 12 + month - 1
+    days = months.astype("datetime64[M]").astype("datetime64[D]") + (day - 1).astype("timedelta64[D]")
+    if (days.astype("datetime64[M]").astype(np.int64) != months).any():
+        return None
+    seconds = hour * 3600 + (d[:, 10] * 10 + d[:, 11]) * 60 + d[:, 12] * 10 + d[:, 13]
+    stamps = days.astype("datetime64[s]") + seconds.astype("timedelta64[s]")
+    return stamps.astype(np.int64) if epoch else stamps
+
+def _lists(data, s, e, commas):
+    lo = np.searchsorted(commas, s)
+    hi = np.searchsorted(commas, e)
+    present = e > s
+    counts = np.where(present, hi - lo + 1, 0)
+    offsets = np.zeros(len(s) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    inside = hi - lo
+    total = int(inside.sum())
+    first = np.repeat(lo - np.concatenate(([0], np.cumsum(inside)[:-1])), inside)
+    split = commas[np.arange(total) + first]
+    starts = np.empty(int(offsets[-1]), dtype=np.int64)
+    ends = np.empty_like(starts)
+    first_token = np.zeros(len(starts), dtype=bool)
+    first_token[offsets[:-1][present]] = True
+    last_token = np.zeros(len(starts), dtype=bool)
+    last_token[offsets[1:][present] - 1] = True
+    starts[first_token] = s[present]
+    starts[~first_token] = split + 1
+    ends[last_token] = e[present]
+    ends[~last_token] = split
+    values = _numbers(data, starts, ends)
+    if values is None:
+        return None
+    return values, offsets
+
+def _scan_buffer(data, fields, epoch):
+    k = len(fields)
+    nl = np.flatnonzero(data == 10)
+    starts = np.concatenate(([0], nl + 1))
+    ends = np.concatenate((nl, [len(data)]))
+    cr = (data[np.maximum(ends - 1, 0)] == 13) & (ends > starts)
+    ends = ends - cr
+    keep = ends > starts
+    starts = starts[keep]
+    ends = ends[keep]
+    n = len(starts)
+    if not n:
+        return _empty_columns(fields, epoch)
+
+    # The fast path takes only clean lines: one space (inside the timestamp), no tabs and a fixed field count.
+    if np.count_nonzero(data <= 32) != n + len(nl) + int(cr.sum()):
+        return None
+    pipes = np.flatnonzero(data == 124)
+    if len(pipes) != n * (k + 2):
+        return None
+    pipes = pipes.reshape(n, k + 2)
+    if not ((pipes[:, 0] > starts) & (pipes[:, -1] < ends)).all():
+        return None
+
+    timestamps = _timestamps(data, starts, pipes[:, 0], epoch)
+    if timestamps is None:
+        return None
+    cols = {
+        "rows": n,
+        "timestamp": timestamps,
+        "flight_id": _strings(data, pipes[:, 0] + 1, pipes[:, 1]),
+        "aircraft_id": _strings(data, pipes[:, 1] + 1, pipes[:, 2])
+    }
+
+    # Two colons in the timestamp and one per KEY:VALUE field.
+    colons = np.flatnonzero(data == 58)
+    if len(colons) != n * (k + 2):
+        return None
+    colons = colons.reshape(n, k + 2)[:, 2:]
+    commas = None
+    bounds = np.column_stack((pipes[:, 2:], ends))
+    if not ((colons > bounds[:, :-1]) & (colons < bounds[:, 1:])).all():
+        return None
+    for j, (name, kind) in enumerate(fields):
+        s = colons[:, j] + 1
+        e = bounds[:, j + 1]
+        if kind == "list":
+            if commas is None:
+                commas = np.flatnonzero(data == 44)
+            result = _lists(data, s, e, commas)
+            if result is None:
+                return None
+            cols[name], cols[name + "_offsets"] = result
+        elif kind == "str":
+            cols[name] = _strings(data, s, e)
+        else:
+            values = _numbers(data, s, e, kind == "int")
+            if values is None:
+                return None
+            cols[name] = values
+    return cols
+
+def _parse_timestamp(s):
+    if len(s) == 19 and s[4] == "-" and s[7] == "-" and s[10] == " " and s[13] == ":" and s[16] == ":":
+        return datetime.fromisoformat(s)
+    return datetime.strptime(s, TIMESTAMP_FORMAT)
+
+def _list_column(values):
+    counts = [v.count(b",") + 1 if v else 0 for v in values]
+    offsets = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    joined = b",".join(v for v in values if v)
+    flat = np.array([float(x) for x in joined.split(b",")]) if joined else np.zeros(0)
+    return flat, offsets
+
+def _scan_lines(buf, path, fields, epoch):
+    rows = _pattern(len(fields)).findall(buf)
+    if not rows:
+        return _empty_columns(fields, epoch)
+    columns = list(zip(*rows))
+    bad = columns.pop()
+    if any(bad):
+        line = next(b for b in bad if b)
+        raise ValueError(f"{path}: malformed line {line.decode('utf-8', 'replace')!r}")
+
+    timestamps = np.array([_parse_timestamp(t.decode("utf-8")) for t in columns[0]], dtype="datetime64[s]")
+    cols = {
+        "rows": len(rows),
+        "timestamp": timestamps.astype(np.int64) if epoch else timestamps,
+        "flight_id": np.array(columns[1], dtype=np.bytes_),
+        "aircraft_id": np.array(columns[2], dtype=np.bytes_)
+    }
+    for (name, kind), values in zip(fields, columns[3:]):
+        if kind == "list":
+            cols[name], cols[name + "_offsets"] = _list_column(values)
+        elif kind == "float":
+            cols[name] = np.array([float(v) for v in values], dtype=np.float64)
+        elif kind == "int":
+            cols[name] = np.array([int(v) for v in values], dtype=np.int64)
+        else:
+            cols[name] = np.array(values, dtype=np.bytes_)
+    return cols
+
+def scan_log(path, fields, epoch=False):
+    with open(path, "rb") as f:
+        if not os.fstat(f.fileno()).st_size:
+            return _empty_columns(fields, epoch)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    cols = _scan_buffer(np.frombuffer(buf, dtype=np.uint8), fields, epoch)
+    if cols is None:
+        cols = _scan_lines(buf, path, fields, epoch)
+    return cols
+
+def _last_rows(flight_ids):
+    # Later lines for a flight replace earlier ones; keep each flight at its first position.
+    _, first, inverse = np.unique(flight_ids, return_index=True, return_inverse=True)
+    _, from_end = np.unique(flight_ids[::-1], return_index=True)
+    last = len(flight_ids) - 1 - from_end
+    order = np.argsort(first, kind="stable")
+    return last[order], order, inverse
+
+def _text(values):
+    return [v.decode("utf-8") for v in values.tolist()]
+
+def scan_engine_logs(path="data/engine_performance.log", epoch=False):
+    cols = scan_log(path, ENGINE_FIELDS, epoch)
+    if not cols["rows"]:
+        return {}
+    rows, _, _ = _last_rows(cols["flight_id"])
+    fids = _text(cols["flight_id"][rows])
+    aids = _text(cols["aircraft_id"][rows])
+    timestamps = cols["timestamp"][rows].tolist()
+    fuel = cols["fuel_burn"][rows].tolist()
+    status = _text(cols["engine_status"][rows])
+    thrust = cols["engine_thrust"].tolist()
+    thrust_offsets = cols["engine_thrust_offsets"].tolist()
+    vibration = cols["engine_vibration"].tolist()
+    vibration_offsets = cols["engine_vibration_offsets"].tolist()
+
+    out = {}
+    for i, row in enumerate(rows.tolist()):
+        out[fids[i]] = {
+            "timestamp": timestamps[i],
+            "flight_id": fids[i],
+            "aircraft_id": aids[i],
+            "engine_thrust": thrust[thrust_offsets[row]:thrust_offsets[row + 1]],
+            "engine_vibration": vibration[vibration_offsets[row]:vibration_offsets[row + 1]],
+            "fuel_burn": fuel[i],
+            "engine_status": status[i]
+        }
+    return out
+
+def scan_cabin_logs(path="data/cabin_pressure.log", epoch=False):
+    cols = scan_log(path, CABIN_FIELDS, epoch)
+    if not cols["rows"]:
+        return {}
+    rows, order, inverse = _last_rows(cols["flight_id"])
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    group = rank[inverse]
+    by_flight = np.argsort(group, kind="stable")
+    lengths = np.bincount(group, minlength=len(rows))
+
+    times = cols["timestamp"][by_flight]
+    result = analyze_pressure_fleet(lengths, times, cols["cabin_pressure"][by_flight])
+
+    fids = _text(cols["flight_id"][rows])
+    aids = _text(cols["aircraft_id"][rows])
+    timestamps = cols["timestamp"][rows].tolist()
+    pressure = cols["cabin_pressure"][rows].tolist()
+    temp = cols["cabin_temp"][rows].tolist()
+    turbulence = cols["turbulence"][rows].tolist()
+    status = _text(cols["cabin_status"][rows])
+    flat = result["pressure"].tolist()
+    starts = result["starts"].tolist()
+    lengths = lengths.tolist()
+    rate = result["max_drop_rate"].tolist()
+    drop = result["sustained_drop"].tolist()
+    minutes = result["sustained_minutes"].tolist()
+    outliers = result["outliers"].tolist()
+
+    out = {}
+    for i, fid in enumerate(fids):
+        pressures = flat[starts[i]:starts[i] + lengths[i]]
+        out[fid] = {
+            "flight_id": fid,
+            "aircraft_id": aids[i],
+            "cabin_pressure": pressure[i],
+            "cabin_temp": temp[i],
+            "turbulence": turbulence[i],
+            "cabin_status": status[i],
+            "timestamp": timestamps[i],
+            "pressure_series": pressures,
+            "prev_cabin_pressure": pressures[-2] if len(pressures) >= 2 else None,
+            "pressure_max_drop_rate": rate[i],
+            "pressure_sustained_drop": drop[i],
+            "pressure_sustained_minutes": minutes[i],
+            "pressure_outliers": outliers[i]
+        }
+    return out
@@ -0,0 +1,296 @@
+import array
+import gc
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+from collections.abc import Mapping
+
+MAGIC = b"AOPC\x03\x00\x00\x00"
+_HEADER_LEN = struct.Struct("<Q")
+_MISSING = object()
+
+def file_fingerprint(path, with_hash=True):
+    st = os.stat(path)
+    fp = {
+        "path": os.path.abspath(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns
+    }
+    if with_hash:
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        fp["hash"] = h.hexdigest()
+    return fp
+
+def _flatten(record, prefix, out):
+    for k, v in record.items():
+        path = prefix + (k,)
+        if isinstance(v, Mapping):
+            _flatten(v, path, out)
+        else:
+            out[path] = v
+
+def _column_type(values):
+    if values and all(type(v) is float for v in values):
+        return "d"
+    if values and all(type(v) is int for v in values):
+        return "q"
+    return "pickle"
+
+def _encode_records(records):
+    paths = {}
+    flat = []
+    for rec in records:
+        row = {}
+        _flatten(rec, (), row)
+        for p in row:
+            paths.setdefault(p, None)
+        flat.append(row)
+
+    columns = []
+    for p in paths:
+        values = [row.get(p, _MISSING) for row in flat]
+        sparse = any(v is _MISSING for v in values)
+        kind = "pickle" if sparse else _column_type(values)
+        if kind == "pickle":
+            if sparse:
+                values = [None if v is _MISSING else v for v in values]
+                present = [row.get(p, _MISSING) is not _MISSING for row in flat]
+                data = pickle.dumps((values, present), protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        else:
+            data = array.array(kind, values).tobytes()
+        columns.append((list(p), kind, sparse, data))
+    return columns
+
+def _build_level(node):
+    keys = list(node)
+    cols = [_build_level(v) if isinstance(v, dict) else v for v in node.values()]
+    return [dict(zip(keys, row)) for row in zip(*cols)]
+
+def _decode_records(count, columns):
+    tree = {}
+    sparse = []
+    for path, values, present in columns:
+        node = tree
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        node[path[-1]] = values
+        if present is not None:
+            sparse.append((path, present))
+
+    records = _build_level(tree) if tree else [{} for _ in range(count)]
+    for path, present in sparse:
+        for rec, keep in zip(records, present):
+            if not keep:
+                node = rec
+                for key in path[:-1]:
+                    node = node[key]
+                del node[path[-1]]
+    return records
+
+def _write_entry(path, count, columns, extra):
+    header = {"count": count, "extra": extra, "columns": []}
+    offset = 0
+    for name, kind, sparse, data in columns:
+        header["columns"].append({"path": name, "type": kind, "sparse": sparse, "offset": offset, "length": len(data)})
+        offset += len(data) + (-len(data) % 8)
+    raw_header = json.dumps(header).encode("utf-8")
+    raw_header += b" " * (-(len(MAGIC) + _HEADER_LEN.size + len(raw_header)) % 8)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER_LEN.pack(len(raw_header)))
+        f.write(raw_header)
+        for _, _, _, data in columns:
+            f.write(data)
+            f.write(b"\0" * (-len(data) % 8))
+    os.replace(tmp, path)
+
+def _read_entry(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                return None
+            pos = len(MAGIC)
+            (header_len,) = _HEADER_LEN.unpack_from(mm, pos)
+            pos += _HEADER_LEN.size
+            header = json.loads(bytes(mm[pos:pos + header_len]))
+            base = pos + header_len
+
+            buf = memoryview(mm)
+            columns = []
+            try:
+                for col in header["columns"]:
+                    start = base + col["offset"]
+                    block = buf[start:start + col["length"]]
+                    present = None
+                    if col["type"] != "pickle":
+                        values = block.cast(col["type"]).tolist()
+                    elif col["sparse"]:
+                        values, present = pickle.loads(block)
+                    else:
+                        values = pickle.loads(block)
+                    block.release()
+                    columns.append((tuple(col["path"]), values, present))
+            finally:
+                buf.release()
+
+    return header["count"], columns, header["extra"]
+
+class ParseCache:
+    def __init__(self, cache_dir="output/cache", max_bytes=512 << 20, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        if enabled:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_paths(self, kind, paths, options):
+        key = json.dumps([kind, [os.path.abspath(p) for p in paths], options or {}], sort_keys=True)
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, f"{kind}-{name}")
+        return base + ".bin", base + ".json"
+
+    def _fresh(self, meta_path, paths):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            sources = stored["sources"]
+            if len(sources) != len(paths):
+                return False
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        changed = False
+        for path, fp in zip(paths, sources):
+            try:
+                now = file_fingerprint(path, with_hash=False)
+                if now["size"] != fp["size"]:
+                    return False
+                if now["mtime_ns"] != fp["mtime_ns"]:
+                    if file_fingerprint(path)["hash"] != fp["hash"]:
+                        return False
+                    fp["mtime_ns"] = now["mtime_ns"]
+                    changed = True
+            except (OSError, KeyError, TypeError):
+                # A missing source or a damaged meta file is a miss, and the entry is rewritten by put().
+                return False
+
+        if changed:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump(stored, f)
+        return True
+
+    def get(self, kind, paths, options=None):
+        if not self.enabled:
+            return None
+        bin_path, meta_path = self._entry_paths(kind, paths, options)
+        if not os.path.exists(bin_path) or not self._fresh(meta_path, paths):
+            self.misses += 1
+            return None
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            entry = _read_entry(bin_path)
+            if entry is not None:
+                records = _decode_records(entry[0], entry[1])
+        except (OSError, ValueError, pickle.UnpicklingError):
+            entry = None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if entry is None:
+            self.misses += 1
+            return None
+        os.utime(bin_path)
+        self.hits += 1
+
+        extra = entry[2]
+        if extra["shape"] == "mapping":
+            return dict(zip(extra["keys"], records))
+        return {"flights": records, "missing_flights": extra["missing_flights"], "missing_sources": extra["missing_sources"]}
+
+    def fingerprint(self, paths):
+        return [file_fingerprint(p) if self.enabled else None for p in paths]
+
+    def put(self, kind, sources, value, options=None):
+        # Sources are fingerprinted before parsing, so a file appended to meanwhile fails the next freshness check.
+        if not self.enabled:
+            return
+        bin_path, meta_path = self._entry_paths(kind, [fp["path"] for fp in sources], options)
+
+        if "flights" in value and "missing_flights" in value:
+            records = value["flights"]
+            extra = {"shape": "flights", "missing_flights": value["missing_flights"], "missing_sources": value.get("missing_sources", {})}
+        else:
+            records = list(value.values())
+            extra = {"shape": "mapping", "keys": list(value.keys())}
+
+        _write_entry(bin_path, len(records), _encode_records(records), extra)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"kind": kind, "sources": sources, "options": options or {}}, f)
+        self.evict()
+
+    def get_or_parse(self, kind, paths, parse, options=None):
+        value = self.get(kind, paths, options)
+        if value is None:
+            sources = self.fingerprint(paths)
+            value = parse()
+            self.put(kind, sources, value, options)
+        return value
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".bin"):
+                continue
+            bin_path = os.path.join(self.cache_dir, name)
+            meta_path = bin_path[:-4] + ".json"
+            try:
+                st = os.stat(bin_path)
+                size = st.st_size + (os.path.getsize(meta_path) if os.path.exists(meta_path) else 0)
+            except OSError:
+                continue
+            entries.append((st.st_mtime_ns, size, bin_path, meta_path))
+        return entries
+
+    def _remove(self, bin_path, meta_path):
+        for p in (bin_path, meta_path):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def evict(self):
+        entries = sorted(self._entries())
+        total = sum(e[1] for e in entries)
+        for _, size, bin_path, meta_path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(bin_path, meta_path)
+            total -= size
+
+    def invalidate(self, path=None):
+        target = os.path.abspath(path) if path else None
+        for _, _, bin_path, meta_path in self._entries():
+            if target is not None:
+                try:
+                    with open(meta_path, "r", encoding="utf-8") as f:
+                        sources = [s["path"] for s in json.load(f)["sources"]]
+                except (OSError, ValueError, KeyError):
+                    sources = [target]
+                if target not in sources:
+                    continue
+            self._remove(bin_path, meta_path)
@@ -0,0 +1,233 @@
+import pickle
+
+from modules.log_processor import IncrementalIngestor
+from modules.delay_predictor import predict_delay
+from modules.health_monitor import check_health, check_degradation, set_direct_alert_logging, emit_health_alerts
+from modules.health_store import AircraftHealthStore
+from modules.crew_optimizer import evaluate_crew, CrewRoster
+from modules.load_predictor import predict_load, LoadHistoryStore
+from modules.fleet_engine import evaluate_fleet
+from modules.config_loader import compile_config
+from modules.archive import FlightArchive
+from modules.alert_store import AlertStore
+
+def summarize_flight(fl):
+    status = fl["status"]
+    passenger = fl["passenger"]
+    return {
+        "flight_id": fl["flight_id"],
+        "aircraft_id": fl["aircraft_id"],
+        "timestamp": fl["timestamp"],
+        "status": {"weather": dict(status["weather"]), "operational": dict(status["operational"])},
+        "passenger": {"booked": passenger["booked"], "capacity": passenger["capacity"]},
+        "crew": dict(fl["crew"]),
+        "route": dict(fl["route"])
+    }
+
+def evaluate_flights(flight_source, config, load_store=None, summarize=False):
+    config = compile_config(config)
+    index = config.threshold_index
+    rules = config.rule_set
+    delay_fn = predict_delay if rules is None else rules.predict_delay
+    health_fn = check_health if rules is None else rules.check_health
+    crew_rules = config.crew_rules
+    passenger_rules = config.passenger_rules
+    flights = []
+    delay_results = []
+    health_alerts = []
+    crew_issues = []
+    load_results = []
+
+    for fl in flight_source:
+        flights.append(summarize_flight(fl) if summarize else fl)
+        thresholds = index.for_flight(fl)
+        delay_min, reasons = delay_fn(fl, thresholds)
+        delay_results.append({"flight_id": fl["flight_id"], "delay_min": delay_min, "reasons": reasons})
+
+        health_alerts.extend(health_fn(fl, thresholds))
+
+        ok, issues = evaluate_crew(fl, crew_rules)
+        if not ok:
+            crew_issues.append({"flight_id": fl["flight_id"], "issues": issues})
+
+        if load_store is not None:
+            load_pred = load_store.predict(fl, passenger_rules)
+        else:
+            load_pred = predict_load(fl, passenger_rules)
+        load_results.append({"flight_id": fl["flight_id"], **load_pred})
+
+    return flights, delay_results, health_alerts, crew_issues, load_results
+
+def evaluate(flights, config, load_store=None, summarize=False):
+    if config.get("evaluation", {}).get("mode") == "batch":
+        flights = list(flights)
+        results = evaluate_fleet(flights, config, load_store)
+        if summarize:
+            flights = [summarize_flight(fl) for fl in flights]
+        return (flights,) + results
+    return evaluate_flights(flights, config, load_store, summarize)
+
+def open_load_store(config):
+    history = config.get("load_history", {})
+    if not history.get("enabled", False):
+        return None
+    window = config["passenger_rules"].get("moving_avg_window", 7)
+    return LoadHistoryStore.load(history.get("path", "output/state/load_history.pkl"), window)
+
+def save_load_store(config, load_store):
+    if load_store is not None:
+        load_store.save(config.get("load_history", {}).get("path", "output/state/load_history.pkl"))
+
+def open_alert_store(config):
+    store = config.get("alert_store", {})
+    enabled = store.get("enabled", False)
+    set_direct_alert_logging(not enabled)
+    if not enabled:
+        return None
+    return AlertStore.load(
+        store.get("path", "output/state/alert_store.pkl"),
+        store.get("suppress_minutes", 60),
+        store.get("escalate_pct", 10.0),
+        store.get("retention_hours", 168)
+    )
+
+def save_alert_store(config, alert_store):
+    if alert_store is not None:
+        alert_store.save(config.get("alert_store", {}).get("path", "output/state/alert_store.pkl"))
+
+def record_alerts(alert_store, aircraft_of, health_alerts, scope=None, trend=False):
+    if alert_store is not None:
+        emit_health_alerts(alert_store.ingest(health_alerts, aircraft_of, scope, trend=trend))
+
+def apply_crew_roster(flights, crew_issues, config):
+    crew_rules = compile_config(config).crew_rules
+    if not crew_rules.cross_flight_checks:
+        return crew_issues
+    roster = CrewRoster.from_flights(flights, crew_rules)
+    if not roster.flight_issues:
+        return crew_issues
+
+    by_id = {c["flight_id"]: c for c in crew_issues}
+    merged = []
+    for fl in flights:
+        fid = fl["flight_id"]
+        c = merge_crew_issue(fid, by_id.get(fid), roster.flight_issues.get(fid))
+        if c:
+            merged.append(c)
+    return merged
+
+def merge_crew_issue(fid, crew_issue, roster_issues):
+    if roster_issues:
+        return {"flight_id": fid, "issues": (crew_issue["issues"] if crew_issue else []) + roster_issues}
+    return crew_issue
+
+def open_crew_roster(config):
+    crew_rules = compile_config(config).crew_rules
+    return CrewRoster(crew_rules) if crew_rules.cross_flight_checks else None
+
+def open_health_store(config):
+    trends = config.get("health_trends", {})
+    if not trends.get("enabled", False):
+        return None
+    return AircraftHealthStore.load(
+        trends.get("state_path", "output/state/health_store.pkl"),
+        trends.get("window", 50),
+        trends.get("ewma_alpha", 0.2),
+        config.get("ingestion", {}).get("epoch_timestamps", False)
+    )
+
+def save_health_store(config, store):
+    if store is not None:
+        store.save(config.get("health_trends", {}).get("state_path", "output/state/health_store.pkl"))
+
+def latest_flight(times):
+    return max(times, key=lambda fid: (times[fid], fid))
+
+def apply_health_trends(flights, config):
+    store = open_health_store(config)
+    if store is None:
+        return []
+    store.update()
+    save_health_store(config, store)
+    aircraft = {}
+    for fl in flights:
+        aircraft.setdefault(fl["aircraft_id"], {})[fl["flight_id"]] = fl["timestamp"]
+    latest = {aid: latest_flight(times) for aid, times in aircraft.items()}
+    return check_degradation(store, config["health_trends"], latest)
+
+def update_health_trends(store, config, aircraft, recheck, trend_alerts):
+    if store is None:
+        return set(), set()
+    recheck = recheck | store.update()
+    trends = config["health_trends"]
+    carriers = set()
+    for aid in recheck:
+        carriers.update(msg.split(" | ", 1)[0] for _, msg in trend_alerts.get(aid, ()))
+        alerts = check_degradation(store, trends, {aid: latest_flight(aircraft[aid])}) if aid in aircraft else []
+        if alerts:
+            trend_alerts[aid] = alerts
+            carriers.add(alerts[0][1].split(" | ", 1)[0])
+        else:
+            trend_alerts.pop(aid, None)
+    return recheck, carriers
+
+def archive_results(flights, delay_results, health_alerts, crew_issues, load_results, config):
+    archive = config.get("archive", {})
+    if not archive.get("enabled", False):
+        return None
+    path = archive.get("path", "output/archive/flights.db")
+    with FlightArchive(path) as store:
+        store.archive_run(flights, delay_results, health_alerts, crew_issues, load_results)
+    return path
+
+def load_incremental_state(ingestion):
+    state_path = ingestion.get("state_path", "output/state/ingest_state.pkl")
+    ingestor = IncrementalIngestor.load(state_path, epoch=ingestion.get("epoch_timestamps", False))
+    results = {}
+    if ingestor.positions:
+        try:
+            with open(state_path + ".results", "rb") as f:
+                results = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            ingestor = IncrementalIngestor(epoch=ingestor.epoch)
+    return state_path, ingestor, results
+
+def save_incremental_state(state_path, ingestor, results):
+    ingestor.save(state_path)
+    with open(state_path + ".results", "wb") as f:
+        pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+def evaluate_changed(ingestor, results, changed, config, load_store=None, alert_store=None):
+    changed_data = ingestor.flights(changed)
+    for fid in changed:
+        results.pop(fid, None)
+
+    flights, delays, alerts, crew, loads = evaluate(changed_data["flights"], config, load_store)
+    for fl, d, l in zip(flights, delays, loads):
+        results[fl["flight_id"]] = {"delay": d, "alerts": [], "crew": None, "load": l}
+    for lvl, msg in alerts:
+        results[msg.split(" | ", 1)[0]]["alerts"].append((lvl, msg))
+    for c in crew:
+        results[c["flight_id"]]["crew"] = c
+    record_alerts(alert_store, {fl["flight_id"]: fl["aircraft_id"] for fl in flights}, alerts, scope=changed)
+
+def collect_results(flights, results):
+    delay_results = []
+    health_alerts = []
+    crew_issues = []
+    load_results = []
+    for fl in flights:
+        r = results[fl["flight_id"]]
+        delay_results.append(r["delay"])
+        health_alerts.extend(r["alerts"])
+        if r["crew"] is not None:
+            crew_issues.append(r["crew"])
+        load_results.append(r["load"])
+    return delay_results, health_alerts, crew_issues, load_results
+
+def report_options(config):
+    report = config.get("report", {})
+    return {
+        "stream": report.get("stream", False),
+        "flush_chars": report.get("flush_kb", 1024) << 10
+    }
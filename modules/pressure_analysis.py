@@ -0,0 +1,153 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+
+OUTLIER_Z = 3.5
+RATE_WINDOW_MINUTES = 5.0
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def _seconds(times):
+    if len(times) and isinstance(times[0], (int, np.integer)):
+        return np.asarray(times, dtype=np.float64)
+    return np.array(times, dtype="datetime64[us]").astype(np.int64) / 1e6
+
+def _median(block):
+    n = block.shape[-1]
+    # Selection rather than a sort keeps the median linear in the number of samples.
+    block = np.partition(block, [(n - 1) // 2, n // 2], axis=-1)
+    return (block[..., (n - 1) // 2] + block[..., n // 2]) / 2
+
+def _segment_median(values, starts, lengths):
+    median = np.full(len(lengths), np.nan)
+    # Flights with the same number of samples form one 2-D block, so each distinct length is a single partition call.
+    for n in np.flatnonzero(np.bincount(lengths)).tolist():
+        if n:
+            rows = np.flatnonzero(lengths == n)
+            median[rows] = _median(values[starts[rows, None] + np.arange(n)])
+    return median
+
+def analyze_pressure_fleet(lengths, times, pressures):
+    lengths = np.asarray(lengths, dtype=np.int64)
+    flights = len(lengths)
+    if not flights:
+        empty = np.zeros(0)
+        return {
+            "pressure": empty,
+            "starts": np.zeros(0, dtype=np.int64),
+            "max_drop_rate": empty,
+            "sustained_drop": empty,
+            "sustained_minutes": empty,
+            "outliers": np.zeros(0, dtype=np.int64)
+        }
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64)
+    seg = np.repeat(np.arange(flights), lengths)
+
+    t = _seconds(times)
+    p = np.asarray(pressures, dtype=np.float64)
+    order = np.lexsort((t, seg))
+    t = t[order]
+    p = p[order]
+
+    n = len(p)
+    first = np.zeros(n, dtype=bool)
+    first[starts] = True
+
+    drop = np.zeros(n)
+    minutes = np.zeros(n)
+    drop[1:] = p[:-1] - p[1:]
+    minutes[1:] = (t[1:] - t[:-1]) / 60
+    drop[first] = 0.0
+    minutes[first] = 0.0
+
+    falling = (drop > 0) & ~first
+    run = np.cumsum(~falling) - 1
+    run_count = int(run[-1]) + 1
+    run_drop = np.bincount(run[falling], weights=drop[falling], minlength=run_count)
+    run_minutes = np.bincount(run[falling], weights=minutes[falling], minlength=run_count)
+    run_flight = seg[~falling]
+    # A falling run is rated over at least RATE_WINDOW_MINUTES, so sample noise a few seconds apart cannot look like a decompression.
+    run_rate = run_drop / np.maximum(run_minutes, RATE_WINDOW_MINUTES)
+    max_drop_rate = np.maximum.reduceat(run_rate, run[starts])
+    best = np.lexsort((run_drop, run_flight))
+    last_run = np.searchsorted(run_flight[best], np.arange(flights), side="right") - 1
+    sustained_drop = run_drop[best][last_run]
+    sustained_minutes = run_minutes[best][last_run]
+
+    median = _segment_median(p, starts, lengths)
+    deviation = np.abs(p - median[seg])
+    mad = _segment_median(deviation, starts, lengths)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = 0.6745 * deviation / mad[seg]
+    outlier = (mad[seg] > 0) & (z > OUTLIER_Z)
+    outliers = np.bincount(seg[outlier], minlength=flights)
+
+    return {
+        "pressure": p,
+        "starts": starts,
+        "max_drop_rate": max_drop_rate,
+        "sustained_drop": sustained_drop,
+        "sustained_minutes": sustained_minutes,
+        "outliers": outliers
+    }
+
+def analyze_pressure(times, pressures):
+    result = analyze_pressure_fleet([len(pressures)], times, pressures)
+    return {
+        "pressure_series": result["pressure"].tolist(),
+        "pressure_max_drop_rate": float(result["max_drop_rate"][0]),
+        "pressure_sustained_drop": float(result["sustained_drop"][0]),
+        "pressure_sustained_minutes": float(result["sustained_minutes"][0]),
+        "pressure_outliers": int(result["outliers"][0])
+    }
+
+def _outliers(pressures):
+    p = np.asarray(pressures, dtype=np.float64)
+    deviation = np.abs(p - _median(p))
+    mad = _median(deviation)
+    if not mad > 0:
+        return 0
+    return int(np.count_nonzero(0.6745 * deviation / mad > OUTLIER_Z))
+
+def _second(ts):
+    if isinstance(ts, (int, np.integer)):
+        return float(ts)
+    return ((ts - _EPOCH) // _MICROSECOND) / 1e6
+
+def track_pressure(track, ts, pressure):
+    t = _second(ts)
+    if track is None:
+        return {
+            "t": t, "p": pressure, "run_drop": 0.0, "run_minutes": 0.0,
+            "best_drop": 0.0, "best_minutes": 0.0, "closed_rate": 0.0
+        }
+    drop = track["p"] - pressure
+    minutes = (t - track["t"]) / 60
+    if drop > 0:
+        track["run_drop"] += drop
+        track["run_minutes"] += minutes
+    else:
+        track["closed_rate"] = max(track["closed_rate"], track["run_drop"] / max(track["run_minutes"], RATE_WINDOW_MINUTES))
+        track["run_drop"] = 0.0
+        track["run_minutes"] = 0.0
+    if track["run_drop"] >= track["best_drop"]:
+        track["best_drop"] = track["run_drop"]
+        track["best_minutes"] = track["run_minutes"]
+    track["t"] = t
+    track["p"] = pressure
+    return track
+
+def track_pressure_series(times, pressures):
+    track = None
+    for ts, pressure in zip(times, pressures):
+        track = track_pressure(track, ts, pressure)
+    return track
+
+def tracked_pressure(track, pressures):
+    return {
+        "pressure_max_drop_rate": max(track["closed_rate"], track["run_drop"] / max(track["run_minutes"], RATE_WINDOW_MINUTES)),
+        "pressure_sustained_drop": track["best_drop"],
+        "pressure_sustained_minutes": track["best_minutes"],
+        "pressure_outliers": _outliers(pressures)
+    }
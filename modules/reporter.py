@@ -1,6 +1,169 @@
+import json
 import os
 from datetime import datetime
 
+from modules.log_processor import format_timestamp
+
+BANNER_TOP = "╔" + "═"*88 + "╗\n"
+BANNER_BOTTOM = "╚" + "═"*88 + "╝\n"
+BOX_BOTTOM = "└" + "─"*88 + "┘\n\n"
+
+HEADER = (
+    BANNER_TOP
+    + "║" + " "*25 + "DAILY AVIATION OPERATIONS REPORT" + " "*31 + "║\n"
+    + BANNER_BOTTOM + "\n"
+)
+FOOTER = (
+    BANNER_TOP
+    + "║" + " "*35 + "END OF REPORT" + " "*40 + "║\n"
+    + BANNER_BOTTOM
+)
+NO_DATA_NOTICE = (
+    "┌─ NOTICE " + "─"*78 + "┐\n"
+    "│ NO FLIGHT DATA AVAILABLE FOR THIS REPORT PERIOD\n"
+    "│ Please check data files in /data directory\n"
+    + BOX_BOTTOM
+)
+
+SUMMARY_TEMPLATE = (
+    "┌─ EXECUTIVE SUMMARY " + "─"*68 + "┐\n"
+    "│ Total Flights Monitored          : {total:>3} flights" + " "*38 + "│\n"
+    "│ On-Time Performance              : {on_time:>3} flights ({on_time_pct:.1f}%)" + " "*28 + "│\n"
+    "│ Delayed Flights                  : {delayed:>3} flights ({delayed_pct:.1f}%)" + " "*28 + "│\n"
+    "│ Total Delay Time                 : {total_delay:>4} minutes" + " "*36 + "│\n"
+    "│ Average Load Factor              : {avg_load:>5.1f}%" + " "*42 + "│\n"
+    "│ Critical Alerts                  : {critical:>3}" + " "*47 + "│\n"
+    "│ Warning Alerts                   : {warnings:>3}" + " "*47 + "│\n"
+    "│ Crew Compliance Issues           : {crew:>3}" + " "*47 + "│\n"
+    + BOX_BOTTOM
+)
+
+DETAILS_OPEN = "┌─ DETAILED FLIGHT ANALYSIS " + "─"*61 + "┐\n\n"
+HEALTH_OPEN = "┌─ AIRCRAFT HEALTH & MAINTENANCE " + "─"*55 + "┐\n"
+RECOMMENDATIONS_OPEN = "┌─ OPERATIONAL RECOMMENDATIONS " + "─"*57 + "┐\n"
+
+class _ReportBuffer:
+    def __init__(self, f, flush_chars=None):
+        self.f = f
+        self.flush_chars = flush_chars
+        self.parts = []
+        self.size = 0
+
+    def write(self, s):
+        self.parts.append(s)
+        self.size += len(s)
+        if self.flush_chars is not None and self.size >= self.flush_chars:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.f.write("".join(self.parts))
+            self.parts = []
+            self.size = 0
+
+def _summarize(delay_results, load_results):
+    delayed = 0
+    total_delay = 0
+    top_reasons = {}
+    for d in delay_results:
+        total_delay += d["delay_min"]
+        if d["delay_min"] > 0:
+            delayed += 1
+            for r in d["reasons"]:
+                reason_type = r.split()[0]
+                top_reasons[reason_type] = top_reasons.get(reason_type, 0) + 1
+
+    load_sum = 0
+    overbooked = 0
+    for l in load_results:
+        load_sum += l["predicted_load_pct"]
+        if l.get("overbooking_risk"):
+            overbooked += 1
+
+    return {
+        "delayed": delayed,
+        "total_delay": total_delay,
+        "top_reasons": top_reasons,
+        "avg_load": load_sum / len(load_results) if load_results else 0,
+        "overbooked": overbooked
+    }
+
+def _alert_messages(health_alerts, alert_store):
+    if alert_store is not None:
+        critical = alert_store.top(level="CRITICAL")
+        grounded = {e["subject"] for e in critical}
+        return [e["message"] for e in critical], [e["message"] for e in alert_store.top(level="WARN")], grounded
+
+    critical = []
+    warnings = []
+    for lvl, msg in health_alerts:
+        if lvl == "CRITICAL":
+            critical.append(msg)
+        elif lvl == "WARN":
+            warnings.append(msg)
+    return critical, warnings, {msg.split('|')[0].strip() for msg in critical}
+
+def _flight_section(fl, d, l, c):
+    fid = fl["flight_id"]
+    route = f'{fl["route"]["origin"]} → {fl["route"]["destination"]}'
+
+    if d["delay_min"] >= 60:
+        delay_status = "[DELAYED-SEVERE]"
+    elif d["delay_min"] > 0:
+        delay_status = "[DELAYED]      "
+    else:
+        delay_status = "[ON-TIME]      "
+
+    lines = [
+        f"├─ {fid} | {fl['aircraft_id']:<10} | {route:<15} {delay_status}\n",
+        f"│  Departure Time  : {format_timestamp(fl['timestamp'])}\n",
+        f"│  Predicted Delay : {d['delay_min']} minutes\n"
+    ]
+
+    if d["reasons"]:
+        lines.append("│  Delay Factors   :\n")
+        for reason in d["reasons"]:
+            lines.append(f"│     • {reason}\n")
+
+    if l:
+        if l["overbooking_risk"]:
+            load_icon = "[OVERBOOKED]"
+        elif l["under_utilized"]:
+            load_icon = "[LOW-UTIL]  "
+        else:
+            load_icon = "[NORMAL]    "
+
+        lines.append(f"│  Passenger Load  : {load_icon} {l['predicted_load_pct']:.1f}% ({l['predicted_passengers']}/{fl['passenger']['capacity']} pax)\n")
+
+        if l["overbooking_risk"]:
+            lines.append(f"│     [!] OVERBOOKING RISK - Current bookings: {fl['passenger']['booked']}\n")
+        if l["under_utilized"]:
+            lines.append("│     [!] UNDER-UTILIZED FLIGHT - Consider route review\n")
+
+    if c:
+        lines.append("│  Crew Status     : [NON-COMPLIANT]\n")
+        for issue in c["issues"]:
+            lines.append(f"│     • {issue}\n")
+    else:
+        lines.append("│  Crew Status     : [COMPLIANT]\n")
+
+    weather = fl["status"]["weather"]
+    weather_risk = []
+    if weather["crosswind"] > 35:
+        weather_risk.append(f"High crosswind ({weather['crosswind']} knots)")
+    if weather["thunderstorm"]:
+        weather_risk.append("Thunderstorm")
+    if weather["visibility"] < 2000:
+        weather_risk.append(f"Low visibility ({weather['visibility']}m)")
+
+    if weather_risk:
+        lines.append(f"│  Weather Risk    : [HIGH] {', '.join(weather_risk)}\n")
+    else:
+        lines.append("│  Weather Risk    : [CLEAR]\n")
+
+    lines.append("│\n")
+    return "".join(lines)
+
 def write_daily_report(
     flights,
     delay_results,
@@ -8,173 +171,114 @@ def write_daily_report(
     crew_issues,
     load_results,
     missing_flights,
-    out_dir="output/reports"
+    missing_sources=None,
+    alert_store=None,
+    out_dir="output/reports",
+    stream=False,
+    flush_chars=1 << 20
 ):
+    now = datetime.now()
     os.makedirs(out_dir, exist_ok=True)
-    date_str = datetime.now().strftime("%Y%m%d")
-    path = os.path.join(out_dir, f"aviation_report_{date_str}.txt")
-
-    delays_by_id = {d["flight_id"]: d for d in delay_results}
-    load_by_id = {l["flight_id"]: l for l in load_results}
-    crew_by_id = {c["flight_id"]: c for c in crew_issues}
+    path = os.path.join(out_dir, f"aviation_report_{now.strftime('%Y%m%d')}.txt")
 
     total_flights = len(flights)
-    delayed_flights = [d for d in delay_results if d["delay_min"] > 0]
-    on_time_flights = total_flights - len(delayed_flights)
-    total_delay_time = sum(d["delay_min"] for d in delay_results)
-    avg_load = sum(l["predicted_load_pct"] for l in load_results) / len(load_results) if load_results else 0
-
-    critical_alerts = [a for a in health_alerts if a[0] == "CRITICAL"]
-    warning_alerts = [a for a in health_alerts if a[0] == "WARN"]
 
     with open(path, "w", encoding="utf-8") as f:
-        f.write("╔" + "═"*88 + "╗\n")
-        f.write("║" + " "*25 + "DAILY AVIATION OPERATIONS REPORT" + " "*31 + "║\n")
-        f.write("╚" + "═"*88 + "╝\n\n")
-        
-        f.write(f"Report Date: {datetime.now().strftime('%A, %B %d, %Y')}\n")
-        f.write(f"Generated:   {datetime.now().strftime('%H:%M:%S')}\n")
-        f.write("─"*90 + "\n\n")
+        out = _ReportBuffer(f, flush_chars if stream else None)
+
+        out.write(HEADER)
+        out.write(f"Report Date: {now.strftime('%A, %B %d, %Y')}\n")
+        out.write(f"Generated:   {now.strftime('%H:%M:%S')}\n")
+        out.write("─"*90 + "\n\n")
 
         if total_flights == 0:
-            f.write("┌─ NOTICE " + "─"*78 + "┐\n")
-            f.write("│ NO FLIGHT DATA AVAILABLE FOR THIS REPORT PERIOD\n")
-            f.write("│ Please check data files in /data directory\n")
-            f.write("└" + "─"*88 + "┘\n\n")
-            f.write("╔" + "═"*88 + "╗\n")
-            f.write("║" + " "*35 + "END OF REPORT" + " "*40 + "║\n")
-            f.write("╚" + "═"*88 + "╝\n")
+            out.write(NO_DATA_NOTICE)
+            out.write(FOOTER)
+            out.flush()
             return path
 
-        on_time_pct = (on_time_flights/total_flights*100) if total_flights > 0 else 0
-        delayed_pct = (len(delayed_flights)/total_flights*100) if total_flights > 0 else 0
+        s = _summarize(delay_results, load_results)
+        critical_alerts, warning_alerts, grounded = _alert_messages(health_alerts, alert_store)
+        delayed = s["delayed"]
+        total_delay_time = s["total_delay"]
+        on_time_flights = total_flights - delayed
 
-        f.write("┌─ EXECUTIVE SUMMARY " + "─"*68 + "┐\n")
-        f.write(f"│ Total Flights Monitored          : {total_flights:>3} flights" + " "*38 + "│\n")
-        f.write(f"│ On-Time Performance              : {on_time_flights:>3} flights ({on_time_pct:.1f}%)" + " "*28 + "│\n")
-        f.write(f"│ Delayed Flights                  : {len(delayed_flights):>3} flights ({delayed_pct:.1f}%)" + " "*28 + "│\n")
-        f.write(f"│ Total Delay Time                 : {total_delay_time:>4} minutes" + " "*36 + "│\n")
-        f.write(f"│ Average Load Factor              : {avg_load:>5.1f}%" + " "*42 + "│\n")
-        f.write(f"│ Critical Alerts                  : {len(critical_alerts):>3}" + " "*47 + "│\n")
-        f.write(f"│ Warning Alerts                   : {len(warning_alerts):>3}" + " "*47 + "│\n")
-        f.write(f"│ Crew Compliance Issues           : {len(crew_issues):>3}" + " "*47 + "│\n")
-        f.write("└" + "─"*88 + "┘\n\n")
+        out.write(SUMMARY_TEMPLATE.format(
+            total=total_flights,
+            on_time=on_time_flights,
+            on_time_pct=on_time_flights / total_flights * 100,
+            delayed=delayed,
+            delayed_pct=delayed / total_flights * 100,
+            total_delay=total_delay_time,
+            avg_load=s["avg_load"],
+            critical=len(critical_alerts),
+            warnings=len(warning_alerts),
+            crew=len(crew_issues)
+        ))
 
         if missing_flights:
-            f.write("[!] INCOMPLETE DATA FOR:\n")
+            out.write("[!] INCOMPLETE DATA FOR:\n")
+            missing_sources = missing_sources or {}
             for fid in missing_flights:
-                f.write(f"    - {fid}\n")
-            f.write("\n")
+                absent = missing_sources.get(fid)
+                out.write(f"    - {fid} (no {', '.join(absent)} data)\n" if absent else f"    - {fid}\n")
+            out.write("\n")
+
+        delays_by_id = {d["flight_id"]: d for d in delay_results}
+        load_by_id = {l["flight_id"]: l for l in load_results}
+        crew_by_id = {c["flight_id"]: c for c in crew_issues}
+        no_delay = {"delay_min": 0, "reasons": []}
 
-        f.write("┌─ DETAILED FLIGHT ANALYSIS " + "─"*61 + "┐\n\n")
-        
+        out.write(DETAILS_OPEN)
         for fl in flights:
             fid = fl["flight_id"]
-            route = f'{fl["route"]["origin"]} → {fl["route"]["destination"]}'
-            d = delays_by_id.get(fid, {"delay_min": 0, "reasons": []})
-            l = load_by_id.get(fid, {})
-            c = crew_by_id.get(fid, {})
-
-            if d["delay_min"] >= 60:
-                delay_status = "[DELAYED-SEVERE]"
-            elif d["delay_min"] > 0:
-                delay_status = "[DELAYED]      "
-            else:
-                delay_status = "[ON-TIME]      "
-            
-            f.write(f"├─ {fid} | {fl['aircraft_id']:<10} | {route:<15} {delay_status}\n")
-            f.write(f"│  Departure Time  : {fl['timestamp']}\n")
-            f.write(f"│  Predicted Delay : {d['delay_min']} minutes\n")
-            
-            if d["reasons"]:
-                f.write(f"│  Delay Factors   :\n")
-                for reason in d["reasons"]:
-                    f.write(f"│     • {reason}\n")
-            
-            if l:
-                if l["overbooking_risk"]:
-                    load_icon = "[OVERBOOKED]"
-                elif l["under_utilized"]:
-                    load_icon = "[LOW-UTIL]  "
-                else:
-                    load_icon = "[NORMAL]    "
-                
-                f.write(f"│  Passenger Load  : {load_icon} {l['predicted_load_pct']:.1f}% ({l['predicted_passengers']}/{fl['passenger']['capacity']} pax)\n")
-                
-                if l["overbooking_risk"]:
-                    f.write(f"│     [!] OVERBOOKING RISK - Current bookings: {fl['passenger']['booked']}\n")
-                if l["under_utilized"]:
-                    f.write(f"│     [!] UNDER-UTILIZED FLIGHT - Consider route review\n")
-
-            if c:
-                f.write(f"│  Crew Status     : [NON-COMPLIANT]\n")
-                for issue in c["issues"]:
-                    f.write(f"│     • {issue}\n")
-            else:
-                f.write(f"│  Crew Status     : [COMPLIANT]\n")
-
-            weather = fl["status"]["weather"]
-            weather_risk = []
-            if weather["crosswind"] > 35:
-                weather_risk.append(f"High crosswind ({weather['crosswind']} knots)")
-            if weather["thunderstorm"]:
-                weather_risk.append("Thunderstorm")
-            if weather["visibility"] < 2000:
-                weather_risk.append(f"Low visibility ({weather['visibility']}m)")
-            
-            if weather_risk:
-                f.write(f"│  Weather Risk    : [HIGH] {', '.join(weather_risk)}\n")
-            else:
-                f.write(f"│  Weather Risk    : [CLEAR]\n")
-
-            f.write("│\n")
-
-        f.write("└" + "─"*88 + "┘\n\n")
-
-        f.write("┌─ AIRCRAFT HEALTH & MAINTENANCE " + "─"*55 + "┐\n")
-        if not health_alerts:
-            f.write("│  [OK] All aircraft systems operating normally\n")
+            out.write(_flight_section(fl, delays_by_id.get(fid, no_delay), load_by_id.get(fid, {}), crew_by_id.get(fid, {})))
+        out.write(BOX_BOTTOM)
+
+        out.write(HEALTH_OPEN)
+        if not (critical_alerts or warning_alerts):
+            out.write("│  [OK] All aircraft systems operating normally\n")
         else:
             if critical_alerts:
-                f.write("│  [CRITICAL] ISSUES (Immediate Action Required):\n")
-                for lvl, msg in critical_alerts:
-                    f.write(f"│     {msg}\n")
-                f.write("│\n")
-            
+                out.write("│  [CRITICAL] ISSUES (Immediate Action Required):\n")
+                for msg in critical_alerts:
+                    out.write(f"│     {msg}\n")
+                out.write("│\n")
+
             if warning_alerts:
-                f.write("│  [WARNING] ISSUES (Monitor Closely):\n")
-                for lvl, msg in warning_alerts:
-                    f.write(f"│     {msg}\n")
-        f.write("└" + "─"*88 + "┘\n\n")
-
-        f.write("┌─ OPERATIONAL RECOMMENDATIONS " + "─"*57 + "┐\n")
-        
-        if len(delayed_flights) > 0:
-            f.write(f"│  1. DELAYS: {len(delayed_flights)} flights affected ({total_delay_time} total mins)\n")
-            top_reasons = {}
-            for d in delayed_flights:
-                for r in d["reasons"]:
-                    reason_type = r.split()[0]
-                    top_reasons[reason_type] = top_reasons.get(reason_type, 0) + 1
-            f.write(f"│     Primary causes: {', '.join(f'{k} ({v})' for k, v in sorted(top_reasons.items(), key=lambda x: x[1], reverse=True)[:3])}\n")
-        
+                out.write("│  [WARNING] ISSUES (Monitor Closely):\n")
+                for msg in warning_alerts:
+                    out.write(f"│     {msg}\n")
+        out.write(BOX_BOTTOM)
+
+        out.write(RECOMMENDATIONS_OPEN)
+
+        if delayed > 0:
+            out.write(f"│  1. DELAYS: {delayed} flights affected ({total_delay_time} total mins)\n")
+            top = sorted(s["top_reasons"].items(), key=lambda x: x[1], reverse=True)[:3]
+            out.write(f"│     Primary causes: {', '.join(f'{k} ({v})' for k, v in top)}\n")
+
         if critical_alerts:
-            f.write(f"│  2. MAINTENANCE: Ground {len(set([msg.split('|')[0].strip() for _, msg in critical_alerts]))} aircraft for inspection\n")
-        
+            out.write(f"│  2. MAINTENANCE: Ground {len(grounded)} aircraft for inspection\n")
+
         if crew_issues:
-            f.write(f"│  3. CREW: Arrange {len(crew_issues)} crew replacements for compliance\n")
-        
-        overbooked = [l for l in load_results if l.get("overbooking_risk")]
-        if overbooked:
-            f.write(f"│  4. CAPACITY: {len(overbooked)} flights overbooked - Arrange alternatives\n")
-        
-        if not (delayed_flights or critical_alerts or crew_issues or overbooked):
-            f.write("│  [OK] All operations within normal parameters - Continue standard monitoring\n")
-        
-        f.write("└" + "─"*88 + "┘\n\n")
-
-        f.write("╔" + "═"*88 + "╗\n")
-        f.write("║" + " "*35 + "END OF REPORT" + " "*40 + "║\n")
-        f.write("╚" + "═"*88 + "╝\n")
+            out.write(f"│  3. CREW: Arrange {len(crew_issues)} crew replacements for compliance\n")
+
+        if s["overbooked"]:
+            out.write(f"│  4. CAPACITY: {s['overbooked']} flights overbooked - Arrange alternatives\n")
+
+        if not (delayed or critical_alerts or crew_issues or s["overbooked"]):
+            out.write("│  [OK] All operations within normal parameters - Continue standard monitoring\n")
 
+        out.write(BOX_BOTTOM)
+        out.write(FOOTER)
+        out.flush()
+
+    return path
+
+def write_reassignment_proposals(result, out_dir="output/reports"):
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"crew_reassignments_{datetime.now().strftime('%Y%m%d')}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
     return path
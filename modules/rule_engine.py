@@ -0,0 +1,588 @@
+import ast
+import copy
+import math
+import string
+
+import numpy as np
+
+from modules import health_monitor
+
+DEFAULT_DELAY_RULES = [
+    {"name": "crosswind", "when": "crosswind > thresholds.crosswind_knots", "delay": 30,
+     "reason": "Crosswind {crosswind} knots"},
+    {"name": "thunderstorm", "when": "thunderstorm", "delay": 60, "reason": "Thunderstorm"},
+    {"name": "low_visibility", "when": "visibility < thresholds.visibility_meters", "delay": 25,
+     "reason": "Low visibility {visibility}m"},
+    {"name": "thrust_deviation",
+     "let": {"thrust_dev": "max_deviation(engine_thrust, thresholds.engine_thrust_baseline)"},
+     "when": "thrust_dev > thresholds.engine_thrust_deviation", "delay": 90,
+     "reason": "Engine thrust deviation {thrust_dev:.1f}%"},
+    {"name": "cabin_pressure_low", "when": "cabin_pressure < thresholds.cabin_pressure_min", "delay": 45,
+     "reason": "Cabin pressure low"},
+    {"name": "pressure_drop", "let": {"drop": "prev_cabin_pressure - cabin_pressure"},
+     "when": "drop >= thresholds.cabin_pressure_drop", "delay": 45, "reason": "Sudden pressure drop {drop:.2f}"},
+    {"name": "pressure_drop_rate", "when": "pressure_max_drop_rate > thresholds.cabin_pressure_drop_rate", "delay": 45,
+     "reason": "Rapid pressure drop rate {pressure_max_drop_rate:.2f} psi/min"},
+    {"name": "runway_queue", "when": "runway_queue > thresholds.runway_queue_threshold",
+     "delay": "runway_queue - thresholds.runway_queue_threshold", "reason": "Runway queue {runway_queue}min"},
+    {"name": "slow_boarding", "when": "boarding_time > thresholds.boarding_time_threshold",
+     "delay": "(boarding_time - thresholds.boarding_time_threshold) * 2", "reason": "Slow boarding {boarding_time}min"},
+    {"name": "crew_unavailable", "when": "not crew_available", "delay": 60, "reason": "Crew unavailable"}
+]
+
+DEFAULT_HEALTH_RULES = [
+    {"name": "engine_vibration", "when": "any_above(engine_vibration, thresholds.engine_vibration)",
+     "level": "CRITICAL", "message": "High engine vibration {engine_vibration}"},
+    {"name": "severe_turbulence", "when": "turbulence >= thresholds.turbulence_severe",
+     "level": "CRITICAL", "message": "Severe turbulence {turbulence}"},
+    {"name": "cabin_temperature", "when": "cabin_temp > thresholds.cabin_temp_high",
+     "level": "WARN", "message": "High cabin temperature {cabin_temp}C"},
+    {"name": "fuel_burn", "let": {"fuel_dev": "pct_deviation(fuel_burn, thresholds.fuel_burn_baseline)"},
+     "when": "fuel_dev > thresholds.fuel_burn_deviation", "level": "WARN", "message": "Abnormal fuel burn {fuel_dev:.1f}%"},
+    {"name": "decompression",
+     "when": "pressure_sustained_drop >= thresholds.cabin_sustained_drop and pressure_sustained_minutes >= thresholds.cabin_sustained_minutes",
+     "level": "CRITICAL",
+     "message": "Sustained cabin decompression {pressure_sustained_drop:.2f} psi over {pressure_sustained_minutes:.0f} min"},
+    {"name": "pressure_outliers", "when": "pressure_outliers >= thresholds.cabin_pressure_outliers",
+     "level": "WARN", "message": "Cabin pressure outliers ({pressure_outliers} samples)"}
+]
+
+LEVELS = ("CRITICAL", "WARN")
+
+SECTIONS = {
+    "_m": '_fl["metrics"]',
+    "_w": '_fl["status"]["weather"]',
+    "_o": '_fl["status"]["operational"]',
+    "_p": '_fl["passenger"]',
+    "_r": '_fl["route"]',
+    "_c": '_fl["crew"]'
+}
+
+# name: (kind, optional, section, scalar source)
+FIELDS = {
+    "flight_id": ("str", False, None, '_fl["flight_id"]'),
+    "aircraft_id": ("str", False, None, '_fl["aircraft_id"]'),
+    "origin": ("str", False, "_r", '_r["origin"]'),
+    "destination": ("str", False, "_r", '_r["destination"]'),
+    "crosswind": ("int", False, "_w", '_w["crosswind"]'),
+    "visibility": ("int", False, "_w", '_w["visibility"]'),
+    "thunderstorm": ("bool", False, "_w", '_w["thunderstorm"]'),
+    "engine_thrust": ("series", False, "_m", '_m.get("engine_thrust") or []'),
+    "engine_vibration": ("series", False, "_m", '_m.get("engine_vibration") or []'),
+    "fuel_burn": ("float", True, "_m", '_m.get("fuel_burn")'),
+    "cabin_pressure": ("float", True, "_m", '_m.get("cabin_pressure")'),
+    "prev_cabin_pressure": ("float", True, "_m", '_m.get("prev_cabin_pressure")'),
+    "pressure_max_drop_rate": ("float", True, "_m", '_m.get("pressure_max_drop_rate")'),
+    "pressure_sustained_drop": ("float", True, "_m", '_m.get("pressure_sustained_drop")'),
+    "pressure_sustained_minutes": ("float", True, "_m", '_m.get("pressure_sustained_minutes")'),
+    "pressure_outliers": ("int", True, "_m", '_m.get("pressure_outliers")'),
+    "cabin_temp": ("float", True, "_m", '_m.get("cabin_temp")'),
+    "turbulence": ("int", True, "_m", '_m.get("turbulence")'),
+    "runway_queue": ("int", False, "_o", '_o["runway_queue"]'),
+    "boarding_time": ("int", False, "_o", '_o["boarding_time"]'),
+    "crew_available": ("bool", False, "_o", '_o["crew_available"]'),
+    "booked": ("int", False, "_p", '_p["booked"]'),
+    "capacity": ("int", False, "_p", '_p["capacity"]'),
+    "pilot_count": ("int", False, "_c", 'len(_c["pilots"])'),
+    "cabin_crew_count": ("int", False, "_c", 'len(_c["cabin_crew"])')
+}
+
+class RuleError(ValueError):
+    pass
+
+def _div(a, b):
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if a != a or a == 0:
+            return math.nan
+        return math.copysign(math.inf, a) * math.copysign(1, b)
+
+def _max_deviation(series, baseline):
+    return max(abs(baseline - v) for v in series) if series else math.nan
+
+def _pct_deviation(value, baseline):
+    return abs((value - baseline) / baseline) * 100 if baseline else math.nan
+
+SCALAR_FUNCTIONS = {
+    "abs": abs,
+    "max_deviation": _max_deviation,
+    "pct_deviation": _pct_deviation,
+    "any_above": lambda series, limit: any(v > limit for v in series),
+    "any_below": lambda series, limit: any(v < limit for v in series),
+    "max_of": lambda series: max(series) if series else math.nan,
+    "min_of": lambda series: min(series) if series else math.nan,
+    "mean_of": lambda series: sum(series) / len(series) if series else math.nan,
+    "count_of": len,
+    "_div": _div
+}
+
+def _col(x):
+    return np.reshape(x, (-1, 1))
+
+def _truth(x):
+    return np.asarray(x, dtype=bool)
+
+def _and(*xs):
+    out = _truth(xs[0])
+    for x in xs[1:]:
+        out = out & _truth(x)
+    return out
+
+def _or(*xs):
+    out = _truth(xs[0])
+    for x in xs[1:]:
+        out = out | _truth(x)
+    return out
+
+def _reduce(ufunc, series):
+    values, lengths = series
+    out = ufunc.reduce(values, axis=1, initial=np.nan) if values.shape[1] else np.full(len(lengths), np.nan)
+    return np.where(lengths > 0, out, np.nan)
+
+def _vector_max_deviation(series, baseline):
+    values, lengths = series
+    return _reduce(np.fmax, (np.abs(_col(baseline) - values), lengths))
+
+def _vector_pct_deviation(value, baseline):
+    baseline = np.asarray(baseline, dtype=np.float64)
+    return np.where(baseline != 0, np.abs((value - baseline) / baseline) * 100, np.nan)
+
+def _vector_mean(series):
+    values, lengths = series
+    total = np.zeros(len(lengths))
+    # Column by column, so the sums match the scalar left-to-right sum().
+    for j in range(values.shape[1]):
+        total += np.nan_to_num(values[:, j])
+    return np.where(lengths > 0, total / np.maximum(lengths, 1), np.nan)
+
+VECTOR_FUNCTIONS = {
+    "abs": np.abs,
+    "max_deviation": _vector_max_deviation,
+    "pct_deviation": _vector_pct_deviation,
+    "any_above": lambda series, limit: (series[0] > _col(limit)).any(axis=1),
+    "any_below": lambda series, limit: (series[0] < _col(limit)).any(axis=1),
+    "max_of": lambda series: _reduce(np.fmax, series),
+    "min_of": lambda series: _reduce(np.fmin, series),
+    "mean_of": _vector_mean,
+    "count_of": lambda series: series[1],
+    "_and": _and,
+    "_or": _or,
+    "_not": lambda x: ~_truth(x),
+    "_isin": lambda x, values: np.isin(x, list(values)),
+    "_where": lambda test, body, orelse: np.where(_truth(test), body, orelse)
+}
+
+# name: (argument count, positions that take a series field)
+FUNCTIONS = {
+    "abs": (1, ()),
+    "max_deviation": (2, (0,)),
+    "pct_deviation": (2, ()),
+    "any_above": (2, (0,)),
+    "any_below": (2, (0,)),
+    "max_of": (1, (0,)),
+    "min_of": (1, (0,)),
+    "mean_of": (1, (0,)),
+    "count_of": (1, (0,))
+}
+
+_ALLOWED = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Compare, ast.Lt, ast.LtE, ast.Gt, ast.GtE,
+    ast.Eq, ast.NotEq, ast.In, ast.NotIn, ast.IfExp, ast.Call, ast.Name, ast.Attribute, ast.Constant,
+    ast.Tuple, ast.List, ast.Load
+)
+
+def _parse(source, names, threshold_keys, where):
+    if isinstance(source, bool) or not isinstance(source, (str, int, float)):
+        raise RuleError(f"{where}: expected an expression string or number")
+    try:
+        tree = ast.parse(str(source), mode="eval")
+    except SyntaxError as e:
+        raise RuleError(f"{where}: {e.msg} in {source!r}") from None
+
+    series_args = set()
+    calls = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED):
+            raise RuleError(f"{where}: {type(node).__name__} is not allowed in {source!r}")
+        if isinstance(node, ast.Constant) and type(node.value) not in (int, float, bool, str):
+            raise RuleError(f"{where}: unsupported constant {node.value!r}")
+        if isinstance(node, ast.Attribute):
+            if not (isinstance(node.value, ast.Name) and node.value.id == "thresholds"):
+                raise RuleError(f"{where}: only thresholds.<name> attributes are allowed")
+            if node.attr not in threshold_keys:
+                raise RuleError(f"{where}: unknown threshold {node.attr!r}")
+        if isinstance(node, ast.Call):
+            name = node.func.id if isinstance(node.func, ast.Name) else None
+            if name not in FUNCTIONS or node.keywords:
+                raise RuleError(f"{where}: unknown function in {source!r}")
+            calls.add(id(node.func))
+            arity, series_pos = FUNCTIONS[name]
+            if len(node.args) != arity:
+                raise RuleError(f"{where}: {name}() takes {arity} argument(s)")
+            for pos in series_pos:
+                arg = node.args[pos]
+                if not (isinstance(arg, ast.Name) and FIELDS.get(arg.id, ("",))[0] == "series"):
+                    raise RuleError(f"{where}: argument {pos + 1} of {name}() must be a series field")
+                series_args.add(id(arg))
+        if isinstance(node, ast.Compare):
+            for op, right in zip(node.ops, node.comparators):
+                if isinstance(op, (ast.In, ast.NotIn)) and not (
+                        isinstance(right, (ast.Tuple, ast.List)) and all(isinstance(e, ast.Constant) for e in right.elts)):
+                    raise RuleError(f"{where}: 'in' needs a list of constants")
+        if isinstance(node, (ast.Tuple, ast.List)) and not all(isinstance(e, ast.Constant) for e in node.elts):
+            raise RuleError(f"{where}: lists may only hold constants")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if id(node) in calls or node.id == "thresholds":
+                continue
+            if node.id not in names:
+                raise RuleError(f"{where}: unknown name {node.id!r}")
+            if FIELDS.get(node.id, ("",))[0] == "series" and id(node) not in series_args:
+                raise RuleError(f"{where}: series field {node.id!r} can only be used through a series function")
+    return tree
+
+class _Rename(ast.NodeTransformer):
+    def __init__(self, renames):
+        self.renames = renames
+
+    def visit_Name(self, node):
+        if node.id in self.renames:
+            return ast.copy_location(ast.Name(id=self.renames[node.id], ctx=ast.Load()), node)
+        return node
+
+class _ScalarCode(_Rename):
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Div):
+            return ast.copy_location(ast.Call(func=ast.Name(id="_div", ctx=ast.Load()), args=[node.left, node.right], keywords=[]), node)
+        return node
+
+class _VectorCode(_Rename):
+    def _call(self, name, args, node):
+        return ast.copy_location(ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=args, keywords=[]), node)
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        return self._call("_and" if isinstance(node.op, ast.And) else "_or", node.values, node)
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return self._call("_not", [node.operand], node)
+        return node
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return self._call("_where", [node.test, node.body, node.orelse], node)
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        parts = []
+        left = node.left
+        for op, right in zip(node.ops, node.comparators):
+            if isinstance(op, (ast.In, ast.NotIn)):
+                part = self._call("_isin", [left, right], node)
+                if isinstance(op, ast.NotIn):
+                    part = self._call("_not", [part], node)
+            else:
+                part = ast.copy_location(ast.Compare(left=left, ops=[op], comparators=[right]), node)
+            parts.append(part)
+            left = right
+        return parts[0] if len(parts) == 1 else self._call("_and", parts, node)
+
+def _scalar_source(tree, renames):
+    tree = _ScalarCode(renames).visit(copy.deepcopy(tree))
+    return ast.unparse(ast.fix_missing_locations(tree).body)
+
+def _vector_code(tree, renames, where):
+    tree = ast.fix_missing_locations(_VectorCode(renames).visit(copy.deepcopy(tree)))
+    return compile(tree, f"<rule {where}>", "eval")
+
+def _fields_of(tree):
+    return {n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and n.id in FIELDS}
+
+def _thresholds_of(tree):
+    return {n.attr for n in ast.walk(tree) if isinstance(n, ast.Attribute)}
+
+def _airports(rule, key, where):
+    codes = rule.get(key)
+    if codes is None:
+        return None
+    if isinstance(codes, str):
+        codes = [codes]
+    if not isinstance(codes, (list, tuple)) or not all(isinstance(c, str) for c in codes):
+        raise RuleError(f"{where}: {key} must be a list of airport codes")
+    return frozenset(codes)
+
+def _compile_rule(rule, k, kind, threshold_keys):
+    name = rule.get("name", str(k)) if hasattr(rule, "get") else str(k)
+    where = f"{kind}[{k}] {name}"
+    if not hasattr(rule, "items"):
+        raise RuleError(f"{where}: expected an object")
+    text_key = "reason" if kind == "delay" else "message"
+    allowed = {"name", "when", "let", "origins", "destinations", text_key, "delay" if kind == "delay" else "level"}
+    unknown = set(rule) - allowed
+    if unknown:
+        raise RuleError(f"{where}: unknown key(s) {', '.join(sorted(unknown))}")
+    for key in ("when", text_key, "delay" if kind == "delay" else "level"):
+        if key not in rule:
+            raise RuleError(f"{where}: missing {key!r}")
+
+    names = set(FIELDS)
+    renames = {}
+    fields = set()
+    thresholds = set()
+    lets = []
+    let = rule.get("let") or {}
+    if not hasattr(let, "items"):
+        raise RuleError(f"{where}: let must be an object")
+    for let_name, expr in let.items():
+        if not let_name.isidentifier() or let_name.startswith("_") or let_name in names or let_name in FUNCTIONS or let_name == "thresholds":
+            raise RuleError(f"{where}: invalid let name {let_name!r}")
+        tree = _parse(expr, names, threshold_keys, f"{where} let {let_name}")
+        fields |= _fields_of(tree)
+        thresholds |= _thresholds_of(tree)
+        var = f"_{k}_{let_name}"
+        lets.append((var, _scalar_source(tree, renames), _vector_code(tree, renames, where)))
+        names.add(let_name)
+        renames[let_name] = var
+
+    when = _parse(rule["when"], names, threshold_keys, f"{where} when")
+    fields |= _fields_of(when)
+    thresholds |= _thresholds_of(when)
+    compiled = {
+        "name": name,
+        "lets": lets,
+        "when_scalar": _scalar_source(when, renames),
+        "when_vector": _vector_code(when, renames, where),
+        "origins": _airports(rule, "origins", where),
+        "destinations": _airports(rule, "destinations", where)
+    }
+
+    if kind == "delay":
+        delay = _parse(rule["delay"], names, threshold_keys, f"{where} delay")
+        fields |= _fields_of(delay)
+        thresholds |= _thresholds_of(delay)
+        compiled["delay_scalar"] = _scalar_source(delay, renames)
+        compiled["delay_vector"] = _vector_code(delay, renames, where)
+    else:
+        if rule["level"] not in LEVELS:
+            raise RuleError(f"{where}: level must be one of {', '.join(LEVELS)}")
+        compiled["level"] = rule["level"]
+
+    template = rule[text_key]
+    if not isinstance(template, str):
+        raise RuleError(f"{where}: {text_key} must be a string")
+    try:
+        template_fields = [field for _, field, _, _ in string.Formatter().parse(template) if field is not None]
+    except ValueError as e:
+        raise RuleError(f"{where}: {e} in {text_key}") from None
+    args = []
+    for field in template_fields:
+        if field not in names:
+            raise RuleError(f"{where}: unknown name {field!r} in {text_key}")
+        if field not in (a for a, _ in args):
+            args.append((field, renames.get(field, field)))
+    fields |= {a for a, _ in args if a in FIELDS}
+    compiled["template"] = template
+    compiled["args"] = args
+    compiled["fields"] = fields
+    compiled["thresholds"] = sorted(thresholds)
+    return compiled
+
+def _generate(rules, indices, kind):
+    used = set().union(*(rules[k]["fields"] for k in indices))
+    if kind == "health":
+        used.add("flight_id")
+    sections = {FIELDS[f][2] for f in used}
+
+    lines = ["def _evaluate(_fl, thresholds):"]
+    for sec, source in SECTIONS.items():
+        if sec in sections:
+            lines.append(f"    {sec} = {source}")
+    for name, (_, optional, _, source) in FIELDS.items():
+        if name in used:
+            lines.append(f"    {name} = {source}")
+            if optional:
+                lines.append(f"    if {name} is None: {name} = _nan")
+    lines += ["    delay = 0", "    reasons = []"] if kind == "delay" else ["    alerts = []"]
+
+    for k in indices:
+        rule = rules[k]
+        indent = "    "
+        if rule["thresholds"]:
+            # A rule that uses a null threshold is switched off.
+            lines.append(f"    if {' and '.join(f'thresholds.{t} is not None' for t in rule['thresholds'])}:")
+            indent += "    "
+        for var, source, _ in rule["lets"]:
+            lines.append(f"{indent}{var} = {source}")
+        lines.append(f"{indent}if {rule['when_scalar']}:")
+        text = f"_T{k}({', '.join(f'{a}={v}' for a, v in rule['args'])})" if rule["args"] else f"_T{k}"
+        if kind == "delay":
+            lines.append(f"{indent}    delay += {rule['delay_scalar']}")
+            lines.append(f"{indent}    reasons.append({text})")
+        else:
+            lines.append(f"{indent}    alerts.append(({rule['level']!r}, flight_id + ' | ' + {text}))")
+    lines.append("    return delay, reasons" if kind == "delay" else "    return alerts")
+
+    namespace = dict(SCALAR_FUNCTIONS, _nan=math.nan)
+    for k in indices:
+        rule = rules[k]
+        namespace[f"_T{k}"] = rule["template"].format if rule["args"] else rule["template"].format()
+    exec(compile("\n".join(lines), f"<{kind} rules>", "exec"), namespace)
+    return namespace["_evaluate"]
+
+class _RuleList:
+    def __init__(self, rules, kind):
+        self.rules = rules
+        self.kind = kind
+        self.scoped = any(r["origins"] is not None or r["destinations"] is not None for r in rules)
+        self.by_route = {}
+        self.evaluate = None if self.scoped else _generate(rules, range(len(rules)), kind)
+
+    def for_flight(self, flight):
+        if not self.scoped:
+            return self.evaluate
+        route = flight["route"]
+        key = (route["origin"], route["destination"])
+        fn = self.by_route.get(key)
+        if fn is None:
+            indices = [k for k, r in enumerate(self.rules)
+                       if (r["origins"] is None or key[0] in r["origins"])
+                       and (r["destinations"] is None or key[1] in r["destinations"])]
+            fn = self.by_route[key] = _generate(self.rules, indices, self.kind)
+        return fn
+
+    def hits(self, ns, n):
+        hits = np.zeros((len(self.rules), n), dtype=bool)
+        for k, rule in enumerate(self.rules):
+            limits = [ns["thresholds"][t] for t in rule["thresholds"]]
+            if any(limit is None for limit in limits):
+                continue
+            for var, _, code in rule["lets"]:
+                ns[var] = eval(code, ns)
+            hit = np.broadcast_to(_truth(eval(rule["when_vector"], ns)), (n,))
+            for limit in limits:
+                # Overrides can set a threshold that is null elsewhere; the NaN rows stay off.
+                if isinstance(limit, np.ndarray) and limit.dtype.kind == "f":
+                    hit = hit & ~np.isnan(limit)
+            if rule["origins"] is not None:
+                hit = hit & np.isin(ns["origin"], list(rule["origins"]))
+            if rule["destinations"] is not None:
+                hit = hit & np.isin(ns["destination"], list(rule["destinations"]))
+            hits[k] = hit
+        return hits
+
+    def texts(self, hits, ns):
+        out = []
+        for k, rule in enumerate(self.rules):
+            idx = np.flatnonzero(hits[k])
+            if not rule["args"]:
+                out.append(iter([rule["template"]] * len(idx)))
+                continue
+            names = [a for a, _ in rule["args"]]
+            columns = [_values(ns, a, v, idx) for a, v in rule["args"]]
+            fmt = rule["template"].format
+            out.append(iter([fmt(**dict(zip(names, row))) for row in zip(*columns)]))
+        return out
+
+def _values(ns, name, var, idx):
+    v = ns[var]
+    kind = FIELDS[name][0] if name in FIELDS else None
+    if kind == "series":
+        values, lengths = v
+        return [row[:k] for row, k in zip(values[idx].tolist(), lengths[idx].tolist())]
+    if kind is None:
+        return np.broadcast_to(v, (ns["_size"],))[idx].tolist()
+    if kind == "str":
+        return [v[i] for i in idx.tolist()]
+    x = v[idx]
+    if kind == "int" and x.dtype.kind == "f":
+        return [int(a) if a == a else a for a in x.tolist()]
+    if kind == "bool":
+        return x.astype(bool).tolist()
+    return x.astype(np.float64).tolist() if kind == "float" else x.tolist()
+
+def _series(values, lengths):
+    if not values.shape[1]:
+        return values, lengths
+    present = np.arange(values.shape[1]) < lengths[:, None]
+    return np.where(present, values, np.nan), lengths
+
+class RuleSet:
+    def __init__(self, delay_rules, health_rules):
+        self.delay_rules = _RuleList(delay_rules, "delay")
+        self.health_rules = _RuleList(health_rules, "health")
+        self.fields = set()
+        for rule in delay_rules + health_rules:
+            self.fields |= rule["fields"]
+            if rule["origins"] is not None:
+                self.fields.add("origin")
+            if rule["destinations"] is not None:
+                self.fields.add("destination")
+
+    def predict_delay(self, flight, thresholds):
+        return self.delay_rules.for_flight(flight)(flight, thresholds)
+
+    def check_health(self, flight, thresholds):
+        return health_monitor.log_health_alerts(self.health_rules.for_flight(flight)(flight, thresholds))
+
+    def _namespace(self, cols, thresholds):
+        ns = dict(VECTOR_FUNCTIONS, thresholds=thresholds, _size=cols["size"])
+        for name in self.fields:
+            kind = FIELDS[name][0]
+            if kind == "series":
+                ns[name] = _series(cols[name], cols[name + "_len"])
+            elif kind == "str":
+                ns[name] = np.array(cols[name], dtype=object)
+            else:
+                ns[name] = cols[name]
+        return ns
+
+    def predict_delay_batch(self, cols, thresholds):
+        n = cols["size"]
+        ns = self._namespace(cols, thresholds)
+        rules = self.delay_rules.rules
+        delay = np.zeros(n, dtype=np.int64)
+        with np.errstate(all="ignore"):
+            hits = self.delay_rules.hits(ns, n)
+            for k, rule in enumerate(rules):
+                if hits[k].any():
+                    np.add(delay, np.where(hits[k], eval(rule["delay_vector"], ns), 0), out=delay, casting="unsafe")
+
+        texts = self.delay_rules.texts(hits, ns)
+        reasons = {}
+        flight_idx, rule_idx = np.nonzero(hits.T)
+        for i, k in zip(flight_idx.tolist(), rule_idx.tolist()):
+            reasons.setdefault(i, []).append(next(texts[k]))
+
+        delay = delay.tolist()
+        return [{"flight_id": fid, "delay_min": delay[i], "reasons": reasons.get(i, [])}
+                for i, fid in enumerate(cols["flight_id"])]
+
+    def check_health_batch(self, cols, thresholds):
+        n = cols["size"]
+        ns = self._namespace(cols, thresholds)
+        rules = self.health_rules.rules
+        with np.errstate(all="ignore"):
+            hits = self.health_rules.hits(ns, n)
+
+        texts = self.health_rules.texts(hits, ns)
+        flight_id = cols["flight_id"]
+        alerts = []
+        flight_idx, rule_idx = np.nonzero(hits.T)
+        for i, k in zip(flight_idx.tolist(), rule_idx.tolist()):
+            alerts.append((rules[k]["level"], f"{flight_id[i]} | {next(texts[k])}"))
+        return health_monitor.log_health_alerts(alerts)
+
+def compile_rules(delay_rules, health_rules, threshold_keys):
+    if delay_rules is None:
+        delay_rules = DEFAULT_DELAY_RULES
+    if health_rules is None:
+        health_rules = DEFAULT_HEALTH_RULES
+    delay = [_compile_rule(r, k, "delay", threshold_keys) for k, r in enumerate(delay_rules)]
+    health = [_compile_rule(r, k, "health", threshold_keys) for k, r in enumerate(health_rules)]
+    return RuleSet(delay, health)
@@ -0,0 +1,263 @@
+import os
+import time
+from collections import deque
+
+from modules.dashboard import DashboardModel
+from modules.api_server import ApiServer
+from modules.reporter import write_daily_report
+from modules.pipeline import load_incremental_state, save_incremental_state, evaluate_changed, collect_results, merge_crew_issue, open_crew_roster, open_health_store, save_health_store, update_health_trends, archive_results, report_options, open_load_store, save_load_store, open_alert_store, save_alert_store, record_alerts
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+class OperationsService:
+    def __init__(self, config):
+        self.config = config
+        service = config.get("service", {})
+        self.poll_interval = service.get("poll_interval_sec", 1.0)
+        self.refresh_interval = service.get("refresh_interval_sec", 60)
+        self.latency_target = service.get("latency_target_sec", 2.0)
+
+        self.state_path, self.ingestor, self.results = load_incremental_state(config.get("ingestion", {}))
+        self.load_store = open_load_store(config)
+        self.alert_store = open_alert_store(config)
+        self.health_store = open_health_store(config)
+        self.roster = open_crew_roster(config)
+        self.trend_alerts = {}
+        self.aircraft_of = {}
+        self.aircraft_flights = {}
+        self.flights = {}
+        self.missing = {}
+        self.crew = {}
+        dashboard = config.get("dashboard", {})
+        self.dashboard = DashboardModel(dashboard.get("top_delays"))
+        self.changed_panels_only = dashboard.get("changed_panels_only", False)
+        # Every flight known from saved state goes through the first refresh, including the incomplete ones.
+        self.pending = set(self.results).union(*self.ingestor.sources.values())
+        self.api = None
+        api = config.get("api", {})
+        if api.get("enabled", False):
+            try:
+                self.api = ApiServer(api.get("host", "127.0.0.1"), api.get("port", 8787)).start()
+            except OSError as e:
+                print(f"⚠ API server not started: {e}")
+        self.stamps = {}
+        self.latencies = deque(maxlen=1000)
+        self.dirty = True
+        self.stale = False
+        self.last_report = 0.0
+
+    def _changed_files(self):
+        changed = []
+        for name, path in self.ingestor.paths.items():
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            stamp = (st.st_ino, st.st_size, st.st_mtime_ns)
+            if self.stamps.get(name) != stamp:
+                watched = name in self.stamps
+                self.stamps[name] = stamp
+                changed.append(st.st_mtime if watched else None)
+        return changed
+
+    def poll(self):
+        mtimes = self._changed_files()
+        if not mtimes:
+            return set()
+
+        changed = self.ingestor.update()
+        if changed:
+            evaluate_changed(self.ingestor, self.results, changed, self.config, self.load_store, self.alert_store)
+            self.pending |= changed
+            self.dirty = True
+
+        # Files seen for the first time hold data written before the service started.
+        written = [m for m in mtimes if m is not None]
+        if changed and written:
+            latency = time.time() - max(written)
+            self.latencies.append(latency)
+            if latency > self.latency_target:
+                print(f"⚠ Alert latency {latency:.2f}s exceeded target {self.latency_target:.2f}s")
+        return changed
+
+    def latency_summary(self):
+        values = list(self.latencies)
+        return {
+            "samples": len(values),
+            "p50_sec": _percentile(values, 50),
+            "p95_sec": _percentile(values, 95),
+            "max_sec": max(values) if values else 0.0,
+            "target_sec": self.latency_target
+        }
+
+    def update_fleet(self, changed_flights, changed):
+        moved = set()
+        for fid in changed:
+            aid = self.aircraft_of.pop(fid, None)
+            if aid is not None:
+                times = self.aircraft_flights[aid]
+                del times[fid]
+                if not times:
+                    del self.aircraft_flights[aid]
+                moved.add(aid)
+        for fl in changed_flights:
+            aid = self.aircraft_of[fl["flight_id"]] = fl["aircraft_id"]
+            self.aircraft_flights.setdefault(aid, {})[fl["flight_id"]] = fl["timestamp"]
+            moved.add(aid)
+        return moved
+
+    def update_crew(self, changed_flights, changed):
+        fids = set(changed)
+        roster_issues = {}
+        if self.roster is not None:
+            crew = {fl["flight_id"]: fl["crew"] for fl in changed_flights}
+            departures = {fl["flight_id"]: fl["timestamp"] for fl in changed_flights}
+            fids |= self.roster.update(crew, departures, changed)
+            roster_issues = self.roster.flight_issues
+        for fid in fids:
+            r = self.results.get(fid) if fid in self.flights else None
+            c = merge_crew_issue(fid, r["crew"] if r else None, roster_issues.get(fid))
+            if c:
+                self.crew[fid] = c
+            else:
+                self.crew.pop(fid, None)
+            self.dashboard.update_crew(fid, c["issues"] if c else None)
+        return fids
+
+    def update_dashboard(self, changed_flights, changed):
+        current = set()
+        for fl in changed_flights:
+            r = self.results.get(fl["flight_id"])
+            if r is not None:
+                self.dashboard.update_flight(fl, r["delay"], r["load"])
+                current.add(fl["flight_id"])
+        for fid in changed - current:
+            self.dashboard.remove_flight(fid)
+
+    def flight_alerts(self, fid):
+        alerts = list(self.results[fid]["alerts"]) if fid in self.flights else []
+        aid = self.aircraft_of.get(fid)
+        alerts.extend(a for a in self.trend_alerts.get(aid, ()) if a[1].split(" | ", 1)[0] == fid)
+        return alerts
+
+    def update_api(self, fids):
+        fids = sorted(fids)
+        flights = [self.flights[fid] for fid in fids if fid in self.flights]
+        self.api.update(
+            flights,
+            [self.results[fl["flight_id"]]["delay"] for fl in flights],
+            [a for fid in fids for a in self.flight_alerts(fid)],
+            [self.crew[fid] for fid in fids if fid in self.crew],
+            [self.results[fl["flight_id"]]["load"] for fl in flights],
+            [fid for fid in fids if fid in self.missing],
+            removed=fids
+        )
+
+    def refresh(self):
+        # Only the flights changed since the last refresh, and the flights they affect through crew duty or
+        # aircraft trends, are touched here. The whole-fleet report is left to publish_report().
+        changed, self.pending = self.pending, set()
+        data = self.ingestor.flights(changed) if changed else {"flights": [], "missing_sources": {}}
+        changed_flights = data["flights"]
+        for fid in changed:
+            self.flights.pop(fid, None)
+            self.missing.pop(fid, None)
+        self.flights.update((fl["flight_id"], fl) for fl in changed_flights)
+        self.missing.update(data["missing_sources"])
+
+        moved = self.update_fleet(changed_flights, changed)
+        rechecked, carriers = update_health_trends(self.health_store, self.config, self.aircraft_flights, moved, self.trend_alerts)
+        # Flight alerts were recorded when poll evaluated them; only the aircraft trend alerts are new here.
+        trend_alerts = [a for aid in rechecked for a in self.trend_alerts.get(aid, [])]
+        record_alerts(self.alert_store, self.aircraft_of, trend_alerts, scope=rechecked, trend=True)
+        self.dirty = False
+        if not changed and not rechecked:
+            return
+
+        crew_changed = self.update_crew(changed_flights, changed)
+        self.update_dashboard(changed_flights, changed)
+        if self.api is not None:
+            self.update_api(changed | carriers | crew_changed)
+        self.archive_changed(changed_flights, (carriers | crew_changed) - changed)
+        self.stale = True
+
+    def publish_report(self):
+        flights = [self.flights[fid] for fid in sorted(self.flights)]
+        delay_results, health_alerts, _, load_results = collect_results(flights, self.results)
+        crew_issues = [self.crew[fl["flight_id"]] for fl in flights if fl["flight_id"] in self.crew]
+        health_alerts = health_alerts + [a for aid in sorted(self.trend_alerts) for a in self.trend_alerts[aid]]
+
+        self.dashboard.set_alerts(health_alerts, self.alert_store)
+        self.dashboard.show(self.changed_panels_only)
+        report_path = write_daily_report(
+            flights=flights,
+            delay_results=delay_results,
+            health_alerts=health_alerts,
+            crew_issues=crew_issues,
+            load_results=load_results,
+            missing_flights=sorted(self.missing),
+            missing_sources=self.missing,
+            alert_store=self.alert_store,
+            **report_options(self.config)
+        )
+
+        lat = self.latency_summary()
+        print(f"✓ Report refreshed: {report_path}")
+        print(f"✓ Update latency p50 {lat['p50_sec']:.2f}s / p95 {lat['p95_sec']:.2f}s (target {lat['target_sec']:.2f}s)")
+
+        self.stale = False
+        self.last_report = time.monotonic()
+
+    def archive_changed(self, changed_flights, carriers):
+        # Flights that gained or lost an aircraft trend alert or a crew duty issue are archived again along with the changed ones.
+        carried = [self.flights[fid] for fid in sorted(carriers) if fid in self.flights]
+        flights = changed_flights + carried
+        delays = []
+        alerts = []
+        crew = []
+        loads = []
+        for fl in flights:
+            fid = fl["flight_id"]
+            r = self.results[fid]
+            delays.append(r["delay"])
+            alerts.extend(r["alerts"])
+            if fid in self.crew:
+                crew.append(self.crew[fid])
+            loads.append(r["load"])
+        batch = {fl["flight_id"] for fl in flights}
+        for aid in sorted({fl["aircraft_id"] for fl in flights}):
+            alerts.extend(a for a in self.trend_alerts.get(aid, []) if a[1].split(" | ", 1)[0] in batch)
+        archive_results(flights, delays, alerts, crew, loads, self.config)
+
+    def run(self, max_cycles=None):
+        print(f"Watching {len(self.ingestor.paths)} data files (poll {self.poll_interval}s, refresh {self.refresh_interval}s)...")
+        if self.api is not None:
+            print(f"✓ API listening on http://{self.api.host}:{self.api.port}/")
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                self.poll()
+                if self.dirty:
+                    self.refresh()
+                if self.stale and time.monotonic() - self.last_report >= self.refresh_interval:
+                    self.publish_report()
+                cycles += 1
+                time.sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            print("\nShutting down...")
+        finally:
+            if self.dirty:
+                self.refresh()
+            if self.stale:
+                self.publish_report()
+            save_incremental_state(self.state_path, self.ingestor, self.results)
+            save_load_store(self.config, self.load_store)
+            save_alert_store(self.config, self.alert_store)
+            save_health_store(self.config, self.health_store)
+            if self.api is not None:
+                self.api.stop()
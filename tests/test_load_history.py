@@ -0,0 +1,53 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from modules.load_predictor import LoadHistoryStore, history_key, predict_load
+
+RULES = SimpleNamespace(moving_avg_window=7, overbooking_limit_factor=1.05, under_utilization_pct=50)
+
+def _flight(history, day=15, origin="DEL"):
+    return {
+        "flight_id": "FK100",
+        "timestamp": datetime(2024, 1, day, 8, 0),
+        "route": {"origin": origin, "destination": "BOM"},
+        "passenger": {"capacity": 180, "booked": 150, "historical_load_pct": history}
+    }
+
+def test_same_length_history_that_changes_is_applied():
+    store = LoadHistoryStore(window=7)
+    day1 = _flight([82, 78, 85, 90, 88])
+    assert store.predict(day1, RULES) == predict_load(day1, RULES)
+
+    day2 = _flight([40, 40, 40, 40, 40], day=16)
+    assert store.predict(day2, RULES)["predicted_load_pct"] == 40
+    assert store.predict(day2, RULES) == predict_load(day2, RULES)
+
+def test_sliding_history_matches_predict_load():
+    store = LoadHistoryStore(window=3)
+    rules = SimpleNamespace(moving_avg_window=3, overbooking_limit_factor=1.05, under_utilization_pct=50)
+    histories = ([60, 70], [60, 70, 80], [60, 70, 80, 90], [70, 80, 90, 95], [70, 80, 90, 95], [])
+    for day, history in enumerate(histories, 15):
+        fl = _flight(history, day)
+        assert store.predict(fl, rules) == predict_load(fl, rules)
+
+def test_daily_sliding_window_appends_without_rebuilding():
+    for window in (3, 7):
+        store = LoadHistoryStore(window=window)
+        rules = SimpleNamespace(moving_avg_window=window, overbooking_limit_factor=1.05, under_utilization_pct=50)
+        history = [70, 75, 80, 85, 90]
+        store.predict(_flight(history), rules)
+        values = store.entries[history_key(_flight(history))][0]
+        for day in range(16, 22):
+            history = history[1:] + [60 + 3 * day]
+            fl = _flight(history, day)
+            assert store.predict(fl, rules) == predict_load(fl, rules)
+            assert store.entries[history_key(fl)][0] is values
+
+def test_entries_are_kept_per_route_and_older_days_leave_them_alone():
+    store = LoadHistoryStore(window=7)
+    store.predict(_flight([80, 90], day=16), RULES)
+    other = _flight([50, 50], day=16, origin="BLR")
+    assert store.predict(other, RULES) == predict_load(other, RULES)
+    older = _flight([10, 20], day=15)
+    assert store.predict(older, RULES) == predict_load(older, RULES)
+    assert store.window_sum(history_key(older)) == (170, 2)
@@ -0,0 +1,55 @@
+from datetime import datetime, timedelta
+
+from modules import log_processor
+from modules.log_processor import integrate_flight_data, _build_flight
+
+FLIGHTS = ["FK205", "FK201", "FK207", "FK203", "FK202", "FK206", "FK204"]
+
+def _write_logs(tmp_path):
+    start = datetime(2024, 1, 15, 6, 0)
+    logs = {"engine": [], "cabin": [], "weather": [], "airspeed": []}
+    # Flights overlap in time, so every log is in timestamp order with the flights interleaved.
+    for step in range(3):
+        for i, fid in enumerate(FLIGHTS):
+            ts = (start + timedelta(minutes=10 * step + i)).strftime("%Y-%m-%d %H:%M:%S")
+            aid = f"A320-{i:02d}"
+            logs["cabin"].append(f"{ts}|{fid}|{aid}|PRESSURE:{10.4 - 0.3 * step - 0.1 * i:.1f}|TEMP:{24 + step}|TURBULENCE:{step}|STATUS:NORMAL")
+            if step:
+                logs["engine"].append(f"{ts}|{fid}|{aid}|ENGINE_THRUST:{88 + step},{90 + i}|VIBRATION:1.{step},2.{i}|FUEL_BURN:{2400 + 10 * i + step}|STATUS:OK")
+            if step == 2 and fid != "FK207":
+                logs["weather"].append(f"{ts}|{fid}|DEL|BOM|CROSSWIND:{20 + i}|VISIBILITY:3000|THUNDERSTORM:NO|CONDITION:GOOD")
+                logs["airspeed"].append(f"{ts}|{fid}|{aid}|AIRSPEED:{450 + i}|ALTITUDE:36000|STATUS:NORMAL")
+
+    paths = {}
+    for name, lines in logs.items():
+        paths[name] = tmp_path / f"{name}.log"
+        paths[name].write_text("\n".join(lines) + "\n")
+    csvs = {
+        "ops": ("FlightID,RunwayQueueMin,BoardingTimeMin", "{fid},15,30"),
+        "crew": ("FlightID,PilotIDs,CabinCrewIDs,PilotHoursWorked,PilotLastRestHours,CrewAvailable", "{fid},P1{n};P2{n},C1{n};C2{n};C3{n},6;5,12;10,YES"),
+        "pax": ("FlightID,Booked,Capacity,HistoricalLoadPct", "{fid},150,180,82;78;85")
+    }
+    for name, (header, row) in csvs.items():
+        paths[name] = tmp_path / f"{name}.csv"
+        paths[name].write_text("\n".join([header] + [row.format(fid=fid, n=n) for n, fid in enumerate(FLIGHTS)]) + "\n")
+    return {name: str(path) for name, path in paths.items()}
+
+def _integrate(paths, join):
+    return integrate_flight_data(
+        paths["engine"], paths["cabin"], paths["weather"], paths["airspeed"],
+        paths["ops"], paths["crew"], paths["pax"], join=join
+    )
+
+def test_merge_join_accepts_timestamp_ordered_logs(tmp_path):
+    paths = _write_logs(tmp_path)
+    expected = _integrate(paths, "index")
+    assert len(expected["flights"]) == 6
+    assert expected["missing_sources"] == {"FK207": ["weather", "airspeed"]}
+    assert _integrate(paths, "merge") == expected
+
+def test_merge_join_spills_and_combines_runs(tmp_path, monkeypatch):
+    paths = _write_logs(tmp_path)
+    expected = _integrate(paths, "index")
+    monkeypatch.setattr(log_processor, "MERGE_FAN_IN", 2)
+    for run_lines in (1, 2, 5):
+        assert log_processor._merge_join(paths, False, _build_flight, run_lines) == expected